@@ -0,0 +1,2 @@
+from .src.renderer import (render_api_specification_to_string, render_api_specification_to_stream,
+                           get_static_asset_list)
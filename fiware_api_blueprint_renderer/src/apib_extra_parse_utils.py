@@ -1,16 +1,15 @@
 #!/usr/bin/env python
 
 import json
-import re
 import sys
 import shutil
 
-from pprint import pprint
+import apib_patterns
 
 
 def get_parameter_value_list(file_descriptor, param_regex):
 
-	member_regex = re.compile("^[ \t]*[+|-][ ]([^ +-]*)[ ]*-?(.*)$")
+	member_regex = apib_patterns.member_regex
 
 	line = file_descriptor.readline()
 	
@@ -40,7 +39,7 @@ def get_parameter_value_list(file_descriptor, param_regex):
 
 def get_parameters_with_values(file_descriptor, param_keyword_regex, param_regex, members_keyword_regex):
 
-	member_regex = re.compile("^[ \t]*[+|-][ ]([^ +-]*)[ ]*-?(.*)$")
+	member_regex = apib_patterns.member_regex
 
 	line = file_descriptor.readline()
 	
@@ -88,30 +87,35 @@ def get_header_nested_parameter_values_description(file_descriptor, header_regex
 	return (line, parameter_values)
 
 
-def get_nested_parameter_values_description(filename):
+def get_nested_parameter_values_description_from_file(read_file):
+	"""Returns the nested descriptions of the parameter values of an already open API blueprint"""
 
-	header_regex = re.compile("^(#+)[ ]*(.*)$")
-	param_keyword_regex = re.compile("^[+|-][ ]Parameters[ ]*$")
-	param_regex = re.compile("^[ \t]*[+|-][ ]([^ \(\)]*)[ ][^\(\)]*\(.*\).*$")
-	members_keyword_regex = re.compile("^([^+-]*)[+|-][ ]Members[ ]*$")
+	header_regex = apib_patterns.header_regex
+	param_keyword_regex = apib_patterns.param_keyword_regex
+	param_regex = apib_patterns.param_regex
+	members_keyword_regex = apib_patterns.members_keyword_regex
 
 	nested_description_list = []
-	with open(filename, 'r') as read_file:
-		
-		line = read_file.readline()
-		while line:
 
-			header_match = header_regex.match(line)
+	line = read_file.readline()
+	while line:
 
-			if header_match:
-				current_parent = line.strip()
+		header_match = header_regex.match(line)
 
-				(line, nested_description) = get_header_nested_parameter_values_description(read_file, header_regex, param_keyword_regex, param_regex, members_keyword_regex)
+		if header_match:
+			current_parent = line.strip()
+
+			(line, nested_description) = get_header_nested_parameter_values_description(read_file, header_regex, param_keyword_regex, param_regex, members_keyword_regex)
+		
+			if nested_description:
+				nested_description_list.append({ "parent": current_parent, "parameters": nested_description })
+		else: 
+			line = read_file.readline()
 			
-				if nested_description:
-					nested_description_list.append({ "parent": current_parent, "parameters": nested_description })
-			else: 
-				line = read_file.readline()
-				
-	return nested_description_list	
+	return nested_description_list
 
+
+def get_nested_parameter_values_description(filename):
+
+	with open(filename, 'r') as read_file:
+		return get_nested_parameter_values_description_from_file(read_file)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import re
+
+# Regular expressions used to parse the API specifications and the drafter output, compiled once.
+#
+# Every pattern runs in linear time on a line: quantified parts that can match the same characters
+# are never adjacent, and what must be found from the end of the line is located before the greedy
+# groups run, so a malformed line fails after a single pass instead of backtracking through every
+# way of splitting it. tests/test_apib_patterns.py checks it by timing every pattern on adversarial lines.
+
+# Sections of the API blueprint. [\s\S] matches any character, line ends included
+group_regex = re.compile(r"^#*[ ]Group([\s\S]*)$")
+# The lookahead checks the line ends with "]" before looking for the last " [" in it
+resource_regex = re.compile(r"^(?=[\s\S]*\]$)#*[ ]([\s\S]*) \[([\s\S]*)\]$")
+direct_URI_regex = re.compile(r"^#*[ ]([ ]*/[\s\S]*)$")
+heading_regex = re.compile(r"^(#+)[ ]")
+data_structures_regex = re.compile(r"^(#{1,2})[ ]Data Structures[ ]*$")
+# The patterns starting with (?=[^\n]*\n?\Z) only match single lines: the lookahead rejects a line
+# end before the last character at once, instead of retrying ".*$" from every split of the line
+header_regex = re.compile(r"^(?=[^\n]*\n?\Z)(#+)[ ]*(.*)$")
+
+# Parameters and their values
+param_keyword_regex = re.compile(r"^[+|-][ ]Parameters[ ]*$")
+param_regex = re.compile(r"^(?=[^\n]*\n?\Z)[ \t]*[+|-][ ]([^ \(\)]*)[ ][^\(\)]*\(.*\).*$")
+members_keyword_regex = re.compile(r"^([^+-]*)[+|-][ ]Members[ ]*$")
+member_regex = re.compile(r"^(?=[^\n]*\n?\Z)[ \t]*[+|-][ ]([^ +-]*)[ ]*-?(.*)$")
+blank_line_regex = re.compile(r"^ *$")
+
+# MSON property member declaration: "- name [: example] (type, attributes) - description".
+# The spaces around the example are matched by a single quantifier each, so a long run of
+# spaces can't be split between several of them.
+property_member_declaration_regex = re.compile(
+    r"^[ ]*[-|+][ ](?P<property_name>\w+)"
+    r"(?:(?:[ ]*[\[:]|[ ])[\w, ]*(?:\][ ]*)?\((?P<type_definition_list>[\s\S]+)\))?"
+    r"[ ]*(?:-(?P<property_description>[\s\S]+))?\Z")
+
+# Resource model references, like [Question][], point to models that may be defined in another group.
+# Only the first "[" after a "]" or a line start is tried, as any later one ends at the same "]".
+model_reference_regex = re.compile(r"(?:^|[\]\n])[^\[\]\n]*\[[^\]\n]+\]\[\]")
+
+# Links of the descriptions
+link_regex = re.compile(r"\[(?P<linkText>[^\(\)\[\]]*)\]\((?P<linkRef>[^\(\)\[\]]*)\)")
+auto_link_regex = re.compile(r"<(?P<linkRef>https?://[^\s<>]*)>")
+html_link_regex = re.compile(r"<a href=\"(?P<linkRef>https?://[^\"\n]*)\">(?P<linkText>[^<]*)</a>")
+
+# Annotations written by drafter to its standard error
+drafter_annotation_regex = re.compile(r'^(warning|error): \((\d+)\)\s*(.*?)(?:; line (\d+), column \d+.*)?$')
+annotation_line_regex = re.compile(r"\bline (\d+)")
+
+word_regex = re.compile(r"\w*")
+
+
+def split_markdown_header(markdown_header):
+    """Splits the title of a resource or action header in its name, method and URI template.
+
+    Same as matching "(.*) \[(\w*) (.*)\]" and then "(.*) \[(.*)\]", without trying every " ["
+    of the title against every "]" after it.
+
+    Arguments:
+    markdown_header -- Header title, without its leading "#"
+
+    Returns a (name, method, URI template) tuple, with None as method for resource headers, or None
+    if the title isn't a resource or action header.
+    """
+    line = markdown_header.split('\n', 1)[0]
+    end = line.rfind(']')
+    if end == -1:
+        return None
+
+    start = line.rfind(' [', 0, end)
+    while start != -1:
+        method_end = word_regex.match(line, start + 2).end()
+        if line[method_end] == ' ':
+            return (line[:start], line[start + 2:method_end], line[method_end + 1:end])
+        start = line.rfind(' [', 0, start)
+
+    start = line.rfind(' [', 0, end)
+    if start == -1:
+        return None
+
+    return (line[:start], None, line[start + 2:end])
+
+
+def get_pattern_uses():
+    """Returns the patterns of the registry as they are used by the parser, as functions of a line,
+    by name. Every pattern added to the registry must be added here too, so the tests time it."""
+    return OrderedDict([
+        ('group_regex', group_regex.match),
+        ('resource_regex', resource_regex.match),
+        ('direct_URI_regex', direct_URI_regex.match),
+        ('heading_regex', heading_regex.match),
+        ('data_structures_regex', data_structures_regex.match),
+        ('header_regex', header_regex.match),
+        ('param_keyword_regex', param_keyword_regex.match),
+        ('param_regex', param_regex.match),
+        ('members_keyword_regex', members_keyword_regex.match),
+        ('member_regex', member_regex.match),
+        ('blank_line_regex', blank_line_regex.match),
+        ('property_member_declaration_regex', property_member_declaration_regex.match),
+        ('model_reference_regex', model_reference_regex.search),
+        ('link_regex', link_regex.findall),
+        ('auto_link_regex', auto_link_regex.findall),
+        ('html_link_regex', html_link_regex.findall),
+        ('drafter_annotation_regex', drafter_annotation_regex.match),
+        ('annotation_line_regex', annotation_line_regex.findall),
+        ('split_markdown_header', split_markdown_header),
+    ])
+
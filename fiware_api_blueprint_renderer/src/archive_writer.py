@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+
+import hashlib
+import os
+import struct
+import tarfile
+import time
+import zipfile
+import zlib
+
+from output_writer import write_file_atomically
+
+ARCHIVE_FORMATS = ['zip', 'tar.gz']
+ARCHIVE_EXTENSIONS = [('.zip', 'zip'), ('.tar.gz', 'tar.gz'), ('.tgz', 'tar.gz')]
+
+# Format of the archives written to the standard output, which have no extension to tell it
+DEFAULT_STREAM_ARCHIVE_FORMAT = 'tar.gz'
+
+COMPRESSION_LEVEL = 6
+
+# Every file is compressed on its own and ended by a sync flush, which leaves the deflate stream
+# byte aligned and without any final block. Such pieces can be concatenated in a single stream, so
+# the compressed theme assets are cached and reused as they are in the zip entries and in the
+# gzip stream of a tar. The empty final block ends the stream.
+DEFLATE_FINAL_BLOCK = '\x03\x00'
+
+CACHED_FILE_EXTENSION = '.deflate'
+
+
+class CountingStream(object):
+    """Write-only file-like object counting the bytes written, so zipfile can write to a pipe"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.stream.flush()
+
+
+class GzipStream(object):
+    """Writes a single member gzip stream made of independently compressed deflate pieces"""
+
+    def __init__(self, stream, mtime):
+        self.stream = stream
+        self.crc = zlib.crc32('')
+        self.size = 0
+        self.stream.write('\x1f\x8b\x08\x00' + struct.pack('<L', int(mtime)) + '\x00\xff')
+
+    def write(self, data, compressed_data=None):
+        """Writes data to the stream, given its compressed piece (see compress) if it is already known"""
+        if compressed_data is None:
+            compressed_data = compress(data)
+        self.stream.write(compressed_data)
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+
+    def close(self):
+        self.stream.write(DEFLATE_FINAL_BLOCK + struct.pack('<LL', self.crc & 0xffffffff, self.size & 0xffffffff))
+        self.stream.flush()
+
+
+def compress(data):
+    """Compresses data as a byte aligned, not final, raw deflate piece"""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def get_archive_format(archive, archive_format=None):
+    """Returns the format of an archive, given explicitly or by the extension of its path.
+    Archives written to a file-like object default to DEFAULT_STREAM_ARCHIVE_FORMAT."""
+    if archive_format is not None:
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError("Unknown archive format: " + archive_format)
+        return archive_format
+
+    if hasattr(archive, 'write'):
+        return DEFAULT_STREAM_ARCHIVE_FORMAT
+
+    for (extension, extension_format) in ARCHIVE_EXTENSIONS:
+        if archive.endswith(extension):
+            return extension_format
+
+    raise ValueError("Unknown archive extension, use .zip, .tar.gz or .tgz: " + archive)
+
+
+def get_compressed_data(data, cache_dir_path, stats):
+    """Returns the compressed piece of some data, reusing the cached one if the same data was
+    compressed before. Without a cache directory, the data is compressed every time."""
+    if cache_dir_path is None:
+        stats['compressed'] += 1
+        return compress(data)
+
+    cached_file_path = os.path.join(cache_dir_path, "%s-%d%s" % (hashlib.sha1(data).hexdigest(), COMPRESSION_LEVEL, CACHED_FILE_EXTENSION))
+    try:
+        with open(cached_file_path, 'rb') as cached_file:
+            compressed_data = cached_file.read()
+        stats['cached'] += 1
+        return compressed_data
+    except IOError:
+        pass
+
+    compressed_data = compress(data)
+    write_file_atomically(cached_file_path, compressed_data)
+    stats['compressed'] += 1
+
+    return compressed_data
+
+
+def get_archive_entries(output_writer, root_dir_path):
+    """Returns the staged files of a build as (archive name, content, cacheable) tuples, sorted by name.
+    The files of the managed directories, the theme assets, are cacheable."""
+    root_dir_path = os.path.join(os.path.abspath(root_dir_path), '')
+    cached_dir_paths = [os.path.join(dir_path, '') for dir_path in output_writer.managed_dir_paths]
+
+    entries = []
+    for (path, content) in output_writer.files.iteritems():
+        if not path.startswith(root_dir_path):
+            raise ValueError(path + " is outside of the archived directory " + root_dir_path)
+
+        archive_name = path[len(root_dir_path):].replace(os.sep, '/')
+        entries.append((archive_name, content, any(path.startswith(dir_path) for dir_path in cached_dir_paths)))
+
+    return sorted(entries)
+
+
+def write_zip(entries, stream, mtime, cache_dir_path, stats):
+    """Writes archive entries as a zip file"""
+    stream = CountingStream(stream)
+    zip_file = zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED)
+
+    for (archive_name, content, cacheable) in entries:
+        compressed_data = get_compressed_data(content, cache_dir_path if cacheable else None, stats) + DEFLATE_FINAL_BLOCK
+
+        # zipfile would compress the content again, so the entry is written as zipfile.writestr does
+        zip_info = zipfile.ZipInfo(archive_name, time.localtime(mtime)[:6])
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+        zip_info.external_attr = 0644 << 16
+        zip_info.file_size = len(content)
+        zip_info.compress_size = len(compressed_data)
+        zip_info.CRC = zlib.crc32(content) & 0xffffffff
+        zip_info.header_offset = stream.tell()
+
+        stream.write(zip_info.FileHeader())
+        stream.write(compressed_data)
+        zip_file.filelist.append(zip_info)
+        zip_file.NameToInfo[archive_name] = zip_info
+
+    zip_file.close()
+
+
+def write_tar_gz(entries, stream, mtime, cache_dir_path, stats):
+    """Writes archive entries as a gzip compressed tar file"""
+    gzip_stream = GzipStream(stream, mtime)
+    tar_size = 0
+
+    for (archive_name, content, cacheable) in entries:
+        tar_info = tarfile.TarInfo(archive_name)
+        tar_info.size = len(content)
+        tar_info.mtime = int(mtime)
+        tar_info.mode = 0644
+
+        # The header of an entry comes with the padding of the previous one, as the cached
+        # pieces only hold the file contents
+        header = '\0' * (-tar_size % tarfile.BLOCKSIZE) + tar_info.tobuf(tarfile.GNU_FORMAT)
+        gzip_stream.write(header)
+        tar_size += len(header)
+
+        if content:
+            gzip_stream.write(content, get_compressed_data(content, cache_dir_path if cacheable else None, stats))
+            tar_size += len(content)
+
+    end_size = -tar_size % tarfile.BLOCKSIZE + 2 * tarfile.BLOCKSIZE
+    end_size += -(tar_size + end_size) % tarfile.RECORDSIZE
+    gzip_stream.write('\0' * end_size)
+    gzip_stream.close()
+
+
+def write_archive(output_writer, root_dir_path, archive, archive_format=None, cache_dir_path=None):
+    """Saves the files staged in an OutputWriter into a zip or tar.gz archive instead of the file system.
+
+    The files are archived with their paths relative to the root directory of the build. Theme
+    assets, the files of the directories managed by the build, are compressed once and cached by
+    their content, so archiving again the same assets only copies their compressed data.
+
+    Arguments:
+    output_writer -- OutputWriter with the staged files of the build, which is emptied
+    root_dir_path -- Directory of the build whose content is archived, nothing is written to it
+    archive -- Path of the archive, or file-like object to stream it to, like the standard output
+    archive_format -- 'zip' or 'tar.gz', by default given by the extension of the archive path
+    cache_dir_path -- Directory of the compressed theme assets, or None to compress them every time
+
+    Returns a dict with the number of 'files' archived, of files 'compressed' and of files taken
+    from the 'cached' compressed data.
+    """
+    archive_format = get_archive_format(archive, archive_format)
+    entries = get_archive_entries(output_writer, root_dir_path)
+    stats = {'files': len(entries), 'compressed': 0, 'cached': 0}
+    mtime = time.time()
+
+    if hasattr(archive, 'write'):
+        stream = archive
+    else:
+        archive_dir_path = os.path.dirname(os.path.abspath(archive))
+        if not os.path.exists(archive_dir_path):
+            os.makedirs(archive_dir_path)
+        stream = open(archive, 'wb')
+
+    try:
+        if archive_format == 'zip':
+            write_zip(entries, stream, mtime, cache_dir_path, stats)
+        else:
+            write_tar_gz(entries, stream, mtime, cache_dir_path, stats)
+    finally:
+        if stream is not archive:
+            stream.close()
+
+    output_writer.files.clear()
+    output_writer.managed_dir_paths = []
+
+    return stats
+
+
+def format_archive_summary(stats):
+    """Returns the summary of write_archive: how many files were archived and compressed"""
+    return "%d file(s) archived, %d compressed, %d from the compressed cache" % (stats['files'], stats['compressed'], stats['cached'])
@@ -0,0 +1,473 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+
+from output_writer import OutputWriter, write_file_atomically
+
+
+# Version of the cached manifest format, part of its cache key
+ASSET_MANIFEST_VERSION = 1
+
+# Manifest of the fingerprinted static files, saved in the rendered site
+FINGERPRINT_MANIFEST_FILE_NAME = 'asset-manifest.json'
+FINGERPRINT_LENGTH = 10
+
+stylesheet_tag_regex = re.compile(r'<link\b[^>]*\brel=["\']?stylesheet["\']?[^>]*>\s*', re.IGNORECASE)
+script_tag_regex = re.compile(r'<script\b[^>]*\bsrc=["\']([^"\']+)["\'][^>]*>\s*</script>\s*', re.IGNORECASE)
+href_regex = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+asset_reference_regex = re.compile(r'\b(href|src)(\s*=\s*)(["\'])([^"\']+)\3', re.IGNORECASE)
+
+css_comment_regex = re.compile(r'/\*.*?\*/', re.DOTALL)
+css_url_regex = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+css_content_codepoint_regex = re.compile(r'content\s*:\s*["\'][^"\']*?\\([0-9a-fA-F]{2,6})')
+css_font_face_src_regex = re.compile(r'url\(\s*["\']?([^"\')?#]+\.(?:woff|ttf|otf))')
+
+selector_pseudo_regex = re.compile(r'::?[\w-]+(\([^)]*\))?')
+selector_attribute_regex = re.compile(r'\[[^\]]*\]')
+selector_class_regex = re.compile(r'\.([\w-]+)')
+selector_id_regex = re.compile(r'#([\w-]+)')
+selector_tag_regex = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+
+html_tag_regex = re.compile(r'<([a-zA-Z][\w-]*)')
+html_class_regex = re.compile(r'\bclass\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+html_id_regex = re.compile(r'\bid\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+inline_script_regex = re.compile(r'<script\b[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+js_word_regex = re.compile(r'[\w-]+')
+
+# At-rules containing nested rules that can be pruned
+NESTED_AT_RULES = ('@media', '@supports', '@document')
+
+
+def is_local_asset(url):
+    """Tells if an asset URL is relative to the rendered page"""
+    return not re.match(r'^([a-zA-Z][\w+.-]*:|//|/)', url)
+
+
+def find_block_end(text, start):
+    """Returns the position after the brace closing the block opened at text[start]"""
+    depth = 0
+    position = start
+    quote = None
+
+    while position < len(text):
+        char = text[position]
+        if quote is not None:
+            if char == '\\':
+                position += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        position += 1
+
+    return len(text)
+
+
+def get_selector_requirements(selector):
+    """Returns the classes, ids and tags an element must have for the selector to match it.
+
+    Pseudo-classes and attribute selectors are ignored, so the requirements are a superset of the real matches.
+    """
+    simple_selector = selector_attribute_regex.sub('', selector_pseudo_regex.sub('', selector))
+
+    return [sorted(set(selector_class_regex.findall(simple_selector))),
+            sorted(set(selector_id_regex.findall(simple_selector))),
+            sorted(set(tag.lower() for tag in selector_tag_regex.findall(simple_selector)))]
+
+
+def parse_css(text):
+    """Parses a stylesheet into a list of items that can be pruned.
+
+    Every item is a dict with its 'type': 'rule' (selectors with their requirements and a body),
+    'nested' (an at-rule with nested items, such as @media) or 'raw' (any other at-rule, kept as is).
+    """
+    text = css_comment_regex.sub('', text)
+    items = []
+    position = 0
+
+    while position < len(text):
+        while position < len(text) and text[position] in ' \t\r\n;':
+            position += 1
+        if position >= len(text):
+            break
+
+        block_start = text.find('{', position)
+        if text[position] == '@':
+            statement_end = text.find(';', position)
+            if block_start == -1 or (statement_end != -1 and statement_end < block_start):
+                if statement_end == -1:
+                    statement_end = len(text) - 1
+                items.append({'type': 'raw', 'text': text[position:statement_end + 1].strip()})
+                position = statement_end + 1
+                continue
+
+            block_end = find_block_end(text, block_start)
+            prelude = text[position:block_start].strip()
+            if prelude.lower().startswith(NESTED_AT_RULES):
+                items.append({'type': 'nested', 'prelude': prelude,
+                              'items': parse_css(text[block_start + 1:block_end - 1])})
+            else:
+                items.append({'type': 'raw', 'text': text[position:block_end].strip()})
+            position = block_end
+            continue
+
+        if block_start == -1:
+            break
+
+        block_end = find_block_end(text, block_start)
+        selectors = [selector.strip() for selector in text[position:block_start].split(',') if selector.strip()]
+        items.append({'type': 'rule',
+                      'selectors': [[selector, get_selector_requirements(selector)] for selector in selectors],
+                      'body': text[block_start + 1:block_end - 1].strip()})
+        position = block_end
+
+    return items
+
+
+def selector_may_match(requirements, used_tokens):
+    """Tells if a selector may match an element of the page"""
+    (classes, ids, tags) = requirements
+    return (all(css_class in used_tokens['classes'] for css_class in classes)
+            and all(element_id in used_tokens['ids'] for element_id in ids)
+            and all(tag in used_tokens['tags'] for tag in tags))
+
+
+def serialize_css(items, used_tokens=None):
+    """Writes back a parsed stylesheet, keeping only the selectors that may match when used_tokens is given"""
+    output = []
+
+    for item in items:
+        if item['type'] == 'raw':
+            output.append(item['text'])
+        elif item['type'] == 'nested':
+            nested = serialize_css(item['items'], used_tokens)
+            if nested:
+                output.append(item['prelude'] + '{\n' + nested + '\n}')
+        else:
+            selectors = [selector for (selector, requirements) in item['selectors']
+                         if used_tokens is None or selector_may_match(requirements, used_tokens)]
+            if selectors:
+                output.append(','.join(selectors) + '{' + item['body'] + '}')
+
+    return '\n'.join(output)
+
+
+def get_used_tokens(html, scripts):
+    """Returns the classes, ids and tags used by a page.
+
+    Every word of its scripts is considered a class, id and tag too, since scripts may add them to the page.
+    """
+    classes = set()
+    for class_attribute in html_class_regex.findall(html):
+        classes.update(class_attribute.split())
+
+    used_tokens = {'classes': classes,
+                   'ids': set(html_id_regex.findall(html)),
+                   'tags': set(tag.lower() for tag in html_tag_regex.findall(html))}
+
+    for script in scripts:
+        words = set(js_word_regex.findall(script))
+        used_tokens['classes'].update(words)
+        used_tokens['ids'].update(words)
+        used_tokens['tags'].update(word.lower() for word in words)
+
+    return used_tokens
+
+
+def rebase_css_urls(css, source_dir_path, bundle_dir_path):
+    """Rewrites the relative url() of a stylesheet so they keep working from the bundle directory"""
+
+    def rebase(match):
+        url = match.group(2)
+        if not is_local_asset(url) or url.startswith('data:'):
+            return match.group(0)
+        rebased_url = os.path.relpath(os.path.join(source_dir_path, url), bundle_dir_path).replace(os.sep, '/')
+        return 'url(' + match.group(1) + rebased_url + match.group(1) + ')'
+
+    return css_url_regex.sub(rebase, css)
+
+
+def read_asset(template_dir_path, asset_url):
+    """Returns the contents of an asset of the theme given its URL relative to the page"""
+    with open(os.path.join(template_dir_path, asset_url.split('?')[0].split('#')[0]), 'r') as asset_file:
+        return asset_file.read().decode('utf-8')
+
+
+def get_stylesheets_manifest(template_dir_path, stylesheet_urls, cache_dir_path):
+    """Returns the parsed bundle of the given stylesheets, loading it from the cache when the
+    stylesheets have already been parsed.
+
+    Arguments:
+    template_dir_path -- path to the template directory
+    stylesheet_urls -- URLs of the stylesheets, relative to the page, in the page order
+    cache_dir_path -- directory of the asset manifests cache, or None to disable the cache
+    """
+    stylesheets = [(url, read_asset(template_dir_path, url)) for url in stylesheet_urls]
+
+    cache_key = hashlib.sha1(str(ASSET_MANIFEST_VERSION))
+    for (url, css) in stylesheets:
+        cache_key.update(url.encode('utf-8') + '\0' + css.encode('utf-8') + '\0')
+    manifest_path = None
+
+    if cache_dir_path is not None:
+        manifest_path = os.path.join(cache_dir_path, cache_key.hexdigest() + '.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as manifest_file:
+                return json.load(manifest_file)
+
+    items = []
+    for (url, css) in stylesheets:
+        items += parse_css(rebase_css_urls(css, os.path.dirname(url), 'css'))
+
+    if manifest_path is not None:
+        temp_manifest_path = manifest_path + '.%d.tmp' % os.getpid()
+        with open(temp_manifest_path, 'w') as manifest_file:
+            json.dump(items, manifest_file, separators=(',', ':'))
+        os.rename(temp_manifest_path, manifest_path)
+
+    return items
+
+
+def can_subset_fonts():
+    """Tells if fontTools, needed by subset_fonts, is installed"""
+    try:
+        import fontTools
+    except ImportError:
+        return False
+
+    return True
+
+
+def subset_fonts(css, dst_dir_path, cache_dir_path, output_writer):
+    """Subsets the fonts declared in a stylesheet to the glyphs used in its 'content' declarations
+    and rewrites the stylesheet to use the subset fonts.
+
+    Only icon fonts, whose glyphs are referenced from 'content' declarations, benefit from this.
+    The subsetting needs fontTools; the stylesheet is returned unchanged when it isn't installed,
+    see can_subset_fonts.
+
+    Arguments:
+    css -- bundled stylesheet, saved in dst_dir_path/css
+    dst_dir_path -- destination directory, where the fonts have already been copied
+    cache_dir_path -- directory of the subset fonts cache, or None to disable the cache
+    output_writer -- OutputWriter of the build, where the fonts are staged
+    """
+    import logging
+
+    try:
+        from fontTools import subset
+    except ImportError:
+        return css
+
+    logging.getLogger('fontTools').addHandler(logging.NullHandler())
+
+    codepoints = sorted(set(int(codepoint, 16) for codepoint in css_content_codepoint_regex.findall(css)))
+    if not codepoints:
+        return css
+
+    for font_url in sorted(set(css_font_face_src_regex.findall(css))):
+        font_path = os.path.normpath(os.path.join(dst_dir_path, 'css', font_url))
+        try:
+            font_content = output_writer.read(font_path)
+        except IOError:
+            continue
+
+        (font_base_path, font_extension) = os.path.splitext(font_path)
+        subset_font_path = font_base_path + '.subset' + font_extension
+
+        cache_key = hashlib.sha1(font_content + ','.join(str(codepoint) for codepoint in codepoints)).hexdigest()
+        cached_font_path = None
+        if cache_dir_path is not None:
+            cached_font_path = os.path.join(cache_dir_path, cache_key + font_extension)
+
+        if cached_font_path is not None and os.path.exists(cached_font_path):
+            output_writer.copy(cached_font_path, subset_font_path)
+        else:
+            options = subset.Options()
+            if font_extension == '.woff':
+                options.flavor = 'woff'
+            font = subset.load_font(io.BytesIO(font_content), options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+            subset_font_file = io.BytesIO()
+            subset.save_font(font, subset_font_file, options)
+            output_writer.write(subset_font_path, subset_font_file.getvalue())
+            if cached_font_path is not None:
+                # Other builds may read the cache at the same time
+                write_file_atomically(cached_font_path, subset_font_file.getvalue())
+
+        (font_url_base, _) = os.path.splitext(font_url)
+        css = css.replace(font_url, font_url_base + '.subset' + font_extension)
+
+    return css
+
+
+def bundle_page_assets(html, template_dir_path, dst_dir_path, page_name, prune_css=False, subset_icon_fonts=False, cache_dir_path=None,
+                       output_writer=None):
+    """Bundles the local stylesheets and scripts of a rendered page into one file per type.
+
+    The bundles are saved as css/<page_name>.bundle.css and js/<page_name>.bundle.js in the destination
+    directory, and the page is rewritten to load them instead of the original assets.
+
+    Arguments:
+    html -- Rendered page
+    template_dir_path -- path to the template directory, where the assets are read from
+    dst_dir_path -- Path to save the bundles, where the static files have already been copied
+    page_name -- Name of the rendered page, without extension
+    prune_css -- Remove the selectors that never match an element of the page
+    subset_icon_fonts -- Subset the icon fonts to the glyphs used by the bundled stylesheet
+    cache_dir_path -- directory of the asset cache, or None to disable the cache
+    output_writer -- OutputWriter of the build, or None to save the bundles right away
+
+    Returns the rewritten page.
+    """
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    stylesheet_urls = []
+    for tag in stylesheet_tag_regex.findall(html):
+        href = href_regex.search(tag)
+        if href and is_local_asset(href.group(1)):
+            stylesheet_urls.append(href.group(1))
+
+    script_urls = [url for url in script_tag_regex.findall(html) if is_local_asset(url)]
+    scripts = [read_asset(template_dir_path, url) for url in script_urls]
+
+    if script_urls:
+        script_bundle_url = 'js/' + page_name + '.bundle.js'
+        writer.write(os.path.join(dst_dir_path, script_bundle_url), u';\n'.join(scripts))
+        html = replace_asset_tags(html, script_tag_regex, script_urls, '<script src="%s"></script>\n' % script_bundle_url)
+
+    if stylesheet_urls:
+        items = get_stylesheets_manifest(template_dir_path, stylesheet_urls, cache_dir_path)
+        used_tokens = get_used_tokens(html, scripts + inline_script_regex.findall(html)) if prune_css else None
+        css = serialize_css(items, used_tokens)
+
+        if subset_icon_fonts:
+            css = subset_fonts(css, dst_dir_path, cache_dir_path, writer)
+
+        stylesheet_bundle_url = 'css/' + page_name + '.bundle.css'
+        writer.write(os.path.join(dst_dir_path, stylesheet_bundle_url), css)
+        html = replace_asset_tags(html, stylesheet_tag_regex, stylesheet_urls, '<link rel="stylesheet" href="%s">\n' % stylesheet_bundle_url)
+
+    if output_writer is None:
+        writer.commit()
+
+    return html
+
+
+def replace_asset_tags(html, tag_regex, asset_urls, bundle_tag):
+    """Replaces the first tag loading one of the given assets with the bundle tag, and removes the rest"""
+    state = {'replaced': False}
+
+    def replace(match):
+        if match.groups():
+            url = match.group(1)
+        else:
+            href = href_regex.search(match.group(0))
+            url = href.group(1) if href else None
+        if url not in asset_urls:
+            return match.group(0)
+        if state['replaced']:
+            return ''
+        state['replaced'] = True
+        return bundle_tag
+
+    return tag_regex.sub(replace, html)
+
+
+def split_asset_url(url):
+    """Splits an asset URL into its path and its query and fragment suffix"""
+    match = re.match(r'^([^?#]*)(.*)$', url)
+    return (match.group(1), match.group(2))
+
+
+def get_fingerprinted_path(relative_path, content):
+    """Returns the path of a static file with the hash of its content before the extension"""
+    (base_path, extension) = posixpath.splitext(relative_path)
+    return "%s.%s%s" % (base_path, hashlib.sha1(content).hexdigest()[:FINGERPRINT_LENGTH], extension)
+
+
+def rewrite_css_references(css, css_relative_path, asset_manifest):
+    """Rewrites the url() of a stylesheet pointing to fingerprinted files
+
+    Arguments:
+    css -- stylesheet contents
+    css_relative_path -- path of the stylesheet relative to the rendered site
+    asset_manifest -- dict with the fingerprinted path of every static file already renamed
+    """
+    css_dir_path = posixpath.dirname(css_relative_path)
+
+    def rewrite(match):
+        (url_path, url_suffix) = split_asset_url(match.group(2))
+        if not is_local_asset(url_path) or url_path.startswith('data:'):
+            return match.group(0)
+        asset_path = posixpath.normpath(posixpath.join(css_dir_path, url_path))
+        if asset_path not in asset_manifest:
+            return match.group(0)
+        fingerprinted_url = posixpath.relpath(asset_manifest[asset_path], css_dir_path)
+        return 'url(' + match.group(1) + fingerprinted_url + url_suffix + match.group(1) + ')'
+
+    return css_url_regex.sub(rewrite, css)
+
+
+def fingerprint_static_files(dst_dir_path, subdirectories, output_writer):
+    """Renames every static file of a rendered site to include a hash of its content, so they
+    can be served with far-future cache headers, and saves the manifest of the renamed files.
+
+    Stylesheets are renamed last, once their url() have been rewritten to the renamed fonts and images.
+
+    Arguments:
+    dst_dir_path -- rendered site directory, where the static files have already been copied
+    subdirectories -- static files directories, relative to dst_dir_path
+    output_writer -- OutputWriter of the build, where the static files are staged
+
+    Returns a dict with the fingerprinted path of every static file, relative to the site.
+    """
+    relative_paths = []
+    for subdirectory in subdirectories:
+        for file_path in output_writer.get_staged_paths(os.path.join(dst_dir_path, subdirectory)):
+            relative_paths.append(os.path.relpath(file_path, os.path.abspath(dst_dir_path)).replace(os.sep, '/'))
+
+    asset_manifest = OrderedDict()
+    for relative_path in sorted(relative_paths, key=lambda path: (path.endswith('.css'), path)):
+        file_path = os.path.join(dst_dir_path, relative_path)
+        content = output_writer.read(file_path)
+
+        if relative_path.endswith('.css'):
+            content = rewrite_css_references(content.decode('utf-8'), relative_path, asset_manifest).encode('utf-8')
+
+        fingerprinted_path = get_fingerprinted_path(relative_path, content)
+        output_writer.write(os.path.join(dst_dir_path, fingerprinted_path), content)
+        output_writer.remove(file_path)
+
+        asset_manifest[relative_path] = fingerprinted_path
+
+    output_writer.write(os.path.join(dst_dir_path, FINGERPRINT_MANIFEST_FILE_NAME), json.dumps(asset_manifest, indent=4))
+
+    return asset_manifest
+
+
+def rewrite_asset_references(html, asset_manifest):
+    """Rewrites the href and src attributes of a page pointing to fingerprinted files"""
+
+    def rewrite(match):
+        (url_path, url_suffix) = split_asset_url(match.group(4))
+        asset_path = posixpath.normpath(url_path) if is_local_asset(url_path) and url_path else None
+        if asset_path not in asset_manifest:
+            return match.group(0)
+        return match.group(1) + match.group(2) + match.group(3) + asset_manifest[asset_path] + url_suffix + match.group(3)
+
+    return asset_reference_regex.sub(rewrite, html)
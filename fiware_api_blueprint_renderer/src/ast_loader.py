@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+from decimal import Decimal
+import io
+import json
+
+# Members of the drafter AST that no stage of the pipeline nor template reads. The model of a
+# resource is repeated in the requests and responses using it, and source maps are only output
+# on request. Line numbers for the diagnostics come from the drafter annotations instead.
+PRUNED_MEMBERS = frozenset(['model', 'sourcemap', 'sourceMap'])
+
+# Elements of the payload contents that no stage reads: the assets repeat the body and schema of
+# their payload
+PRUNED_ELEMENTS = frozenset(['asset'])
+
+START_EVENTS = ('start_map', 'start_array')
+END_EVENTS = ('end_map', 'end_array')
+
+
+def prune_ast_object(ast_object):
+    """Drops the pruned elements of the content of an AST object, as soon as it is built"""
+    content = ast_object.get('content')
+    if isinstance(content, list):
+        ast_object['content'] = [element for element in content
+                                 if not (isinstance(element, dict) and element.get('element') in PRUNED_ELEMENTS)]
+
+    return ast_object
+
+
+def build_ast_object(pairs):
+    """object_pairs_hook of json.load building the AST objects without their pruned members"""
+    return prune_ast_object(dict(pair for pair in pairs if pair[0] not in PRUNED_MEMBERS))
+
+
+def build_ast_from_events(events):
+    """Builds the AST from the events of ijson.parse, skipping the pruned members without building them"""
+    root = None
+    containers = []
+    key = None
+    skipped_depth = 0
+    skip_value = False
+
+    for (_, event, value) in events:
+        if skipped_depth:
+            if event in START_EVENTS:
+                skipped_depth += 1
+            elif event in END_EVENTS:
+                skipped_depth -= 1
+            continue
+
+        if event == 'map_key':
+            key = value
+            skip_value = value in PRUNED_MEMBERS
+            continue
+
+        if skip_value:
+            skip_value = False
+            if event in START_EVENTS:
+                skipped_depth = 1
+            continue
+
+        if event in START_EVENTS:
+            # Containers are added to their parent once complete, so the pruning sees their content
+            containers.append(({} if event == 'start_map' else [], key))
+            continue
+
+        if event in END_EVENTS:
+            (value, key) = containers.pop()
+            if isinstance(value, dict):
+                value = prune_ast_object(value)
+        elif isinstance(value, Decimal):
+            value = float(value)
+
+        if not containers:
+            root = value
+        elif isinstance(containers[-1][0], dict):
+            containers[-1][0][key] = value
+        else:
+            containers[-1][0].append(value)
+
+    return root
+
+
+def load_api_blueprint_ast(AST_file):
+    """Loads the JSON AST output by drafter without the members and elements the pipeline doesn't use.
+
+    With ijson installed, the AST is parsed incrementally as it is read, and the pruned members
+    are skipped without being built, so the memory used grows with the rendered content rather
+    than with the whole AST. Otherwise it is parsed with json.load, pruning every object as it is built.
+
+    Arguments:
+    AST_file -- File-like object to read the AST from, like the standard output of drafter
+
+    Raises ValueError if the AST isn't valid JSON.
+    """
+    try:
+        import ijson
+    except ImportError:
+        return json.load(AST_file, object_pairs_hook=build_ast_object)
+
+    try:
+        return build_ast_from_events(ijson.parse(AST_file))
+    except ijson.JSONError as e:
+        raise ValueError("Invalid drafter AST: %s" % e)
+
+
+def loads_api_blueprint_ast(AST):
+    """Same as load_api_blueprint_ast, for an AST already read"""
+    return load_api_blueprint_ast(io.BytesIO(AST))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+
+from subprocess import Popen, PIPE
+import sys
+
+import apib_patterns
+import ast_loader
+
+# Blueprints shorter than this are parsed by a single drafter process
+MIN_SHARDED_LINES = 2000
+
+
+def get_data_structures_ranges(API_blueprint_lines):
+    """Returns the (first, last) line index ranges of the "# Data Structures" and "## Data Structures"
+    sections of an API blueprint. A section ends at the next heading of its level or above."""
+    ranges = []
+    section_first = section_level = None
+
+    for (index, line) in enumerate(API_blueprint_lines):
+        heading = apib_patterns.heading_regex.match(line)
+        if not heading:
+            continue
+
+        if section_first is not None and len(heading.group(1)) <= section_level:
+            ranges.append((section_first, index))
+            section_first = None
+
+        data_structures_heading = apib_patterns.data_structures_regex.match(line)
+        if section_first is None and data_structures_heading:
+            (section_first, section_level) = (index, len(data_structures_heading.group(1)))
+
+    if section_first is not None:
+        ranges.append((section_first, len(API_blueprint_lines)))
+
+    return ranges
+
+
+def split_api_blueprint_groups(API_blueprint_lines):
+    """Splits the lines of an API blueprint at its "# Group" headings.
+
+    Arguments:
+    API_blueprint_lines -- Lines of the API blueprint, with their line ends
+
+    Returns a tuple with the header lines, shared by every shard, the list of (first, last) line index
+    ranges of every group, and the list of ranges of the Data Structures sections after the header,
+    which every shard needs too, as named types can be referenced from any group. Returns None when
+    the blueprint can't be split: when it has less than two groups, when resources are defined before
+    the first group, or when it uses resource models, which can be referenced from other groups.
+    """
+    if apib_patterns.model_reference_regex.search(''.join(API_blueprint_lines)):
+        return None
+
+    data_structures_ranges = get_data_structures_ranges(API_blueprint_lines)
+    data_structures_lines = set(index for (first, last) in data_structures_ranges for index in range(first, last))
+
+    group_starts = [index for (index, line) in enumerate(API_blueprint_lines)
+                    if line.startswith('#') and apib_patterns.group_regex.match(line) and index not in data_structures_lines]
+    if len(group_starts) < 2:
+        return None
+
+    header_lines = API_blueprint_lines[:group_starts[0]]
+
+    for (index, line) in enumerate(header_lines):
+        if index not in data_structures_lines and (apib_patterns.resource_regex.match(line) or apib_patterns.direct_URI_regex.match(line)):
+            return None
+
+    group_ranges = zip(group_starts, group_starts[1:] + [len(API_blueprint_lines)])
+    group_data_structures_ranges = [(first, last) for (first, last) in data_structures_ranges if first >= group_starts[0]]
+
+    return (header_lines, group_ranges, group_data_structures_ranges)
+
+
+def get_shards(header_lines, group_ranges, shard_count):
+    """Distributes the groups of an API blueprint in shards of consecutive groups with a similar number of lines.
+
+    Returns a list of shards, every one a list of (first, last) line index ranges.
+    """
+    total_lines = sum(last - first for (first, last) in group_ranges)
+    shard_target_lines = float(total_lines) / shard_count
+
+    shards = [[]]
+    shard_lines = 0
+    for (first, last) in group_ranges:
+        if shards[-1] and shard_lines >= shard_target_lines and len(shards) < shard_count:
+            shards.append([])
+            shard_lines = 0
+        shards[-1].append((first, last))
+        shard_lines += last - first
+
+    return shards
+
+
+def run_drafter(API_blueprint):
+    """Parses an API blueprint with drafter, returning its output, its standard error and its exit code"""
+    drafter = Popen(["drafter", "--format", "json", "--use-line-num"], stdin=PIPE, stdout=PIPE, stderr=PIPE)
+    (output, errors) = drafter.communicate(API_blueprint)
+
+    return (output, errors, drafter.returncode)
+
+
+def translate_annotations(errors, shard_line_numbers, shared_line_numbers, written_lines):
+    """Rewrites the line numbers of the drafter annotations of a shard to the ones of the whole blueprint.
+
+    Annotations of the lines the shard shares with other shards are only kept for the shard reporting
+    them, and lines without line numbers are only kept once.
+
+    Arguments:
+    errors -- Standard error of the drafter process of the shard
+    shard_line_numbers -- Line number in the whole blueprint of every line of the shard
+    shared_line_numbers -- Set of the line numbers of the shard whose annotations another shard reports
+    written_lines -- Set of the lines without line numbers already written
+    """
+    translated_lines = []
+
+    for line in errors.splitlines(True):
+        line_numbers = [int(line_number) for line_number in apib_patterns.annotation_line_regex.findall(line)]
+        if line_numbers and all(line_number in shared_line_numbers for line_number in line_numbers):
+            continue
+        if not line_numbers:
+            if line in written_lines:
+                continue
+            written_lines.add(line)
+
+        def translate(match):
+            index = int(match.group(1)) - 1
+            if 0 <= index < len(shard_line_numbers):
+                return "line %d" % shard_line_numbers[index]
+            return match.group(0)
+
+        translated_lines.append(apib_patterns.annotation_line_regex.sub(translate, line))
+
+    return ''.join(translated_lines)
+
+
+def merge_shard_asts(shard_asts, copied_section_counts):
+    """Merges the ASTs of the shards of an API blueprint into the AST of the whole blueprint.
+
+    Every shard has the same metadata, name, description and header content, so they are taken from
+    the first shard. The elements of the Data Structures sections copied at the end of a shard are
+    dropped, as the shard holding them reports them in place. Resource groups are concatenated in
+    order, and every shard content is added after skipping the elements it shares with the first shard.
+
+    Arguments:
+    shard_asts -- ASTs of the shards, in order
+    copied_section_counts -- Number of Data Structures sections copied at the end of every shard
+    """
+    for (shard_ast, copied_section_count) in zip(shard_asts, copied_section_counts):
+        if copied_section_count:
+            del shard_ast['content'][-copied_section_count:]
+
+    merged_ast = shard_asts[0]
+
+    for shard_ast in shard_asts[1:]:
+        merged_ast['resourceGroups'] += shard_ast['resourceGroups']
+
+        shared_content_count = 0
+        for (element, first_shard_element) in zip(shard_ast.get('content', []), shard_asts[0].get('content', [])):
+            if element != first_shard_element:
+                break
+            shared_content_count += 1
+        merged_ast.setdefault('content', []).extend(shard_ast.get('content', [])[shared_content_count:])
+
+    return merged_ast
+
+
+def parse_api_blueprint_shards(API_blueprint, jobs=None):
+    """Parses a large API blueprint with several concurrent drafter processes, one for every shard of
+    consecutive resource groups, and merges their results.
+
+    Every shard is made of the blueprint header (metadata, description and data structures) followed by
+    some of its groups, and then by the Data Structures sections of the other groups, so the named types
+    resolve as in a single drafter run wherever they are defined. The drafter annotations are written to the standard error with the line numbers
+    of the whole blueprint.
+
+    Arguments:
+    API_blueprint -- API Blueprint definition text
+    jobs -- Number of drafter processes, by default the number of CPUs
+
+    Returns the JSON object of the API, or None if the blueprint is small or can't be split, so it
+    must be parsed by a single drafter process.
+    """
+    import multiprocessing
+    from multiprocessing.pool import ThreadPool
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+
+    API_blueprint_lines = API_blueprint.splitlines(True)
+    if jobs <= 1 or len(API_blueprint_lines) < MIN_SHARDED_LINES:
+        return None
+
+    split_blueprint = split_api_blueprint_groups(API_blueprint_lines)
+    if split_blueprint is None:
+        return None
+    (header_lines, group_ranges, data_structures_ranges) = split_blueprint
+
+    shards = get_shards(header_lines, group_ranges, min(jobs, len(group_ranges)))
+
+    shard_texts = []
+    shards_line_numbers = []
+    shards_shared_line_numbers = []
+    copied_section_counts = []
+    for (shard_index, shard) in enumerate(shards):
+        copied_ranges = [(first, last) for (first, last) in data_structures_ranges
+                         if not any(group_first <= first < group_last for (group_first, group_last) in shard)]
+
+        shard_line_numbers = range(1, len(header_lines) + 1)
+        for (first, last) in shard + copied_ranges:
+            shard_line_numbers += range(first + 1, last + 1)
+        shards_line_numbers.append(shard_line_numbers)
+
+        # The first shard reports the annotations of the header, and the owner of every copied
+        # section the ones of the section
+        shared_line_numbers = set(range(len(shard_line_numbers) - sum(last - first for (first, last) in copied_ranges) + 1,
+                                        len(shard_line_numbers) + 1))
+        if shard_index > 0:
+            shared_line_numbers.update(range(1, len(header_lines) + 1))
+        shards_shared_line_numbers.append(shared_line_numbers)
+
+        copied_section_counts.append(len(copied_ranges))
+        shard_texts.append(''.join(header_lines + [line for (first, last) in shard + copied_ranges for line in API_blueprint_lines[first:last]]))
+
+    pool = ThreadPool(len(shards))
+    try:
+        results = pool.map(run_drafter, shard_texts, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    shard_asts = []
+    written_lines = set()
+    for (shard_index, (output, errors, returncode)) in enumerate(results):
+        sys.stderr.write(translate_annotations(errors, shards_line_numbers[shard_index], shards_shared_line_numbers[shard_index],
+                                               written_lines))
+
+        if returncode != 0:
+            raise RuntimeError("drafter failed to parse shard %d of the API blueprint (exit code %d)" % (shard_index + 1, returncode))
+
+        shard_asts.append(ast_loader.loads_api_blueprint_ast(output))
+
+    return merge_shard_asts(shard_asts, copied_section_counts)
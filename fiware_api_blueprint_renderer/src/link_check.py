@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import httplib
+import json
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+import urllib
+import urlparse
+from multiprocessing.pool import ThreadPool
+
+import renderer
+
+
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+DEFAULT_THREADS = 8
+DEFAULT_TIMEOUT = 10
+DEFAULT_REQUESTS_PER_SECOND = 5
+MAX_REDIRECTS = 5
+
+CACHE_FILE_NAME = 'links.json'
+
+# Characters kept as they are when an URL is converted to the URI sent in a request: the reserved
+# characters of RFC 3986 that can be written in a path or a query, and the escapes already in it
+URI_SAFE_CHARACTERS = "/%:@!$&'()*+,;=?~"
+
+
+def get_links_by_location(API_specification_path):
+    """Returns every link of an API specification with the line where it is written.
+
+    The links are found with the same expressions used to build the reference links section.
+
+    Arguments:
+    API_specification_path -- Path to API Blueprint specification
+
+    Returns a list of dicts with the file, line, title and url of every link.
+    """
+    links = []
+
+    with open(API_specification_path, 'rU') as API_specification_file:
+        for line_number, line in enumerate(API_specification_file, 1):
+            for link in renderer.get_links_from_description(renderer.to_unicode(line)):
+                link_location = OrderedDict()
+                link_location['file'] = API_specification_path
+                link_location['line'] = line_number
+                link_location['title'] = link['title']
+                link_location['url'] = link['url'].strip()
+                links.append(link_location)
+
+    return links
+
+
+def is_checkable_url(url):
+    """Tells if an URL points to a HTTP resource that can be checked"""
+    return urlparse.urlsplit(url).scheme in ('http', 'https')
+
+
+def get_request_uri(url):
+    """Returns the path and query of an URL as sent in a request. The characters that can't be
+    written in an URI, like the non-ASCII ones of an IRI, are percent-encoded as UTF-8."""
+    split_url = urlparse.urlsplit(url)
+    path = split_url.path or '/'
+    if split_url.query:
+        path += '?' + split_url.query
+
+    if isinstance(path, unicode):
+        path = path.encode('utf-8')
+
+    return urllib.quote(path, safe=URI_SAFE_CHARACTERS)
+
+
+def load_links_cache(cache_file_path, ttl):
+    """Loads the results of previous checks that haven't expired yet
+
+    Arguments:
+    cache_file_path -- Path to the cache file
+    ttl -- Seconds a result is valid
+    """
+    try:
+        with open(cache_file_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, ValueError):
+        return {}
+
+    now = time.time()
+    return dict((url, result) for url, result in cache.iteritems() if now - result['checked_at'] < ttl)
+
+
+def save_links_cache(cache_file_path, cache):
+    """Saves the results of the checks, replacing the cache file atomically
+
+    Arguments:
+    cache_file_path -- Path to the cache file
+    cache -- Dict with the result of every checked URL
+    """
+    (fd, temp_file_path) = tempfile.mkstemp(dir=os.path.dirname(cache_file_path))
+    with os.fdopen(fd, 'w') as temp_file:
+        json.dump(cache, temp_file, separators=(',', ':'), sort_keys=True)
+    os.rename(temp_file_path, cache_file_path)
+
+
+class HostConnection(object):
+    """Persistent connection to a HTTP host, reused by every request sent to it and
+    limited to a number of requests per second."""
+
+    def __init__(self, scheme, netloc, timeout, requests_per_second):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0
+        self.last_request_time = 0
+        self.connection = None
+
+    def connect(self):
+        if self.scheme == 'https':
+            self.connection = httplib.HTTPSConnection(self.netloc, timeout=self.timeout)
+        else:
+            self.connection = httplib.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def wait_rate_limit(self):
+        elapsed = time.time() - self.last_request_time
+        if elapsed < self.min_interval:
+            time.sleep(self.min_interval - elapsed)
+        self.last_request_time = time.time()
+
+    def send(self, method, path):
+        """Sends a request and returns the status, reason and location of the response,
+        reconnecting once if the server closed the kept alive connection"""
+        for attempt in range(2):
+            if self.connection is None:
+                self.connect()
+
+            self.wait_rate_limit()
+            try:
+                self.connection.request(method, path, headers={'User-Agent': 'fabre-link-checker'})
+                response = self.connection.getresponse()
+                response.read()
+            except (httplib.HTTPException, socket.error):
+                self.close()
+                if attempt == 1:
+                    raise
+                continue
+
+            if response.getheader('connection', '').lower() == 'close':
+                self.close()
+
+            return (response.status, response.reason, response.getheader('location'))
+
+    def check(self, url):
+        """Checks an URL of this host. Returns the status and reason of the response."""
+        path = get_request_uri(url)
+
+        (status, reason, location) = self.send('HEAD', path)
+        if status in (405, 501):
+            (status, reason, location) = self.send('GET', path)
+
+        return (status, reason, location)
+
+
+def check_host_urls(host_urls, timeout, requests_per_second):
+    """Checks the URLs of a single host over one persistent connection.
+
+    Redirections are followed with a separate connection when they point to another host.
+
+    Arguments:
+    host_urls -- List of URLs sharing scheme and host
+
+    Returns a dict with the result of every URL.
+    """
+    results = {}
+
+    split_url = urlparse.urlsplit(host_urls[0])
+    connection = HostConnection(split_url.scheme, split_url.netloc, timeout, requests_per_second)
+
+    try:
+        for url in host_urls:
+            result = OrderedDict()
+            current_url = url
+            current_connection = connection
+            try:
+                for redirect in range(MAX_REDIRECTS + 1):
+                    (status, reason, location) = current_connection.check(current_url)
+                    if status not in (301, 302, 303, 307, 308) or not location:
+                        break
+
+                    if current_connection is not connection:
+                        current_connection.close()
+
+                    current_url = urlparse.urljoin(current_url, location)
+                    split_url = urlparse.urlsplit(current_url)
+                    if (split_url.scheme, split_url.netloc) == (connection.scheme, connection.netloc):
+                        current_connection = connection
+                    else:
+                        current_connection = HostConnection(split_url.scheme, split_url.netloc, timeout, requests_per_second)
+                else:
+                    raise ValueError("Too many redirections")
+
+                result['status'] = status
+                result['reason'] = reason
+                result['ok'] = status < 400
+            except (httplib.HTTPException, socket.error, ssl.SSLError, ValueError), e:
+                result['status'] = None
+                result['reason'] = str(e) or e.__class__.__name__
+                result['ok'] = False
+            finally:
+                if current_connection is not connection:
+                    current_connection.close()
+
+            result['checked_at'] = time.time()
+            results[url] = result
+    finally:
+        connection.close()
+
+    return results
+
+
+def check_urls(urls, cache_dir_path=None, ttl=DEFAULT_CACHE_TTL, threads=DEFAULT_THREADS,
+               timeout=DEFAULT_TIMEOUT, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+    """Checks a list of URLs concurrently, one thread per host at most.
+
+    Results are kept in an on-disk cache, so URLs checked less than ttl seconds ago are not requested again.
+    Network errors are not cached.
+
+    Arguments:
+    urls -- URLs to be checked
+    cache_dir_path -- Cache root directory, by default the fabre cache directory
+    ttl -- Seconds a cached result is valid
+    threads -- Maximum number of hosts checked at the same time
+    timeout -- Seconds to wait for every connection and response
+    requests_per_second -- Maximum requests per second sent to each host
+
+    Returns a dict with the result of every URL.
+    """
+    cache_file_path = os.path.join(renderer.get_cache_directory('links', cache_dir_path), CACHE_FILE_NAME)
+    cache = load_links_cache(cache_file_path, ttl)
+
+    urls_by_host = OrderedDict()
+    for url in urls:
+        if url in cache:
+            continue
+        split_url = urlparse.urlsplit(url)
+        urls_by_host.setdefault((split_url.scheme, split_url.netloc.lower()), []).append(url)
+
+    results = dict((url, cache[url]) for url in urls if url in cache)
+
+    if urls_by_host:
+        lock = threading.Lock()
+
+        def check_host(host_urls):
+            host_results = check_host_urls(host_urls, timeout, requests_per_second)
+            with lock:
+                results.update(host_results)
+
+        pool = ThreadPool(max(1, min(threads, len(urls_by_host))))
+        try:
+            pool.map(check_host, urls_by_host.values(), chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+        for url, result in results.iteritems():
+            if result['status'] is not None:
+                cache[url] = result
+        save_links_cache(cache_file_path, cache)
+
+    return results
+
+
+def check_api_specifications_links(API_specification_paths, cache_dir_path=None, ttl=DEFAULT_CACHE_TTL,
+                                   threads=DEFAULT_THREADS, timeout=DEFAULT_TIMEOUT):
+    """Checks the links of several API specifications, requesting every unique URL once.
+
+    Arguments:
+    API_specification_paths -- Paths to the API Blueprint specifications
+    cache_dir_path -- Cache root directory, by default the fabre cache directory
+    ttl -- Seconds a cached result is valid
+    threads -- Maximum number of hosts checked at the same time
+    timeout -- Seconds to wait for every connection and response
+
+    Returns the list of links found, with the result of their check.
+    """
+    links = []
+    for API_specification_path in API_specification_paths:
+        links += [link for link in get_links_by_location(API_specification_path) if is_checkable_url(link['url'])]
+
+    unique_urls = list(OrderedDict.fromkeys(link['url'] for link in links))
+    results = check_urls(unique_urls, cache_dir_path, ttl, threads, timeout)
+
+    for link in links:
+        result = results[link['url']]
+        link['ok'] = result['ok']
+        link['status'] = result['status']
+        link['reason'] = result['reason']
+
+    return links
+
+
+def format_broken_link(link):
+    """Returns a broken link formatted as a compiler message: file:line: error: message"""
+    if link['status'] is not None:
+        problem = "%d %s" % (link['status'], link['reason'])
+    else:
+        problem = link['reason']
+
+    return u"%s:%d: error: broken link %s (%s)" % (renderer.to_unicode(link['file']), link['line'], link['url'], renderer.to_unicode(problem))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+import re
+
+# Python Markdown converts about 400 KB of prose per second and core with the tables and fenced
+# code extensions, but tables are much slower: every row costs as much as about 140 characters of
+# prose. The conversion cost of a text is estimated as its length plus the cost of its table rows.
+TABLE_ROW_COST = 140
+
+# Conversion cost of the Markdown texts of a specification under which they are converted by the
+# rendering process itself. Starting a pool and handing it the texts takes about 120 ms, so a pool
+# of two processes only pays off from about 100 KB of prose on.
+MIN_PARALLEL_MARKDOWN_COST = 100 * 1024
+
+# Chunks handed to every process of the pool, so a chunk with a few large tables doesn't keep the
+# other processes waiting
+CHUNKS_PER_JOB = 4
+
+# Number of processes converting the Markdown texts, None for the number of CPUs. Set by the
+# --markdown-jobs option of the command line tool.
+default_jobs = None
+
+table_row_regex = re.compile(r'^[ \t]*\|', re.MULTILINE)
+
+
+def get_conversion_cost(text):
+    """Returns the estimated conversion cost of a Markdown text, see TABLE_ROW_COST"""
+    return len(text) + TABLE_ROW_COST * len(table_row_regex.findall(text))
+
+
+def convert_markdown_chunk(chunk):
+    """Converts a chunk of Markdown texts, given as (extensions, text) tuples, returning their HTML in the same order"""
+    import markdown
+
+    return [markdown.markdown(text, extensions=list(extensions)) for (extensions, text) in chunk]
+
+
+def get_chunks(markdown_texts, costs, chunk_count):
+    """Splits a list of (extensions, text) tuples in up to chunk_count runs of consecutive texts of similar total conversion cost"""
+    chunk_target_cost = float(sum(costs)) / chunk_count
+
+    chunks = [[]]
+    chunk_cost = 0
+    for (markdown_text, cost) in zip(markdown_texts, costs):
+        if chunks[-1] and chunk_cost >= chunk_target_cost and len(chunks) < chunk_count:
+            chunks.append([])
+            chunk_cost = 0
+        chunks[-1].append(markdown_text)
+        chunk_cost += cost
+
+    return chunks
+
+
+def convert_markdown_texts(markdown_texts, jobs=None, min_parallel_cost=MIN_PARALLEL_MARKDOWN_COST):
+    """Converts a batch of Markdown texts to HTML, in parallel when they are costly enough.
+
+    The texts are split in chunks of consecutive texts converted by a pool of processes, and their
+    HTML is put back in the order of the texts, so the result doesn't depend on the number of processes.
+    Texts whose total conversion cost (see get_conversion_cost) is under min_parallel_cost are converted
+    one after another by this process, as they are when it is a worker of a pool itself, which can't
+    start processes of its own.
+
+    Arguments:
+    markdown_texts -- List of (extensions, text) tuples, with the names of the Python Markdown extensions to use
+    jobs -- Number of processes, by default default_jobs
+    min_parallel_cost -- Total conversion cost of the texts under which they are converted without a pool
+
+    Returns the list of the HTML of the texts, in the same order.
+    """
+    import multiprocessing
+
+    if jobs is None:
+        jobs = default_jobs if default_jobs is not None else multiprocessing.cpu_count()
+
+    if jobs <= 1 or len(markdown_texts) < 2 or multiprocessing.current_process().daemon:
+        return convert_markdown_chunk(markdown_texts)
+
+    costs = [get_conversion_cost(text) for (extensions, text) in markdown_texts]
+    if sum(costs) < min_parallel_cost:
+        return convert_markdown_chunk(markdown_texts)
+
+    chunks = get_chunks(markdown_texts, costs, jobs * CHUNKS_PER_JOB)
+
+    # The extensions are imported before the pool forks, so its processes don't import them again
+    convert_markdown_chunk([(extensions, u'') for extensions in set(extensions for (extensions, text) in markdown_texts)])
+
+    pool = multiprocessing.Pool(min(jobs, len(chunks)))
+    try:
+        converted_chunks = pool.map(convert_markdown_chunk, chunks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    return [html for converted_chunk in converted_chunks for html in converted_chunk]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+import re
+
+
+# Ids used by the templates for their fixed sections
+RESERVED_IDS = ['toc', 'TOC-container', 'API-content', 'search', 'search-input', 'search-results', 'site-index-link', 'abstract',
+                'common-payload-definition', 'API_specification', 'examples', 'references']
+
+# Formats of the anchors derived from the id of every resource group, resource and action
+RESOURCE_GROUP_ANCHOR_FORMATS = ("h-%s", "%s_example", "h-%s_example")
+RESOURCE_ANCHOR_FORMATS = ("h-%s", "%s_example", "h-%s_example")
+ACTION_ANCHOR_FORMATS = ("h-%s", "%s_body", "%s_examples", "h-%s_examples", "%s_examples_body")
+
+
+def get_unique_id(base_id, used_ids, anchor_formats=()):
+    """Returns the given id, or the first "<id>-<n>" not used yet, and marks it as used
+
+    Arguments:
+    base_id -- Desired id
+    used_ids -- Set of the ids already used in the document
+    anchor_formats -- Formats of the anchors derived from the id, like "h-%s". The id is only
+                      returned if its anchors aren't used either, and they are marked as used too.
+    """
+    unique_id = base_id
+    suffix = 2
+    while unique_id in used_ids or any(anchor_format % unique_id in used_ids for anchor_format in anchor_formats):
+        unique_id = "%s-%d" % (base_id, suffix)
+        suffix += 1
+
+    used_ids.add(unique_id)
+    used_ids.update(anchor_format % unique_id for anchor_format in anchor_formats)
+    return unique_id
+
+
+def apiary_slug(text):
+    """Returns the slug Apiary uses in its reference links"""
+    return text.lower().replace(' ', '-')
+
+
+def get_apiary_project(json_content):
+    """Returns the Apiary project declared in the metadata of the API, or None"""
+    for metadata_section in json_content.get('metadata', []):
+        if metadata_section['name'] == "APIARY_PROJECT":
+            return metadata_section['value']
+
+    return None
+
+
+def get_apiary_link(apiary_project, resource_group, resource, action):
+    """Returns the link to an action in the Apiary documentation of the API"""
+    if len(resource["name"]) > 0:
+        resource_slug = apiary_slug(resource["name"])
+    else:
+        resource_slug = re.sub(r'[/{}.]', '', apiary_slug(resource["uriTemplate"]))
+    resource_slug = resource_slug.replace("*", "")
+
+    if len(action["name"]) > 0:
+        action_slug = apiary_slug(action["name"])
+    else:
+        action_slug = apiary_slug(action["method"])
+
+    group_slug = apiary_slug(resource_group["name"] or "Default")
+
+    return "http://docs.%s.apiary.io/#reference/%s/%s/%s" % (apiary_project, group_slug, resource_slug, action_slug)
+
+
+def get_action_toc_title(action, resource):
+    """Returns the text of an action entry in the table of contents"""
+    if action["name"]:
+        return action["method"] + " - " + action["name"]
+    elif action["attributes"]["uriTemplate"]:
+        return action["method"] + " - " + action["attributes"]["uriTemplate"]
+    elif resource.get("ignoreTOC"):
+        return action["method"] + " - " + resource["uriTemplate"]
+    else:
+        return action["method"]
+
+
+def create_toc_node(node_id, title, text=None):
+    """Returns an entry of the table of contents"""
+    return {'id': node_id, 'title': title, 'text': text if text is not None else title, 'children': []}
+
+
+def generate_resource_group_ids(resource_group, used_ids):
+    """Generates the id and anchors of a resource group"""
+    if len(resource_group["name"]) > 0:
+        resource_group["id"] = get_unique_id('resource_group_' + re.sub(" +", " ", resource_group["name"]).lower().replace(' ', '-'), used_ids,
+                                             RESOURCE_GROUP_ANCHOR_FORMATS)
+    else:
+        resource_group["id"] = get_unique_id('default_group', used_ids, RESOURCE_GROUP_ANCHOR_FORMATS)
+
+    resource_group["header_id"] = "h-" + resource_group["id"]
+    resource_group["example_id"] = resource_group["id"] + "_example"
+    resource_group["example_header_id"] = "h-" + resource_group["example_id"]
+
+
+def generate_resource_ids(resource, used_ids):
+    """Generates the id and anchors of a resource"""
+    from markdown.extensions.toc import slugify
+
+    if len(resource["name"]) > 0:
+        resource["id"] = get_unique_id('resource_' + slugify(resource["name"], '-'), used_ids, RESOURCE_ANCHOR_FORMATS)
+    else:
+        resource["id"] = get_unique_id('resource_' + slugify(resource["uriTemplate"], '-'), used_ids, RESOURCE_ANCHOR_FORMATS)
+
+    resource["header_id"] = "h-" + resource["id"]
+    resource["example_id"] = resource["id"] + "_example"
+    resource["example_header_id"] = "h-" + resource["example_id"]
+
+
+def generate_action_ids(action, resource, used_ids):
+    """Generates the id and anchors of an action"""
+    from markdown.extensions.toc import slugify
+
+    if len(action["name"]) > 0:
+        action_id = 'action_' + slugify(action["name"], '-')
+    elif len(action["attributes"]["uriTemplate"]) > 0:
+        action_id = 'action_' + slugify(action["attributes"]["uriTemplate"], '-')
+    elif resource.get("ignoreTOC"):
+        action_id = 'action_' + slugify(resource["uriTemplate"] + action["method"], '-')
+    else:
+        action_id = 'action_' + slugify(resource["name"] + action["method"], '-')
+
+    action["id"] = get_unique_id(action_id, used_ids, ACTION_ANCHOR_FORMATS)
+    action["header_id"] = "h-" + action["id"]
+    action["body_id"] = action["id"] + "_body"
+    action["examples_id"] = action["id"] + "_examples"
+    action["examples_header_id"] = "h-" + action["examples_id"]
+    action["examples_body_id"] = action["examples_id"] + "_body"
+
+
+def generate_navigation_model(json_content):
+    """Generates the navigation model of the API specification: unique ids and anchors for every
+    resource group, resource, action and data structure, the API entries of the table of contents
+    and the links to the Apiary documentation.
+
+    Ids colliding with an already generated id or anchor, or whose anchors would collide, get a
+    numeric suffix.
+
+    Arguments:
+    json_content - JSON object containing the API parsed definition"""
+    used_ids = set(RESERVED_IDS)
+
+    for data_structure_name in sorted(json_content.get("data_structures", {})):
+        data_structure = json_content["data_structures"][data_structure_name]
+        data_structure["id"] = get_unique_id(data_structure["id"], used_ids)
+
+    apiary_project = get_apiary_project(json_content)
+    api_toc = []
+
+    for resource_group in json_content["resourceGroups"]:
+        generate_resource_group_ids(resource_group, used_ids)
+
+        if len(resource_group["name"]) > 0:
+            group_node = create_toc_node(resource_group["id"], "Group " + resource_group["name"])
+        else:
+            group_node = create_toc_node(resource_group["id"], "Group default", "Default")
+        api_toc.append(group_node)
+
+        for resource in resource_group["resources"]:
+            generate_resource_ids(resource, used_ids)
+
+            if resource.get("ignoreTOC"):
+                actions_parent_node = group_node
+            else:
+                actions_parent_node = create_toc_node(resource["id"], "Resource " + resource["name"])
+                group_node['children'].append(actions_parent_node)
+
+            for action in resource["actions"]:
+                generate_action_ids(action, resource, used_ids)
+
+                if apiary_project is not None:
+                    action["apiary_link"] = get_apiary_link(apiary_project, resource_group, resource, action)
+                else:
+                    action["apiary_link"] = None
+
+                actions_parent_node['children'].append(create_toc_node(action["id"], get_action_toc_title(action, resource)))
+
+    json_content['api_toc'] = api_toc
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import os
+import tempfile
+
+
+# Suffix of the temporary files of write_file_atomically, that other builds writing to the same
+# directories at the same time must not remove
+TEMP_FILE_SUFFIX = '.tmp'
+
+class OutputWriter(object):
+    """Collects the files of a build and saves them at the end, skipping the files whose content
+    is already on disk, so unchanged files keep their timestamps and a no-op build writes nothing.
+
+    Files are staged in memory by write() and copy(), and saved by commit(), every changed file
+    replaced atomically with a temporary file and a rename."""
+
+    def __init__(self):
+        self.files = OrderedDict()
+        self.managed_dir_paths = []
+
+    def write(self, path, content):
+        """Stages a file, given its content as a byte or unicode (saved as UTF-8) string"""
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+        self.files[os.path.abspath(path)] = content
+
+    def copy(self, src_path, path):
+        """Stages a copy of an existing file"""
+        with open(src_path, 'rb') as src_file:
+            self.write(path, src_file.read())
+
+    def read(self, path):
+        """Returns the content of a file, as staged or, if it isn't staged, as it is on disk"""
+        path = os.path.abspath(path)
+        if path in self.files:
+            return self.files[path]
+
+        with open(path, 'rb') as existing_file:
+            return existing_file.read()
+
+    def remove(self, path):
+        """Unstages a file, so it isn't saved (nor kept, inside a managed directory)"""
+        self.files.pop(os.path.abspath(path), None)
+
+    def get_staged_paths(self, dir_path):
+        """Returns the paths of the files staged inside a directory"""
+        dir_path = os.path.join(os.path.abspath(dir_path), '')
+        return [path for path in self.files if path.startswith(dir_path)]
+
+    def manage_directory(self, dir_path):
+        """Marks a directory as owned by the build: the files in it that aren't staged are
+        removed on commit, as if the directory was created from scratch"""
+        dir_path = os.path.abspath(dir_path)
+        if dir_path not in self.managed_dir_paths:
+            self.managed_dir_paths.append(dir_path)
+
+    def commit(self):
+        """Saves the staged files whose content changed and removes the stale files of the managed directories.
+
+        Returns a dict with the lists of 'changed', 'unchanged' and 'removed' file paths.
+        """
+        stats = {'changed': [], 'unchanged': [], 'removed': []}
+
+        for (path, content) in self.files.iteritems():
+            if is_file_content(path, content):
+                stats['unchanged'].append(path)
+            else:
+                write_file_atomically(path, content)
+                stats['changed'].append(path)
+
+        for dir_path in self.managed_dir_paths:
+            for (walk_dir_path, dir_names, file_names) in os.walk(dir_path):
+                for file_name in file_names:
+                    file_path = os.path.join(walk_dir_path, file_name)
+                    if file_path not in self.files and not is_temporary_file_name(file_name):
+                        os.remove(file_path)
+                        stats['removed'].append(file_path)
+
+        self.files = OrderedDict()
+        self.managed_dir_paths = []
+
+        return stats
+
+
+def is_file_content(path, content):
+    """Tells if a file exists with exactly the given content, comparing sizes before reading it"""
+    try:
+        if os.path.getsize(path) != len(content):
+            return False
+        with open(path, 'rb') as existing_file:
+            return existing_file.read() == content
+    except (IOError, OSError):
+        return False
+
+
+def write_file_atomically(path, content):
+    """Writes a file through a temporary file in the same directory, renamed over the destination,
+    so readers never see a partially written file"""
+    dir_path = os.path.dirname(path)
+    if not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+
+    (fd, temp_file_path) = tempfile.mkstemp(dir=dir_path, prefix='.' + os.path.basename(path) + '.', suffix=TEMP_FILE_SUFFIX)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            # mkstemp creates the file readable only by its owner
+            os.fchmod(temp_file.fileno(), 0644 & ~PROCESS_UMASK)
+            temp_file.write(content)
+        os.rename(temp_file_path, path)
+    except:
+        os.remove(temp_file_path)
+        raise
+
+
+def is_temporary_file_name(file_name):
+    """Tells if a file name is the one of a temporary file of write_file_atomically"""
+    return file_name.startswith('.') and file_name.endswith(TEMP_FILE_SUFFIX)
+
+
+def get_umask():
+    """Returns the umask of the process.
+
+    The umask can only be read by changing it, which affects the files created meanwhile by
+    other threads: it is only read once, at import time, see PROCESS_UMASK.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Umask of the process, applied to the files saved by write_file_atomically
+PROCESS_UMASK = get_umask()
+
+
+def format_output_summary(stats):
+    """Returns the summary of a commit: how many files changed, were unchanged and were removed"""
+    return "%d file(s) written, %d unchanged, %d removed" % (len(stats['changed']), len(stats['unchanged']), len(stats['removed']))
+
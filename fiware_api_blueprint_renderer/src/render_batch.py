@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import time
+import traceback
+
+import render_queue
+import renderer
+
+# Number of the slowest items of a batch listed at its end
+SLOWEST_ITEM_COUNT = 5
+
+
+def get_file_hash(file_path):
+    """Returns the SHA-1 hex digest of the content of a file"""
+    with open(file_path, 'rb') as hashed_file:
+        return hashlib.sha1(hashed_file.read()).hexdigest()
+
+
+def get_theme_hash(template_paths):
+    """Returns a hash of the themes of some templates: every file of their directories, templates
+    and static files alike, so editing any of them changes the hash.
+
+    Arguments:
+    template_paths -- Paths to the Jinja2 templates
+    """
+    theme_hash = hashlib.sha1()
+
+    for template_dir_path in sorted(set(os.path.dirname(os.path.abspath(path)) for path in template_paths)):
+        theme_hash.update(template_dir_path + '\0')
+        for dir_path, dir_names, file_names in os.walk(template_dir_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name == '__init__.py' or file_name.endswith('.pyc'):
+                    continue
+
+                file_path = os.path.join(dir_path, file_name)
+                theme_hash.update(os.path.relpath(file_path, template_dir_path) + '\0' + get_file_hash(file_path))
+
+    return theme_hash.hexdigest()
+
+
+def get_job_templates(job):
+    """Returns the template paths used to render a job, the overridden ones and the default ones"""
+    templates = {'html': renderer.DEFAULT_TEMPLATE_PATH, 'pdf': renderer.DEFAULT_PDF_TEMPLATE_PATH, 'cover': renderer.DEFAULT_COVER_TEMPLATE_PATH}
+    templates.update(job.get('templates') or {})
+
+    template_paths = []
+    if 'html' in job['formats']:
+        template_paths.append(templates['html'])
+    if 'pdf' in job['formats']:
+        template_paths += [templates['pdf'], templates['cover']]
+
+    return [os.path.abspath(path) for path in template_paths]
+
+
+def get_job_record(job, theme_hashes):
+    """Returns the journal record of a job, without its result yet.
+
+    Its key identifies what is rendered: the hashes of the input and of the theme, the fabre version,
+    and the formats, asset options and output of the job. Items with the same key render the same outputs.
+
+    Arguments:
+    job -- Render job, see render_queue.create_job
+    theme_hashes -- Dict caching the theme hashes by their template paths, shared by the jobs of a batch
+    """
+    template_paths = tuple(get_job_templates(job))
+    if template_paths not in theme_hashes:
+        theme_hashes[template_paths] = get_theme_hash(template_paths)
+
+    record = OrderedDict()
+    record['key'] = None
+    record['input'] = job.get('input') or job.get('context')
+    try:
+        record['input_hash'] = get_file_hash(record['input'])
+    except IOError:
+        # Rendering fails and records why
+        record['input_hash'] = None
+    record['theme_hash'] = theme_hashes[template_paths]
+    record['fabre_version'] = renderer.FABRE_VERSION
+    record['formats'] = job['formats']
+    record['asset_options'] = job['asset_options']
+    record['output'] = job['output']
+    record['key'] = hashlib.sha1(json.dumps(record.values()[1:], sort_keys=True)).hexdigest()
+
+    record['templates'] = list(template_paths)
+    record['status'] = None
+    record['error'] = None
+
+    return record
+
+
+def read_journal(journal_path):
+    """Returns the records of a journal, oldest first. A missing journal has no records, and a
+    record cut short by a crash while it was appended is ignored."""
+    records = []
+
+    try:
+        with open(journal_path, 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    records.append(json.loads(line, object_pairs_hook=OrderedDict))
+                except ValueError:
+                    continue
+    except IOError:
+        pass
+
+    return records
+
+
+def append_journal_record(journal_path, record):
+    """Appends a record to a journal, as a single line of JSON, and flushes it to disk, so the
+    record survives a crash right after it. Only the process running the batch writes to its journal."""
+    journal_dir_path = os.path.dirname(os.path.abspath(journal_path))
+    renderer.create_directory_if_not_exists(journal_dir_path)
+
+    with open(journal_path, 'a+') as journal_file:
+        # A record cut short by a crash doesn't take the new one with it
+        journal_file.seek(0, os.SEEK_END)
+        if journal_file.tell() > 0:
+            journal_file.seek(-1, os.SEEK_END)
+            if journal_file.read(1) != '\n':
+                journal_file.write('\n')
+
+        journal_file.write(json.dumps(record) + '\n')
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+
+
+def get_done_keys(records):
+    """Returns the keys of the items whose last record in the journal is done"""
+    statuses = {}
+    for record in records:
+        statuses[record.get('key')] = record.get('status')
+
+    return set(key for (key, status) in statuses.iteritems() if status == 'done')
+
+
+def render_batch_item(job_record):
+    """Renders a job of a batch, returning its journal record with its result and timings"""
+    (job, record) = job_record
+
+    record['started'] = time.time()
+    try:
+        output_stats = render_queue.render_job(job, job['output'])
+        record['status'] = 'done'
+        record['changed'] = len(output_stats['changed'])
+        record['unchanged'] = len(output_stats['unchanged'])
+        record['removed'] = len(output_stats['removed'])
+    except (Exception, SystemExit), e:
+        traceback.print_exc()
+        record['status'] = 'failed'
+        record['error'] = "%s: %s" % (e.__class__.__name__, e)
+    record['finished'] = time.time()
+    record['duration'] = record['finished'] - record['started']
+
+    return record
+
+
+def run_batch(jobs, journal_path, process_count=None):
+    """Renders a batch of jobs, keeping a journal of their results so an interrupted batch can be
+    resumed: run again, it skips the items already done and renders the failed and missing ones.
+
+    The journal is an append-only file with a JSON record per line and rendered item, with its key
+    (see get_job_record), status, error and timings. Several batches, like the same specifications
+    in several themes, can share a journal.
+
+    Arguments:
+    jobs -- Render jobs, see render_queue.create_job. They must have an output directory.
+    journal_path -- Path of the journal
+    process_count -- Number of items rendered in parallel, by default the number of CPUs
+
+    Returns a tuple with the records of the items rendered, in the order they finished, and the
+    number of items skipped.
+    """
+    import multiprocessing
+
+    done_keys = get_done_keys(read_journal(journal_path))
+    theme_hashes = {}
+
+    pending_jobs = []
+    skipped_count = 0
+    for job in jobs:
+        record = get_job_record(job, theme_hashes)
+        if record['key'] in done_keys:
+            skipped_count += 1
+        else:
+            # The same item listed twice in a batch is only rendered once
+            done_keys.add(record['key'])
+            pending_jobs.append((job, record))
+
+    if process_count is None:
+        process_count = multiprocessing.cpu_count()
+    process_count = min(process_count, len(pending_jobs))
+
+    records = []
+    if process_count <= 1:
+        for job_record in pending_jobs:
+            records.append(render_batch_item(job_record))
+            append_journal_record(journal_path, records[-1])
+    else:
+        pool = multiprocessing.Pool(process_count)
+        try:
+            for record in pool.imap_unordered(render_batch_item, pending_jobs, chunksize=1):
+                records.append(record)
+                append_journal_record(journal_path, record)
+        finally:
+            pool.close()
+            pool.join()
+
+    return (records, skipped_count)
+
+
+def format_batch_record(record):
+    """Returns the summary line of a journal record"""
+    line = "%s: %s in %.1fs" % (record['input'], record['status'], record['duration'])
+    if record['error']:
+        line += " (" + record['error'] + ")"
+
+    return line
@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import errno
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from output_writer import write_file_atomically
+import renderer
+
+
+# Subdirectories of a queue directory. Jobs move from one to another with atomic renames, so every
+# job is in exactly one of them, and in claimed/<worker-id>/ while a worker renders it.
+PENDING_DIR_NAME = 'pending'
+CLAIMED_DIR_NAME = 'claimed'
+DONE_DIR_NAME = 'done'
+FAILED_DIR_NAME = 'failed'
+QUEUE_SUBDIRECTORIES = [PENDING_DIR_NAME, CLAIMED_DIR_NAME, DONE_DIR_NAME, FAILED_DIR_NAME]
+
+DEFAULT_HEARTBEAT_INTERVAL = 10
+DEFAULT_STALE_TIMEOUT = 60
+DEFAULT_POLL_INTERVAL = 2
+DEFAULT_MAX_ATTEMPTS = 3
+
+JOB_FILE_EXTENSION = '.json'
+# Suffix of a claimed job file while its worker updates it
+UPDATING_FILE_EXTENSION = '.updating'
+
+
+def create_queue_directories(queue_dir_path):
+    """Creates the subdirectories of a queue directory that don't exist yet"""
+    for subdirectory in QUEUE_SUBDIRECTORIES:
+        try:
+            os.makedirs(os.path.join(queue_dir_path, subdirectory))
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+
+def get_default_worker_id():
+    """Returns an id for this worker process, unique among the hosts sharing a queue"""
+    return "%s-%d" % (socket.gethostname(), os.getpid())
+
+
+def create_job(formats, templates=None, asset_options=None, API_specification_path=None, compiled_context_path=None, dst_dir_path=None):
+    """Returns a render job, to be added to a queue with enqueue_job
+
+    Arguments:
+    formats -- List of output formats ('html', 'pdf' and/or 'json')
+    templates -- Dict with the template paths overriding the default ones: 'html', 'pdf' and/or 'cover'
+    asset_options -- Static asset options of the html page, see renderer.render_api_blueprint
+    API_specification_path -- Path to the API specification to render
+    compiled_context_path -- Path to a compiled context to render, instead of an API specification
+    dst_dir_path -- Directory where the outputs are saved in a subdirectory named after the specification,
+                    by default the outputs are saved in a directory of the job in the result directory
+
+    Paths are made absolute, so workers started from other directories (or other hosts mounting the
+    same filesystem at the same path) find them.
+    """
+    job = OrderedDict()
+    if compiled_context_path is not None:
+        job['context'] = os.path.abspath(compiled_context_path)
+    else:
+        job['input'] = os.path.abspath(API_specification_path)
+    job['formats'] = formats
+    job['templates'] = dict((name, os.path.abspath(path)) for (name, path) in (templates or {}).iteritems())
+    job['asset_options'] = asset_options
+    if dst_dir_path is not None:
+        source_path = compiled_context_path if compiled_context_path is not None else API_specification_path
+        job['output'] = os.path.join(os.path.abspath(dst_dir_path), os.path.splitext(os.path.basename(source_path))[0])
+    else:
+        job['output'] = None
+    job['attempts'] = 0
+
+    return job
+
+
+def enqueue_job(queue_dir_path, job):
+    """Adds a job to a queue, returning its id.
+
+    The job file is written with a temporary name and renamed, so workers never see it half written.
+    Job ids start with the time they were enqueued, and workers claim them in that order.
+    """
+    create_queue_directories(queue_dir_path)
+
+    source_path = job.get('input') or job.get('context')
+    job_id = "%s-%s-%s" % (time.strftime("%Y%m%d%H%M%S"), os.path.splitext(os.path.basename(source_path))[0], uuid.uuid4().hex[:8])
+
+    write_file_atomically(os.path.join(queue_dir_path, PENDING_DIR_NAME, job_id + JOB_FILE_EXTENSION), json.dumps(job, indent=4))
+
+    return job_id
+
+
+def get_job_id(job_file_name):
+    """Returns the id of a job given the name of its file"""
+    return job_file_name[:-len(JOB_FILE_EXTENSION)]
+
+
+def list_job_file_names(dir_path):
+    """Returns the names of the job files in a directory, in the order they were enqueued"""
+    try:
+        return sorted(file_name for file_name in os.listdir(dir_path) if file_name.endswith(JOB_FILE_EXTENSION))
+    except OSError, e:
+        if e.errno == errno.ENOENT:
+            return []
+        raise
+
+
+def rename_if_exists(src_path, dst_path):
+    """Renames a file, returning False if it doesn't exist anymore because another worker moved it"""
+    try:
+        os.rename(src_path, dst_path)
+    except OSError, e:
+        if e.errno == errno.ENOENT:
+            return False
+        raise
+
+    return True
+
+
+def claim_job(queue_dir_path, worker_id):
+    """Claims the oldest pending job, moving it to the claimed directory of the worker.
+
+    The rename is atomic, so when several workers try to claim the same job only one succeeds, and
+    the others try the next one. The rename keeps the modification time of the job file, the time
+    it was enqueued, so the file is touched right away: otherwise a job that waited longer than the
+    stale timeout would look abandoned by its worker as soon as it is claimed.
+
+    Returns the (job id, claimed job file path) tuple, or None if there are no pending jobs.
+    """
+    pending_dir_path = os.path.join(queue_dir_path, PENDING_DIR_NAME)
+    worker_dir_path = os.path.join(queue_dir_path, CLAIMED_DIR_NAME, worker_id)
+    renderer.create_directory_if_not_exists(worker_dir_path)
+
+    for job_file_name in list_job_file_names(pending_dir_path):
+        claimed_job_path = os.path.join(worker_dir_path, job_file_name)
+        if rename_if_exists(os.path.join(pending_dir_path, job_file_name), claimed_job_path):
+            try:
+                os.utime(claimed_job_path, None)
+            except OSError, e:
+                # Reclaimed by another worker before it was touched
+                if e.errno == errno.ENOENT:
+                    continue
+                raise
+            return (get_job_id(job_file_name), claimed_job_path)
+
+    return None
+
+
+def reclaim_stale_jobs(queue_dir_path, stale_timeout):
+    """Moves back to the pending directory the claimed jobs whose worker stopped sending heartbeats.
+
+    Arguments:
+    queue_dir_path -- Path of the queue directory
+    stale_timeout -- Seconds without heartbeats after which a worker is considered dead. The hosts
+                     sharing the queue must have their clocks in sync.
+
+    Returns the ids of the reclaimed jobs.
+    """
+    claimed_dir_path = os.path.join(queue_dir_path, CLAIMED_DIR_NAME)
+    reclaimed_job_ids = []
+    now = time.time()
+
+    for worker_id in os.listdir(claimed_dir_path):
+        worker_dir_path = os.path.join(claimed_dir_path, worker_id)
+        for job_file_name in list_job_file_names(worker_dir_path):
+            claimed_job_path = os.path.join(worker_dir_path, job_file_name)
+            try:
+                if now - os.path.getmtime(claimed_job_path) < stale_timeout:
+                    continue
+            except OSError:
+                continue
+
+            if rename_if_exists(claimed_job_path, os.path.join(queue_dir_path, PENDING_DIR_NAME, job_file_name)):
+                reclaimed_job_ids.append(get_job_id(job_file_name))
+
+                # The directory of a dead worker is removed once it has no jobs left
+                try:
+                    os.rmdir(worker_dir_path)
+                except OSError:
+                    pass
+
+    return reclaimed_job_ids
+
+
+def is_queue_empty(queue_dir_path):
+    """Tells if a queue has neither pending nor claimed jobs"""
+    if list_job_file_names(os.path.join(queue_dir_path, PENDING_DIR_NAME)):
+        return False
+
+    claimed_dir_path = os.path.join(queue_dir_path, CLAIMED_DIR_NAME)
+    for worker_id in os.listdir(claimed_dir_path):
+        if list_job_file_names(os.path.join(claimed_dir_path, worker_id)):
+            return False
+
+    return True
+
+
+def start_heartbeat(claimed_job_path, interval):
+    """Touches a claimed job file every interval seconds, in a background thread, so other workers
+    know its worker is alive. Returns the function that stops the heartbeat."""
+    stop_event = threading.Event()
+
+    def beat():
+        while not stop_event.wait(interval):
+            try:
+                os.utime(claimed_job_path, None)
+            except OSError:
+                # The job was reclaimed by another worker
+                return
+
+    heartbeat_thread = threading.Thread(target=beat)
+    heartbeat_thread.daemon = True
+    heartbeat_thread.start()
+
+    def stop():
+        stop_event.set()
+        heartbeat_thread.join()
+
+    return stop
+
+
+def redirect_output(log_file):
+    """Redirects the standard output and error of the process, including the ones of its
+    subprocesses like drafter, to a file. Returns the saved descriptors for restore_output."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = (os.dup(1), os.dup(2))
+    os.dup2(log_file.fileno(), 1)
+    os.dup2(log_file.fileno(), 2)
+
+    return saved_fds
+
+
+def restore_output(saved_fds):
+    """Restores the standard output and error saved by redirect_output"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.dup2(saved_fds[0], 1)
+    os.dup2(saved_fds[1], 2)
+    os.close(saved_fds[0])
+    os.close(saved_fds[1])
+
+
+def render_job(job, dst_dir_path):
+    """Renders a job with the regular rendering pipeline, returning the changed, unchanged and removed files.
+    Every job gets its own temporary directory, removed once it is rendered."""
+    templates = {'html': renderer.DEFAULT_TEMPLATE_PATH, 'pdf': renderer.DEFAULT_PDF_TEMPLATE_PATH, 'cover': renderer.DEFAULT_COVER_TEMPLATE_PATH}
+    templates.update(job.get('templates') or {})
+    formats = job.get('formats') or ['html']
+
+    if job.get('context'):
+        return renderer.render_compiled_context(job['context'], formats, templates, dst_dir_path, job.get('asset_options'))
+    else:
+        return renderer.render_api_specification_formats(job['input'], formats, templates, dst_dir_path, True, job.get('asset_options'))
+
+
+def run_job(queue_dir_path, result_dir_path, worker_id, job_id, claimed_job_path, heartbeat_interval, max_attempts):
+    """Renders a claimed job and records its result.
+
+    The output of the rendering is saved as <job-id>.log in the result directory, and its result as
+    <job-id>.json. Jobs without an output path are rendered to <job-id>/ in the result directory.
+    The job file ends in the done or failed directory of the queue, unless the job was reclaimed by
+    another worker meanwhile.
+
+    Returns the result of the job, or None if it was reclaimed.
+    """
+    try:
+        with open(claimed_job_path) as job_file:
+            job = json.load(job_file, object_pairs_hook=OrderedDict)
+    except IOError, e:
+        if e.errno == errno.ENOENT:
+            return None
+        raise
+
+    # The job may be reclaimed since it was read, and writing the claimed file would then leave the
+    # job both pending and claimed. So the file is first renamed to a name that reclaim_stale_jobs
+    # doesn't list, which fails if it was reclaimed, and the updated job is renamed back. Rewriting
+    # the file also refreshes its heartbeat.
+    updating_job_path = claimed_job_path + UPDATING_FILE_EXTENSION
+    if not rename_if_exists(claimed_job_path, updating_job_path):
+        return None
+    job['attempts'] = job.get('attempts', 0) + 1
+    write_file_atomically(updating_job_path, json.dumps(job, indent=4))
+    os.rename(updating_job_path, claimed_job_path)
+
+    result = OrderedDict()
+    result['job'] = job_id
+    result['worker'] = worker_id
+    result['attempt'] = job['attempts']
+    result['status'] = None
+    result['error'] = None
+    result['output'] = job.get('output') or os.path.join(os.path.abspath(result_dir_path), job_id)
+    result['started'] = time.time()
+
+    renderer.create_directory_if_not_exists(result_dir_path)
+    log_path = os.path.join(result_dir_path, job_id + '.log')
+
+    if job['attempts'] > max_attempts:
+        result['status'] = 'failed'
+        result['error'] = "Abandoned after %d attempts, its workers stopped sending heartbeats" % max_attempts
+    else:
+        stop_heartbeat = start_heartbeat(claimed_job_path, heartbeat_interval)
+
+        with open(log_path, 'a') as log_file:
+            saved_fds = redirect_output(log_file)
+            try:
+                output_stats = render_job(job, result['output'])
+                result['status'] = 'done'
+                result['changed'] = len(output_stats['changed'])
+                result['unchanged'] = len(output_stats['unchanged'])
+                result['removed'] = len(output_stats['removed'])
+            except (Exception, SystemExit), e:
+                traceback.print_exc()
+                result['status'] = 'failed'
+                result['error'] = "%s: %s" % (e.__class__.__name__, e)
+            finally:
+                restore_output(saved_fds)
+                stop_heartbeat()
+
+    result['finished'] = time.time()
+    result['duration'] = result['finished'] - result['started']
+
+    finished_dir_name = DONE_DIR_NAME if result['status'] == 'done' else FAILED_DIR_NAME
+    if not rename_if_exists(claimed_job_path, os.path.join(queue_dir_path, finished_dir_name, job_id + JOB_FILE_EXTENSION)):
+        return None
+
+    write_file_atomically(os.path.join(result_dir_path, job_id + '.json'), json.dumps(result, indent=4))
+
+    return result
+
+
+def run_worker(queue_dir_path, result_dir_path, worker_id=None, heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL,
+               stale_timeout=DEFAULT_STALE_TIMEOUT, poll_interval=DEFAULT_POLL_INTERVAL, max_attempts=DEFAULT_MAX_ATTEMPTS,
+               drain=False):
+    """Renders the jobs of a queue until it is stopped or, with drain, until the queue is empty.
+
+    Any number of workers, on one host or on several hosts sharing the queue and result directories,
+    can serve the same queue. Before claiming a job, a worker moves back to the queue the jobs of
+    dead workers, the ones without heartbeats for stale_timeout seconds. A job is failed after
+    max_attempts claims, so a job killing its workers doesn't stall the queue forever.
+
+    Arguments:
+    queue_dir_path -- Path of the queue directory
+    result_dir_path -- Directory where the results, logs and outputs of the jobs are saved
+    worker_id -- Id of the worker, by default made of the host name and the process id
+    heartbeat_interval -- Seconds between the heartbeats of the running job
+    stale_timeout -- Seconds without heartbeats after which a job is reclaimed
+    poll_interval -- Seconds to wait before looking for new jobs when the queue is empty
+    max_attempts -- Number of times a job can be claimed
+    drain -- Flag to stop when there are no pending nor claimed jobs
+
+    Returns the results of the jobs rendered by this worker.
+    """
+    if worker_id is None:
+        worker_id = get_default_worker_id()
+
+    create_queue_directories(queue_dir_path)
+    results = []
+
+    while True:
+        for job_id in reclaim_stale_jobs(queue_dir_path, stale_timeout):
+            print "%s: reclaimed job %s from a dead worker" % (worker_id, job_id)
+
+        claimed_job = claim_job(queue_dir_path, worker_id)
+        if claimed_job is None:
+            if drain and is_queue_empty(queue_dir_path):
+                break
+            time.sleep(poll_interval)
+            continue
+
+        (job_id, claimed_job_path) = claimed_job
+        result = run_job(queue_dir_path, result_dir_path, worker_id, job_id, claimed_job_path, heartbeat_interval, max_attempts)
+        if result is None:
+            print "%s: job %s was reclaimed by another worker" % (worker_id, job_id)
+            continue
+
+        print "%s: job %s %s in %.1fs" % (worker_id, job_id, result['status'], result['duration'])
+        results.append(result)
+
+    try:
+        os.rmdir(os.path.join(queue_dir_path, CLAIMED_DIR_NAME, worker_id))
+    except OSError:
+        pass
+
+    return results
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+
+import hashlib
+import json
+import os
+
+from output_writer import write_file_atomically, is_temporary_file_name
+
+# Size of the rendered fragments kept on disk. When it is exceeded, the least recently used
+# fragments are removed until the cache is back to EVICTION_RATIO of it.
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+EVICTION_RATIO = 0.75
+
+FRAGMENT_FILE_EXTENSION = '.html'
+
+# Caches of the process, by directory, so their statistics add up over the pages of a build
+fragment_caches = {}
+
+
+class FragmentCache(object):
+    """Rendered HTML fragments saved on disk by key. Every hit refreshes the modification time of
+    its fragment, which is used to evict the least recently used ones."""
+
+    def __init__(self, cache_dir_path, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir_path = cache_dir_path
+        self.max_size = max_size
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir_path, key + FRAGMENT_FILE_EXTENSION)
+
+    def get(self, key):
+        """Returns the fragment saved with a key, or None if there is none"""
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as fragment_file:
+                fragment = fragment_file.read().decode('utf-8')
+            os.utime(path, None)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        """Saves a fragment with a key, evicting old fragments if the cache grows too big"""
+        content = fragment.encode('utf-8')
+        write_file_atomically(self.get_path(key), content)
+
+        if self.size is None:
+            self.size = sum(size for (mtime, size, path) in self.list_fragments())
+        else:
+            self.size += len(content)
+
+        if self.size > self.max_size:
+            self.evict()
+
+    def list_fragments(self):
+        """Returns the (modification time, size, path) of the saved fragments"""
+        fragments = []
+        for file_name in os.listdir(self.cache_dir_path):
+            if not file_name.endswith(FRAGMENT_FILE_EXTENSION) or is_temporary_file_name(file_name):
+                continue
+
+            path = os.path.join(self.cache_dir_path, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            fragments.append((stat.st_mtime, stat.st_size, path))
+
+        return fragments
+
+    def evict(self):
+        """Removes the least recently used fragments until the cache is back to EVICTION_RATIO of its maximum size.
+        Other processes may share the cache, so its size is measured again."""
+        fragments = sorted(self.list_fragments())
+        self.size = sum(size for (mtime, size, path) in fragments)
+
+        for (mtime, size, path) in fragments:
+            if self.size <= self.max_size * EVICTION_RATIO:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            self.size -= size
+
+
+def get_fragment_cache(cache_dir_path, max_size=DEFAULT_MAX_SIZE):
+    """Returns the fragment cache of a directory, the same one for every render of the process"""
+    if cache_dir_path not in fragment_caches:
+        fragment_caches[cache_dir_path] = FragmentCache(cache_dir_path, max_size)
+
+    return fragment_caches[cache_dir_path]
+
+
+def get_template_hash(environment, template_name):
+    """Returns a hash of the source of a template and of every template it includes or imports, recursively.
+    Templates referenced by a computed name can be any template, so all of them are hashed then.
+    The Jinja2 version is hashed too."""
+    import jinja2
+    from jinja2 import meta
+
+    template_names = set()
+    pending_template_names = [template_name]
+    while pending_template_names:
+        name = pending_template_names.pop()
+        if name in template_names:
+            continue
+        template_names.add(name)
+
+        source = environment.loader.get_source(environment, name)[0]
+        for referenced_name in meta.find_referenced_templates(environment.parse(source)):
+            if referenced_name is None:
+                pending_template_names += environment.list_templates(filter_func=lambda name: name.endswith('.tpl'))
+            else:
+                pending_template_names.append(referenced_name)
+
+    template_hash = hashlib.sha1(jinja2.__version__ + '\0')
+    for name in sorted(template_names):
+        template_hash.update(name.encode('utf-8') + '\0' + environment.loader.get_source(environment, name)[0].encode('utf-8') + '\0')
+
+    return template_hash.hexdigest()
+
+
+def get_strings(value, strings):
+    """Adds every string of a JSON value, at any depth, to a set"""
+    if isinstance(value, dict):
+        for item in value.itervalues():
+            get_strings(item, strings)
+    elif isinstance(value, list):
+        for item in value:
+            get_strings(item, strings)
+    elif isinstance(value, basestring):
+        strings.add(value)
+
+
+def get_fragment_key(template_hash, node_context, lookup_tables):
+    """Returns the key of a fragment: a hash of its template and of the part of the context it renders.
+
+    Arguments:
+    template_hash -- Hash of the fragment template, see get_template_hash
+    node_context -- Variables of the fragment, like the resource group it renders
+    lookup_tables -- Dicts the fragment looks entries up in, by names or ids found in its node
+                     context. Only the entries whose keys are strings of the node context are hashed,
+                     so changes to other entries don't invalidate the fragment.
+    """
+    node_strings = set()
+    get_strings(node_context, node_strings)
+
+    used_entries = {}
+    for (table_name, table) in lookup_tables.iteritems():
+        if isinstance(table, dict):
+            used_entries[table_name] = dict((key, entry) for (key, entry) in table.iteritems() if key in node_strings)
+
+    hashed_content = json.dumps([template_hash, node_context, used_entries], sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha1(hashed_content).hexdigest()
+
+
+def add_cached_fragment_function(environment, fragment_cache=None):
+    """Adds the cached_fragment function to the globals of a Jinja2 environment.
+
+    cached_fragment(template_name, node_context, lookup_tables) renders a template with the given
+    variables only: node_context, a dict with the part of the page context it renders, and
+    lookup_tables, a dict with the tables it looks entries up in (see get_fragment_key). With a
+    fragment cache, the fragments already rendered with the same template and context are reused.
+
+    Arguments:
+    environment -- Jinja2 environment of the templates
+    fragment_cache -- FragmentCache where the fragments are saved, or None to render them every time
+    """
+    from jinja2 import Markup
+
+    template_hashes = {}
+
+    def cached_fragment(template_name, node_context, lookup_tables=None):
+        if lookup_tables is None:
+            lookup_tables = {}
+
+        variables = dict(lookup_tables)
+        variables.update(node_context)
+
+        if fragment_cache is None:
+            return Markup(environment.get_template(template_name).render(variables))
+
+        if template_name not in template_hashes:
+            template_hashes[template_name] = get_template_hash(environment, template_name)
+        key = get_fragment_key(template_hashes[template_name], node_context, lookup_tables)
+
+        fragment = fragment_cache.get(key)
+        if fragment is None:
+            fragment = environment.get_template(template_name).render(variables)
+            fragment_cache.put(key, fragment)
+
+        return Markup(fragment)
+
+    environment.globals['cached_fragment'] = cached_fragment
+
+
+def format_fragment_cache_summary(fragment_cache):
+    """Returns the summary of the use of a fragment cache: its hits, misses, hit rate and evictions"""
+    lookups = fragment_cache.hits + fragment_cache.misses
+    hit_rate = 100.0 * fragment_cache.hits / lookups if lookups else 0.0
+
+    return "fragment cache: %d hit(s), %d miss(es), %.0f%% hit rate, %d evicted" % (fragment_cache.hits, fragment_cache.misses, hit_rate,
+                                                                                   fragment_cache.evictions)
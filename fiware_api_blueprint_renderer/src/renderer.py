@@ -1,35 +1,84 @@
 #!/usr/bin/env python
 
 from collections import OrderedDict, deque
-import inspect
+import hashlib
 import json
 import os
 import re
-import shutil
 import io
-from subprocess import call
+import shutil
+from subprocess import call, Popen, PIPE
 import sys, getopt
-from pprint import pprint
+import tempfile
+import threading
 
-from jinja2 import Environment, FileSystemLoader
-import markdown
-from markdown.extensions.toc import slugify
+# jinja2, markdown, multiprocessing and the modules of the stages that not every build runs
+# (parsing, highlighting, bundling, search index, fragment cache) are imported by the stages using
+# them, so the command line tool starts fast when it only checks its arguments or the
+# specifications. tests/test_import_time.py checks it.
 
 import apib_extra_parse_utils
+import apib_patterns
+import navigation
+from output_writer import OutputWriter, format_output_summary
+from version import FABRE_VERSION
+
+COMPILED_CONTEXT_VERSION = 3
+
+# Highlighted blocks shorter than this are repeated instead of linked to their first occurrence
+MIN_SHARED_BLOCK_LENGTH = 256
+
+DEFAULT_THEME_DIR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "themes", "default_theme")
+DEFAULT_TEMPLATE_PATH = os.path.join(DEFAULT_THEME_DIR_PATH, "api-specification.tpl")
+DEFAULT_PDF_TEMPLATE_PATH = os.path.join(DEFAULT_THEME_DIR_PATH, "api-specification-pdf.tpl")
+DEFAULT_COVER_TEMPLATE_PATH = os.path.join(DEFAULT_THEME_DIR_PATH, "cover.tpl")
+
+STATIC_FILES_SUBDIRECTORIES = ['css', 'js', 'img', 'font']
+
+# Python Markdown extensions of the descriptions of the API elements, and of the API description
+# and metadata sections
+DESCRIPTION_MARKDOWN_EXTENSIONS = ('markdown.extensions.tables',)
+SECTION_MARKDOWN_EXTENSIONS = ('markdown.extensions.tables', 'markdown.extensions.fenced_code')
+
+DEFAULT_CACHE_DIR_PATH = "/var/tmp/fiware_api_blueprint_renderer_cache"
+DEFAULT_TEMP_DIR_PATH = "/var/tmp/fiware_api_blueprint_renderer_tmp"
 
-def print_api_spec_title_to_extra_file(input_file_path, extra_sections_file_path):
-    """Extracts the title of the API specification and writes it to the extra sections file.
+
+def to_unicode(text):
+    """Returns the given text as unicode, decoding it as UTF-8 if needed"""
+    if isinstance(text, str):
+        return text.decode('utf-8')
+    return text
+
+
+def read_api_specification(API_specification):
+    """Returns the lines of an API specification given as a string or as a file-like object.
+
+    Lines are returned as UTF-8 encoded strings with universal newlines.
 
     Arguments:
-    input_file_path -- File with the API specification
-    extra_sections_file_path -- File where we will write the extra sections
+    API_specification -- Text of the API specification or file-like object to read it from
     """
-    with open(input_file_path, 'rU') as input_file_path, open(extra_sections_file_path, 'w') as extra_sections_file:
-        line = input_file_path.readline()
-        while (line != "" and not line.startswith("# ")):
-            line = input_file_path.readline()
-    
-        extra_sections_file.write( line )
+    if hasattr(API_specification, 'read'):
+        API_specification = API_specification.read()
+
+    if isinstance(API_specification, unicode):
+        API_specification = API_specification.encode('utf-8')
+
+    return API_specification.replace('\r\n', '\n').replace('\r', '\n').splitlines(True)
+
+
+def get_api_spec_title(input_lines):
+    """Returns the title line of the API specification.
+
+    Arguments:
+    input_lines -- Lines of the API specification
+    """
+    for line in input_lines:
+        if line.startswith("# "):
+            return line
+
+    return ""
 
 
 def start_apib_section(line):
@@ -40,70 +89,83 @@ def start_apib_section(line):
     """
     result = False
 
-    group_regex = re.compile("^#*[ ]Group([ \w\W\-\_]*)$")
-    resource_regex = re.compile("^#*[ ]([ \w\W\-\_]*) \[([ \w\W\-\_]*)\]$")
-    direct_URI_regex = re.compile("^#*[ ]([ ]*[/][ \w\W\-\_]*)$")
-
-
-    if (line.strip() == "# REST API" 
+    if (line.strip() == "# REST API"
         or line.strip() == "## Data Structures"
-        or group_regex.match(line)
-        or resource_regex.match(line)
-        or direct_URI_regex.match(line)
+        or apib_patterns.group_regex.match(line)
+        or apib_patterns.resource_regex.match(line)
+        or apib_patterns.direct_URI_regex.match(line)
         ):
 
         result = True
-    
+
     return result
 
 
-def separate_extra_sections_and_api_blueprint(input_file_path, extra_sections_file_path, API_blueprint_file_path):
-    """Divides a Fiware API specification into extra sections and its API blueprint.
+def split_api_specification_lines(input_lines):
+    """Divides the lines of a Fiware API specification into extra sections and API blueprint lines.
 
     Arguments:
-    input_file_path -- A Fiware API specification file.
-    extra_sections_file_path -- Resulting file containing extra information about the API specification.
-    API_blueprint_file_path -- Resulting file containing the API blueprint of the Fiware API.
+    input_lines -- Lines of a Fiware API specification.
+
+    Returns a tuple with the extra sections lines, the API blueprint lines and the line number
+    (starting at 1) that every API blueprint line has in the API specification.
     """
-    print_api_spec_title_to_extra_file(input_file_path, extra_sections_file_path) 
+    extra_sections = [get_api_spec_title(input_lines)]
+    API_blueprint = []
+    API_blueprint_line_numbers = []
+
+    metadata_section = True
+    apib_part = False
+    title_section = False
+    parameters_section = False
 
-    with open(input_file_path, 'rU') as input_file, open(extra_sections_file_path, 'a') as extra_sections_file, open(API_blueprint_file_path, 'w') as API_blueprint_file:
-        metadata_section = True
-        apib_part = False
-        title_section = False
-        parameters_section = False
+    for line_number, line in enumerate(input_lines, 1):
+        copy = False
 
-        for line in input_file:
+        if metadata_section and len(line.split(':')) == 1:
+            metadata_section = False
+            title_section = True
+
+        if metadata_section:
             copy = False
+        else:
+            if title_section and line.startswith('##'):
+                title_section = False
 
-            if metadata_section and len(line.split(':')) == 1:
-                metadata_section = False
-                title_section = True
-            
-            if metadata_section:
+            if title_section:
                 copy = False
+
             else:
-                if title_section and line.startswith('##'):
-                    title_section = False
+                if not apib_part:
+                    apib_part = start_apib_section(line)
 
-                if title_section:
+                if not apib_part:
+                    copy = True
+                else:
                     copy = False
 
-                else:
-                    if not apib_part:
-                        apib_part = start_apib_section(line)
-                        
-                    if not apib_part:
-                        copy = True
-                    else:
-                        copy = False
-
-            if copy:
-                extra_sections_file.write(line)
-            else:
-                line = line.replace('\t','    ')
-                (line, parameters_section) = preprocess_apib_parameters_lines(line, parameters_section)
-                API_blueprint_file.write(line)
+        if copy:
+            extra_sections.append(line)
+        else:
+            line = line.replace('\t','    ')
+            (line, parameters_section) = preprocess_apib_parameters_lines(line, parameters_section)
+            API_blueprint.append(line)
+            API_blueprint_line_numbers.append(line_number)
+
+    return (extra_sections, API_blueprint, API_blueprint_line_numbers)
+
+
+def split_api_specification(input_lines):
+    """Divides a Fiware API specification into extra sections and its API blueprint.
+
+    Arguments:
+    input_lines -- Lines of a Fiware API specification.
+
+    Returns a tuple with the extra sections and the API blueprint texts.
+    """
+    (extra_sections, API_blueprint, _) = split_api_specification_lines(input_lines)
+
+    return (''.join(extra_sections), ''.join(API_blueprint))
 
 
 def preprocess_apib_parameters_lines(line, defining_parameters):
@@ -117,7 +179,7 @@ def preprocess_apib_parameters_lines(line, defining_parameters):
         if line == '+ Parameters\n':
             defining_parameters = True
     else:
-        if re.match(r"^[ \t]*[+|-][ ]([^ +-]*)[ ]*-?(.*)$", line) or re.match(r"^ *$", line):
+        if apib_patterns.member_regex.match(line) or apib_patterns.blank_line_regex.match(line):
             line = escape_parenthesis_in_parameter_description(line)
         else:
             defining_parameters = False
@@ -127,7 +189,7 @@ def preprocess_apib_parameters_lines(line, defining_parameters):
 
 def escape_parenthesis_in_parameter_description(parameter_definition):
     """Given an APIB parameter definition, escape the parenthesis in its description
-    
+
     Arguments:
     line - string containing the parameter definition.
     """
@@ -144,21 +206,57 @@ def escape_parenthesis_in_parameter_description(parameter_definition):
         return parameter_definition
 
 
-def parser_api_blueprint(API_blueprint_file_path, API_blueprint_JSON_file_path):
-    """Extracts from API Blueprint file the API specification and saves it to a JSON file
+def parser_api_blueprint(API_blueprint):
+    """Extracts from API Blueprint the API specification and returns it as a JSON object
+
+    Large blueprints are split by resource groups and parsed by several drafter processes at once,
+    see drafter_shards.parse_api_blueprint_shards. The AST is loaded as drafter writes it, without
+    the parts the pipeline doesn't use, see ast_loader.load_api_blueprint_ast.
 
     Arguments:
-    API_blueprint_file_path -- An API Blueprint definition file 
-    API_blueprint_JSON_file_path -- Path to JSON file
+    API_blueprint -- API Blueprint definition text
     """
+    import ast_loader
+    import drafter_shards
+
+    json_content = drafter_shards.parse_api_blueprint_shards(API_blueprint)
+    if json_content is not None:
+        return json_content
+
+    drafter = Popen(["drafter", "--format", "json", "--use-line-num"], stdin=PIPE, stdout=PIPE)
 
-    call( ["drafter", API_blueprint_file_path, "--output", API_blueprint_JSON_file_path, "--format", "json", "--use-line-num"] )
+    # The blueprint is written from another thread, so drafter never blocks on a full output pipe
+    def write_api_blueprint():
+        try:
+            drafter.stdin.write(API_blueprint)
+        except IOError:
+            pass
+        finally:
+            drafter.stdin.close()
+
+    writer_thread = threading.Thread(target=write_api_blueprint)
+    writer_thread.start()
+    try:
+        json_content = ast_loader.load_api_blueprint_ast(drafter.stdout)
+    except ValueError:
+        json_content = None
+    finally:
+        writer_thread.join()
+        drafter.stdout.close()
+        drafter.wait()
+
+    if json_content is None:
+        if drafter.returncode != 0:
+            raise RuntimeError("drafter failed to parse the API blueprint (exit code %d)" % drafter.returncode)
+        raise RuntimeError("drafter output isn't a valid AST")
+
+    return json_content
 
 
 def get_markdow_title_id(section_title):
     """Returns the HTML equivalent id from a section title
-    
-    Arguments: 
+
+    Arguments:
     section_title -- Section title
     """
     return section_title.replace(" ", "_").lower()
@@ -166,9 +264,9 @@ def get_markdow_title_id(section_title):
 
 def get_heading_level(heading):
     """Returns the level of a given Markdown heading
-    
+
     Arguments:
-    heading -- Markdown title    
+    heading -- Markdown title
     """
     i = 0
     while( i < len(heading) and heading[i] == '#' ):
@@ -177,22 +275,73 @@ def get_heading_level(heading):
     return i
 
 
-def create_json_section(section_markdown_title, section_body):
+def add_markdown_field(JSON_object, key, text, extensions, markdown_fields=None):
+    """Sets a field of a JSON object to the HTML of a Markdown text.
+
+    Arguments:
+    JSON_object -- JSON object of the field
+    key -- Name of the field
+    text -- Markdown text
+    extensions -- Tuple with the names of the Python Markdown extensions to use
+    markdown_fields -- List where the field is added, keeping its Markdown text, to be converted
+                       with the other fields of the list by convert_markdown_fields. None converts
+                       the text right away.
+    """
+    import markdown_batch
+
+    if markdown_fields is None:
+        JSON_object[key] = markdown_batch.convert_markdown_chunk([(extensions, text)])[0]
+    else:
+        JSON_object[key] = text
+        markdown_fields.append((JSON_object, key, extensions, text))
+
+
+def convert_markdown_fields(markdown_fields, converted_markdown=None, jobs=None):
+    """Converts the Markdown texts of the fields collected by add_markdown_field to HTML, as a single
+    batch, see markdown_batch.convert_markdown_texts. Every text is converted once.
+
+    Arguments:
+    markdown_fields -- List of the fields filled by add_markdown_field
+    converted_markdown -- Dict with the HTML of the texts already converted, by their extensions and
+                          text, which is reused and extended. Contexts sharing it, like the versions
+                          of a specification, only convert the texts they don't share.
+    jobs -- Number of processes converting the texts, see markdown_batch.convert_markdown_texts
+    """
+    import markdown_batch
+
+    if converted_markdown is None:
+        converted_markdown = {}
+
+    markdown_texts = []
+    pending_markdown_texts = set()
+    for (JSON_object, key, extensions, text) in markdown_fields:
+        if (extensions, text) not in converted_markdown and (extensions, text) not in pending_markdown_texts:
+            pending_markdown_texts.add((extensions, text))
+            markdown_texts.append((extensions, text))
+
+    converted_markdown.update(zip(markdown_texts, markdown_batch.convert_markdown_texts(markdown_texts, jobs)))
+
+    for (JSON_object, key, extensions, text) in markdown_fields:
+        JSON_object[key] = converted_markdown[(extensions, text)]
+
+
+def create_json_section(section_markdown_title, section_body, markdown_fields=None):
     """Creates a JSON
-    
+
     Arguments:
     section_markdown_title -- Markdown title of the section
     section_body -- body of the subsection
+    markdown_fields -- List collecting the Markdown fields to convert, see add_markdown_field
     """
-    section_title = section_markdown_title.lstrip('#').strip()
+    section_title = to_unicode(section_markdown_title.lstrip('#').strip())
 
     section = {}
     section["id"] = get_markdow_title_id( section_title )
     section["name"] = section_title
     try:
-        section["body"] = markdown.markdown( section_body.decode('utf-8'), extensions=['markdown.extensions.tables','markdown.extensions.fenced_code'] )
+        add_markdown_field( section, "body", section_body.decode('utf-8'), SECTION_MARKDOWN_EXTENSIONS, markdown_fields )
     except UnicodeDecodeError as ude:
-        section["body"] = markdown.markdown( section_body, extensions=['markdown.extensions.tables','markdown.extensions.fenced_code'] )
+        add_markdown_field( section, "body", section_body, SECTION_MARKDOWN_EXTENSIONS, markdown_fields )
     section["subsections"] = []
 
     return section
@@ -213,15 +362,16 @@ def get_subsection_body(file_descriptor):
     return (body, line)
 
 
-def parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=None):
+def parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=None, markdown_fields=None):
     """Generates a JSON tree of nested metadata sections
 
     Arguments:
     file_descriptor -- list of lines with the content of the file
     parent_section_JSON -- JSON object representing the current parent section
-    last_read_line -- Last remaining read line 
+    last_read_line -- Last remaining read line
+    markdown_fields -- List collecting the Markdown fields to convert, see add_markdown_field
     """
-    
+
     if last_read_line is None:
         line = file_descriptor.readline()
     else:
@@ -235,7 +385,7 @@ def parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_l
         section_name = line
         (body, line) = get_subsection_body(file_descriptor)
 
-        section_JSON = create_json_section(section_name, body)
+        section_JSON = create_json_section(section_name, body, markdown_fields)
 
         parent_section_JSON['subsections'].append(section_JSON)
 
@@ -243,9 +393,9 @@ def parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_l
         next_section_level = get_heading_level(line)
 
         if section_level == next_section_level:   # Section sibling
-           next_line = parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=line) 
+           next_line = parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=line, markdown_fields=markdown_fields)
         elif section_level < next_section_level:  # Section child
-           next_line = parse_metadata_subsections(file_descriptor, section_JSON, last_read_line=line) 
+           next_line = parse_metadata_subsections(file_descriptor, section_JSON, last_read_line=line, markdown_fields=markdown_fields)
         else:   # Not related to current section
             return line
 
@@ -255,30 +405,32 @@ def parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_l
             next_section_level = get_heading_level(next_line)
 
             if section_level == next_section_level:   # Section sibling
-               next_line = parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=next_line) 
+               next_line = parse_metadata_subsections(file_descriptor, parent_section_JSON, last_read_line=next_line,
+                                                      markdown_fields=markdown_fields)
             else:   # Not related to current section
                 return next_line
 
 
-def parse_meta_data(file_path):
+def parse_meta_data(extra_sections, markdown_fields=None):
     """Parses API metadata and returns the result in a JSON object
-    
-    Arguments: 
-    file_path -- File with extra sections
+
+    Arguments:
+    extra_sections -- Text of the extra sections
+    markdown_fields -- List collecting the Markdown fields to convert, see add_markdown_field
     """
-    metadata = create_json_section("root", "")
-  
-    with open(file_path, 'rU') as file_:
-        more = parse_metadata_subsections(file_, metadata)
-        while more:
-            more = parse_metadata_subsections(file_, metadata, more)
+    metadata = create_json_section("root", "", markdown_fields)
+
+    file_ = io.BytesIO(extra_sections)
+    more = parse_metadata_subsections(file_, metadata, markdown_fields=markdown_fields)
+    while more:
+        more = parse_metadata_subsections(file_, metadata, more, markdown_fields)
 
     return metadata
 
 
 def generate_metadata_dictionary(metadata_section):
     """Generates a metadata section as a dictionary from a non-dictionary section
-    
+
     Arguments:
     metadata_section -- Source metadata section
     """
@@ -294,112 +446,215 @@ def generate_metadata_dictionary(metadata_section):
     return metadata_section_dict
 
 
-def add_metadata_to_json(metadata, JSON_file_path):
-    """Adds metadata values to a json file
-    
-    Arguments: 
+def add_metadata_to_json(metadata, json_content):
+    """Adds metadata values to the JSON
+
+    Arguments:
     metadata -- Metadata values in JSON format
-    JSON_file_path -- Path to JSON file
+    json_content -- JSON object with the API parsed definition
     """
-    json_content = ""
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
-        json_content['api_metadata'] = {}
-        for metadataKey in metadata:
-            json_content['api_metadata'][metadataKey] = metadata[metadataKey]
+    json_content['api_metadata'] = {}
+    for metadataKey in metadata:
+        json_content['api_metadata'][metadataKey] = metadata[metadataKey]
 
     #json_content['api_metadata_dict'] = generate_metadata_dictionary( metadata )
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
-
 
-def add_is_pdf_metadata_to_json(is_PDF, JSON_file_path):
+def add_is_pdf_metadata_to_json(is_PDF, json_content):
     """Specifies if FABRE are going to render a PDF or not
-    
-    Arguments: 
+
+    Arguments:
     is_PDF -- Boolean that indicates if FABRE should renderer the PDF template.
-    JSON_file_path -- Path to JSON file
+    json_content -- JSON object with the API parsed definition
     """
-    json_content = ""
+    json_content['is_PDF'] = is_PDF
 
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
-        json_content['is_PDF'] = is_PDF
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
+def parser_json_descriptions(json_content, markdown_fields=None):
+    """Gets the descriptions of resources and actions and parses them as markdown.
 
+    Arguments:
+    json_content -- JSON object with the API parsed definition
+    markdown_fields -- List collecting the Markdown fields to convert, see add_markdown_field
+    """
+    for resource_group in json_content['resourceGroups']:
+        add_markdown_field( resource_group, 'description', resource_group['description'], DESCRIPTION_MARKDOWN_EXTENSIONS, markdown_fields )
+        for resource in resource_group['resources']:
+            add_markdown_field( resource, 'description', resource['description'], DESCRIPTION_MARKDOWN_EXTENSIONS, markdown_fields )
+            for action in resource['actions']:
+                add_markdown_field( action, 'description', action['description'], DESCRIPTION_MARKDOWN_EXTENSIONS, markdown_fields )
 
-def parser_json_descriptions(JSON_file_path):
-    """Gets the descriptions of resources and actions and parses them as markdown. Saves the result in the same JSON file.
-    
-    Arguments: 
-    JSON_file_path -- Path to JSON file
+
+def get_static_files(template_dir_path):
+    """Returns the static files used by the sites rendered with a template
+
+    Arguments:
+    template_dir_path -- path to the template directory
+
+    Returns a list of tuples with the path of every file relative to the rendered site and its absolute path.
     """
-    json_content = ""
-    
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
-        for resource_group in json_content['resourceGroups']:
-            resource_group['description'] = markdown.markdown( resource_group['description'], extensions=['markdown.extensions.tables'] )
-            for resource in resource_group['resources']:
-                resource['description'] = markdown.markdown( resource['description'], extensions=['markdown.extensions.tables'] )
-                for action in resource['actions']:
-                    action['description'] = markdown.markdown( action['description'], extensions=['markdown.extensions.tables'] )
-    
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
+    static_files = []
 
+    for subdirectory in STATIC_FILES_SUBDIRECTORIES:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(template_dir_path, subdirectory)):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name == '__init__.py' or file_name.endswith('.pyc'):
+                    continue
+
+                file_path = os.path.join(dir_path, file_name)
+                static_files.append((os.path.relpath(file_path, template_dir_path), os.path.abspath(file_path)))
+
+    return static_files
+
+
+def copy_static_files(template_dir_path, dst_dir_path, output_writer=None):
+    """Copies the static files used by the resulting rendered site.
+
+    The static files directories of the destination only keep the copied files
+    and the ones generated in the same build.
 
-def copy_static_files(template_dir_path, dst_dir_path):
-    """Copies the static files used by the resulting rendered site
-    
     Arguments:
     template_dir_path -- path to the template directory
     dst_dir_path -- destination directory
+    output_writer -- OutputWriter of the build, or None to save the files right away
     """
-    subdirectories = ['/css', '/js', '/img', '/font']
+    writer = output_writer if output_writer is not None else OutputWriter()
 
-    for subdirectory in subdirectories:
-        if os.path.exists(dst_dir_path + subdirectory):
-            shutil.rmtree(dst_dir_path + subdirectory)
-        shutil.copytree(template_dir_path + subdirectory, dst_dir_path + subdirectory)
+    for subdirectory in STATIC_FILES_SUBDIRECTORIES:
+        writer.manage_directory(os.path.join(dst_dir_path, subdirectory))
 
+    for (relative_path, file_path) in get_static_files(template_dir_path):
+        writer.copy(file_path, os.path.join(dst_dir_path, relative_path))
 
-def render_api_blueprint(template_file_path, context_file_path, dst_dir_path):
-    """Renders an API Blueprint context file with a Jinja2 template.
-    
-    Arguments: 
-    template_file_path -- The Jinja2 template path 
-    context_file_path -- Path to the context file  
-    dst_dir_path -- Path to save the compiled site
+    if output_writer is None:
+        writer.commit()
+
+
+def render_template(template_file_path, json_content, fragment_cache=None):
+    """Renders an API Blueprint JSON object with a Jinja2 template and returns the result.
+
+    Arguments:
+    template_file_path -- The Jinja2 template path
+    json_content -- JSON object with the API parsed definition
+    fragment_cache -- rendered_fragments.FragmentCache reused by the fragments the template renders
+                      with cached_fragment, or None to render them every time
     """
+    from jinja2 import Environment, FileSystemLoader
+    import rendered_fragments
 
     env = Environment(loader=FileSystemLoader(os.path.dirname(template_file_path)))
+    rendered_fragments.add_cached_fragment_function(env, fragment_cache)
     template = env.get_template(os.path.basename(template_file_path))
-    output = ""
-    with open(context_file_path, "rU") as contextFile:
-        output = template.render(json.load(contextFile))
 
-    rendered_HTML_filename = os.path.splitext(os.path.basename(context_file_path))[0]
-    rendered_HTML_path = os.path.join(dst_dir_path, rendered_HTML_filename + ".html")
-    with open(rendered_HTML_path, 'w') as output_file:
-        output_file.write(output.encode('utf-8'))
-    copy_static_files(os.path.dirname(template_file_path), dst_dir_path)
+    return template.render(json_content)
+
+
+def get_page_fragment_cache(asset_options):
+    """Returns the cache of the rendered resource groups and data structures of the pages, kept in
+    the "fragments" cache directory, or None if the asset options don't enable it"""
+    if asset_options is None or not asset_options.get('fragment_cache'):
+        return None
+
+    import rendered_fragments
+
+    return rendered_fragments.get_fragment_cache(get_cache_directory('fragments', asset_options.get('cache_dir')))
+
+
+def render_api_blueprint(template_file_path, json_content, dst_dir_path, rendered_HTML_filename, asset_options=None, with_static_files=True,
+                         output_writer=None):
+    """Renders an API Blueprint JSON object with a Jinja2 template.
+
+    Arguments:
+    template_file_path -- The Jinja2 template path
+    json_content -- JSON object with the API parsed definition
+    dst_dir_path -- Path to save the compiled site
+    rendered_HTML_filename -- Name of the rendered page, without extension
+    asset_options -- Dict with the static asset options ('bundle', 'prune_css', 'subset_fonts', 'hash_filenames'
+                     and 'cache_dir'), or None to load the theme assets as they are. Its 'fragment_cache'
+                     flag reuses the fragments of the page already rendered, see get_page_fragment_cache.
+    with_static_files -- Copy the static files of the template. Pages sharing their static files
+                         copy (and fingerprint) them once, apart from rendering every page
+    output_writer -- OutputWriter of the build, or None to save the files right away
+    """
+    import asset_bundle
+
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    if asset_options is None:
+        asset_options = {}
+
+    output = render_template(template_file_path, json_content, get_page_fragment_cache(asset_options))
+
+    if with_static_files:
+        copy_static_files(os.path.dirname(template_file_path), dst_dir_path, writer)
+
+    if asset_options.get('bundle'):
+        output = asset_bundle.bundle_page_assets(output, os.path.dirname(template_file_path), dst_dir_path, rendered_HTML_filename,
+                                                 asset_options.get('prune_css', False), asset_options.get('subset_fonts', False),
+                                                 get_cache_directory('assets', asset_options.get('cache_dir')), writer)
+
+    if asset_options.get('hash_filenames') and with_static_files:
+        asset_manifest = asset_bundle.fingerprint_static_files(dst_dir_path, STATIC_FILES_SUBDIRECTORIES, writer)
+        output = asset_bundle.rewrite_asset_references(output, asset_manifest)
+
+    writer.write(os.path.join(dst_dir_path, rendered_HTML_filename + ".html"), output)
+
+    if output_writer is None:
+        writer.commit()
 
 
 def create_directory_if_not_exists(dir_path):
     """Creates a directory with the given path if it doesn't exists yet"""
 
     if not os.path.exists(dir_path):
-        os.makedirs(dir_path)
+        try:
+            os.makedirs(dir_path)
+        except OSError:
+            # Another build created it meanwhile
+            if not os.path.isdir(dir_path):
+                raise
+
+
+def create_temp_directory():
+    """Creates a temporary directory inside DEFAULT_TEMP_DIR_PATH and returns its path.
+
+    Every build gets its own directory, so builds running at the same time don't overwrite nor
+    remove each other's intermediate files.
+    """
+    create_directory_if_not_exists(DEFAULT_TEMP_DIR_PATH)
+
+    return tempfile.mkdtemp(dir=DEFAULT_TEMP_DIR_PATH)
+
+
+def remove_temp_directory(temp_dir_path, clear_temporal_dir=True):
+    """Removes a temporary directory created by create_temp_directory, unless the temporary files
+    are kept for debugging purposes"""
+    if clear_temporal_dir:
+        shutil.rmtree(temp_dir_path, ignore_errors=True)
+    else:
+        print "Temporary files kept in " + temp_dir_path
+
+
+def get_cache_directory(name, cache_dir_path=None):
+    """Returns the path of a cache directory, creating it if it doesn't exists yet
+
+    Arguments:
+    name -- Name of the cache, every cache has its own subdirectory
+    cache_dir_path -- Cache root directory, by default DEFAULT_CACHE_DIR_PATH
+    """
+    if cache_dir_path is None:
+        cache_dir_path = DEFAULT_CACHE_DIR_PATH
+
+    dir_path = os.path.join(cache_dir_path, name)
+    create_directory_if_not_exists(dir_path)
+
+    return dir_path
 
 
 def clear_directory(dir_path):
     """Removes all the files on a directory given its path"""
-    
+
     for file in os.listdir(dir_path):
         file_path = os.path.join(dir_path, file)
         try:
@@ -418,19 +673,15 @@ def add_description_to_json_object_parameter_value(JSON_object, parameter_name,
             for parameter_value in object_parameter['values']:
                 if parameter_value['value'] == value_name:
                     value_object = parameter_value
-                    
+
     if value_object != None:
         value_object['description'] = value_description
 
 
-def add_description_to_json_parameter_value(JSON_file_path, resource_or_action_markdown_header, parameter_name, value_name, value_description):
-    """"""
-    json_content = ""
+def find_action_or_resource_json(json_content, markdown_header):
+    """Finds an action or resource in the JSON given its Markdown header line"""
 
-    wanted_object = extract_markdown_header_dict( resource_or_action_markdown_header)
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
+    wanted_object = extract_markdown_header_dict(markdown_header)
 
     found_object = None
 
@@ -448,19 +699,23 @@ def add_description_to_json_parameter_value(JSON_file_path, resource_or_action_m
                     found_object = resource
                     break
 
+    return found_object
+
+
+def add_description_to_json_parameter_value(json_content, resource_or_action_markdown_header, parameter_name, value_name, value_description):
+    """"""
+    found_object = find_action_or_resource_json(json_content, resource_or_action_markdown_header)
+
     if found_object != None:
         add_description_to_json_object_parameter_value(found_object, parameter_name, value_name, value_description)
-                
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
 
 
 def parse_property_member_declaration(property_member_declaration_string):
   """ Utility to parse the declaration of a property member into custom JSON. Based on the MSON specification. """
-  
+
 
   # Store MSON reserved words for the parsing below.
-  # We are interested in the type attribute reserved keywords in order to know whether 
+  # We are interested in the type attribute reserved keywords in order to know whether
   # a property member is required or optional.
   reserved_keywords = {}
   reserved_keywords['type_attribute'] = ['required', 'optional', 'fixed', 'sample', 'default']
@@ -472,12 +727,9 @@ def parse_property_member_declaration(property_member_declaration_string):
   #  - type_definition_list: The list with the technical definition of the property. Since this
   #    list is unordered, we will parse it later to find the needed keywords.
   #  - description: The text provided to describe the context of the property.
-  regex_string = "^[ ]*[-|+][ ](?P<property_name>\w+)[ ]*(?:[[: ][\w, ]*]?[ ]*\((?P<type_definition_list>[\w\W ]+)\))?[ ]*(?:[-](?P<property_description>[ \w\W]+))?\Z"
-  declaration_regex = re.compile(regex_string)
-
-  declaration_match = declaration_regex.match(property_member_declaration_string)
+  declaration_match = apib_patterns.property_member_declaration_regex.match(property_member_declaration_string)
   declaration_dict = declaration_match.groupdict()
-  
+
   property_declaration={}
   property_declaration['name'] = declaration_dict['property_name']
   property_declaration['description'] = declaration_dict['property_description']
@@ -522,7 +774,7 @@ def parse_defined_data_structure_properties(properties_list, remaining_property_
             current_member_indentation = get_indentation(property_member_declaration)
             if last_member_indentation == -1:
                 last_member_indentation = current_member_indentation
-          
+
             # Process the new property as a child, parent or uncle of the last
             # one processed according to their relative line indentations.
             if current_member_indentation == last_member_indentation:
@@ -535,11 +787,13 @@ def parse_defined_data_structure_properties(properties_list, remaining_property_
                 return
         else:
             remaining_property_lines.popleft()
-    
+
 
 def parse_defined_data_structures(data):
   """Retrieves data structures definition from JSON fragment and gives them back as Python dict"""
-  data_structure_dict = {}
+  from markdown.extensions.toc import slugify
+
+  data_structure_dict = OrderedDict()
 
   try:
     if data["content"][0]["sections"][0]["class"] != u'blockDescription':
@@ -557,115 +811,60 @@ def parse_defined_data_structures(data):
       parse_defined_data_structure_properties(data_structure_definition, deque(data_structure_content.split('\n')))
 
     data_structure_name = content["name"]["literal"]
+    data_structure["id"] = 'payload_' + slugify(data_structure_name, '-')
     data_structure["attributes"] = data_structure_definition
     data_structure_dict[data_structure_name] = data_structure
 
   return data_structure_dict
 
 
-def parser_json_data_structures(JSON_file_path):
-    """Retrieves data structures definition from JSON file and writes them in an easier to access format"""
-    
-    json_content = ""
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
+def parser_json_data_structures(json_content):
+    """Retrieves data structures definition from the JSON and writes them in an easier to access format"""
 
     if len(json_content['content']) > 0:
         json_content['data_structures'] = parse_defined_data_structures(json_content['content'][0])
     else:
         json_content['data_structures'] = {}
-    
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
 
 
 def extract_markdown_header_dict(markdown_header):
     """Returns a dict with the elements of a given Markdown header (for resources or actions)"""
     markdown_header = markdown_header.lstrip('#').strip()
-    
-    p = re.compile("(.*) \[(\w*) (.*)\]")
-    
-    header_dict = {}
-    if p.match( markdown_header ):
-        header_groups = p.match(markdown_header).groups()
 
-        header_dict['name'] = header_groups[0]
+    header_groups = apib_patterns.split_markdown_header(markdown_header)
+    if header_groups is None:
+        raise ValueError("Not a resource or action header: " + markdown_header)
+
+    header_dict = {}
+    header_dict['name'] = header_groups[0]
+    if header_groups[1] is not None:
         header_dict['method'] = header_groups[1]
-        header_dict['uriTemplate'] = header_groups[2]
-    else:
-        p = re.compile("(.*) \[(.*)\]")
-        header_groups = p.match( markdown_header ).groups()
+    header_dict['uriTemplate'] = header_groups[2]
 
-        header_dict['name'] = header_groups[0]
-        header_dict['uriTemplate'] = header_groups[1]
-        
     return header_dict
 
 
-def add_custom_code_to_action_or_resource_json(JSON_file_path, action_markdown_line, new_key, new_value):
-    """Finds an action or resource in the JSON file given its Markdown header line and adds a new key value to it"""
-    
-    json_content = ""
-
-    wanted_object = extract_markdown_header_dict(action_markdown_line)
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
-
-    found_object = None
+def add_custom_code_to_action_or_resource_json(json_content, action_markdown_line, new_key, new_value):
+    """Finds an action or resource in the JSON given its Markdown header line and adds a new key value to it"""
 
-    if 'method' in wanted_object:
-        for resource_group in json_content['resourceGroups']:
-            for resource in resource_group['resources']:
-                for action in resource['actions']:
-                    if (action['name'] == wanted_object['name'] and action['method'] == wanted_object['method'] and action['attributes']['uriTemplate'] == wanted_object['uriTemplate']):
-                        found_object = action
-                        break
-    else:
-        for resource_group in json_content['resourceGroups']:
-            for resource in resource_group['resources']:
-                if (resource['name'] == wanted_object['name'] and resource['uriTemplate'] == wanted_object['uriTemplate']):
-                    found_object = resource
-                    break
+    found_object = find_action_or_resource_json(json_content, action_markdown_line)
 
     if found_object != None:
         found_object[new_key] = new_value
-                
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
 
 
-def add_custom_codes_to_json(JSON_file_path, custom_codes):
+def add_custom_codes_to_json(json_content, custom_codes):
     """Inserts found custom code sections to their parent action"""
 
     for custom_code in custom_codes:
-        add_custom_code_to_action_or_resource_json(JSON_file_path, custom_code["parent"], 'custom_codes', custom_code["custom_codes"])
-
-
-def find_and_mark_empty_resources(JSON_obj):
-    """Makes title of empty resources None.
-
-    When a resource has only one action and they share names, the APIB declared an action witohut parent resource.
-    """
-
-    for resource_group in JSON_obj["resourceGroups"]:
-        for resource in resource_group["resources"]:
-            if len(resource["actions"]) == 1:
-                if resource["actions"][0]["name"] == resource["name"]:
-                    resource["name"] = None
+        add_custom_code_to_action_or_resource_json(json_content, custom_code["parent"], 'custom_codes', custom_code["custom_codes"])
 
 
-def find_and_mark_empty_resources(JSON_file_path):
-    """Makes a resource able to be ignored by emprtying its title. 
+def find_and_mark_empty_resources(json_content):
+    """Makes a resource able to be ignored by emprtying its title.
 
     When a resource has only one action and they share names, the APIB declared an action witohut parent resource.
     """
-    
-    json_content = ""
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
 
     for resource_group in json_content["resourceGroups"]:
         for resource in resource_group["resources"]:
@@ -676,20 +875,12 @@ def find_and_mark_empty_resources(JSON_file_path):
                     resource["ignoreTOC"] = False
 
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
-
-
 def get_links_from_description(description):
     """Find via regex all the links in a description string"""
 
-    link_regex = re.compile( "\[(?P<linkText>[^\(\)\[\]]*)\]\((?P<linkRef>[^\(\)\[\]]*)\)" )
-    auto_link_regex = re.compile("\<(?P<linkRef>http[s]?://.*)\>")
-    html_link_regex = re.compile("\<a href=\"(?P<linkRef>http[s]?://.*)\"\>(?P<linkText>[^\<]*)\</a>")
-
     links = []
 
-    link_matches = link_regex.findall(description)
+    link_matches = apib_patterns.link_regex.findall(description)
     if link_matches:
         for link_match in link_matches:
             link = {}
@@ -698,7 +889,7 @@ def get_links_from_description(description):
 
             links.append(link)
     else:
-        link_matches = auto_link_regex.findall(description)
+        link_matches = apib_patterns.auto_link_regex.findall(description)
         if link_matches:
             for link_match in link_matches:
                 link = {}
@@ -707,7 +898,7 @@ def get_links_from_description(description):
 
                 links.append(link)
         else:
-            link_matches = html_link_regex.findall(description)
+            link_matches = apib_patterns.html_link_regex.findall(description)
             if link_matches:
                 for link_match in link_matches:
                     link = {}
@@ -762,240 +953,613 @@ def get_markdown_links(json_content):
     return links
 
 
-def add_reference_links_to_json(JSON_file_path):
-    """Extract all the links from the JSON file and adds them back to the JSON.
+def add_reference_links_to_json(json_content):
+    """Extract all the links from the JSON and adds them back to the JSON.
 
     Arguments:
-    JSON_file_path -- path to the JSON file where all the links will be extracted and added in a separate section.
+    json_content -- JSON object where all the links will be extracted and added in a separate section.
     """
-    json_content = ""
-
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
-
     json_content['reference_links'] = get_markdown_links(json_content)
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
-
 
-def add_nested_parameter_description_to_json(API_blueprint_file_path, JSON_file_path):
+def add_nested_parameter_description_to_json(API_blueprint, json_content):
     """Extracts all nested description for`parameter values and adds them to the JSON.
 
     Arguments:
-    API_specification_path -- path to the specification file where all the links will be extracted from.
-    JSON_file_path -- path to the JSON file where all the links will be added.
+    API_blueprint -- API blueprint text where all the nested descriptions will be extracted from.
+    json_content -- JSON object where all the nested descriptions will be added.
     """
-    json_content = ""
-
-    nested_descriptions_list = apib_extra_parse_utils.get_nested_parameter_values_description(API_blueprint_file_path)
+    nested_descriptions_list = apib_extra_parse_utils.get_nested_parameter_values_description_from_file(io.BytesIO(API_blueprint))
 
     for nested_description in nested_descriptions_list:
         for parameter in nested_description["parameters"]:
             for value in parameter["values"]:
 
-                add_description_to_json_parameter_value(JSON_file_path, 
-                                                        nested_description["parent"], 
-                                                        parameter["name"],
-                                                        value["name"],
-                                                        value["description"])
+                add_description_to_json_parameter_value(json_content,
+                                                        to_unicode(nested_description["parent"]),
+                                                        to_unicode(parameter["name"]),
+                                                        to_unicode(value["name"]),
+                                                        to_unicode(value["description"]))
+
 
+def get_block_id(text, language):
+    """Returns the content-addressed id of a highlighted block: the hash of its language and text"""
+    return 'block_' + hashlib.sha1((language + u'\0' + text).encode('utf-8')).hexdigest()[:16]
 
-def escape_requests_responses_json(JSON_file_path):
-    """Identifies when the body of a request or response uses an XML like type and escapes the '<' for browser rendering.
+
+def add_block_to_store(blocks, text, language, title):
+    """Adds a highlighted block to the block store, highlighting it only if it isn't stored yet.
 
     Arguments:
-    JSON_file_path -- path to the JSON file where requests and responses with XML like body will be escaped.
+    blocks -- Dict with the stored blocks by id
+    text -- Source text of the block
+    language -- Language of the block, as returned by syntax_highlight.guess_language, or 'http' for headers
+    title -- Title of the packet where the block is found, used to reference it from its repetitions
+
+    Returns a tuple with the id of the block and how the packet must render it: 'anchor' when it is
+    the first occurrence of a shared block, 'reference' when it repeats a shared block, or 'inline'
+    when the block is too short to be worth sharing.
     """
-    json_content = ""
+    import syntax_highlight
+
+    block_id = get_block_id(text, language)
+
+    if block_id not in blocks:
+        block = {}
+        block['id'] = block_id
+        block['language'] = language
+        block['title'] = title
+        block['html'] = syntax_highlight.highlight(text, language)
+        blocks[block_id] = block
+
+        use = 'anchor'
+    else:
+        use = 'reference'
 
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
+    if len(text) < MIN_SHARED_BLOCK_LENGTH:
+        use = 'inline'
+
+    return (block_id, use)
+
+
+def add_rest_packet_blocks(blocks, rest_packet, title):
+    """Stores the headers, body and schema of a request or response in the block store, and
+    references them from the packet"""
+    import syntax_highlight
+
+    content_type = None
+    for header in rest_packet["headers"]:
+        if header["name"].lower() == "content-type":
+            content_type = header["value"]
+
+    headers_text = u'\n'.join(header["name"] + u': ' + header["value"] for header in rest_packet["headers"])
+    (rest_packet["headers_block"], rest_packet["headers_block_use"]) = add_block_to_store(blocks, headers_text, 'http', title)
+
+    body_language = syntax_highlight.guess_language(rest_packet["body"], content_type)
+    (rest_packet["body_block"], rest_packet["body_block_use"]) = add_block_to_store(blocks, rest_packet["body"], body_language, title)
+
+    schema = rest_packet.get("schema") or u''
+    (rest_packet["schema_block"], rest_packet["schema_block_use"]) = add_block_to_store(blocks, schema, syntax_highlight.guess_language(schema), title)
+
+
+def highlight_requests_responses_json(json_content):
+    """Highlights the headers, body and schema of every request and response, so the rendered
+    pages don't need to highlight them on the browser.
+
+    Highlighted blocks are content-addressed: identical headers, bodies and schemas are highlighted
+    and stored once in json_content['blocks'], and long ones are rendered once, their repetitions
+    linking to the first occurrence.
+
+    Arguments:
+    json_content -- JSON object where requests and responses will be highlighted.
+    """
+    blocks = {}
 
     for resource_group in json_content["resourceGroups"]:
         for resource in resource_group["resources"]:
             for action in resource["actions"]:
+                action_title = action["method"] + " " + (action["name"] or action["attributes"]["uriTemplate"] or resource["uriTemplate"])
                 for example in action["examples"]:
-
                     for request in example["requests"]:
-                        if request["body"]:
-                            request["body"] = request["body"].replace("<", "&lt;")
-                            if not "sections" in request["content"][0]:
-                                request["content"][0]["content"] = request["content"][0]["content"].replace("<", "&lt;")
+                        add_rest_packet_blocks(blocks, request, ("Request " + request["name"]).strip() + " of " + action_title)
 
                     for response in example["responses"]:
-                        if response["body"]:
-                            response["body"] = response["body"].replace("<", "&lt;")
-                            if not "sections" in response["content"][0]:
-                                response["content"][0]["content"] = response["content"][0]["content"].replace("<", "&lt;")
+                        add_rest_packet_blocks(blocks, response, ("Response " + response["name"]).strip() + " of " + action_title)
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
+    json_content["blocks"] = blocks
+
+
+def render_description(json_content, markdown_fields=None):
+    """Renders the description of the API specification to display it properly.
+
+    Arguments:
+    json_content -- JSON object where the description will be rendered.
+    markdown_fields -- List collecting the Markdown fields to convert, see add_markdown_field
+    """
+    try:
+        add_markdown_field( json_content, "description", json_content["description"].decode('utf-8'), SECTION_MARKDOWN_EXTENSIONS, markdown_fields )
+    except UnicodeEncodeError as error:
+        add_markdown_field( json_content, "description", json_content["description"], SECTION_MARKDOWN_EXTENSIONS, markdown_fields )
 
 
-def render_description(JSON_file_path):
+def escape_ampersand_uri_templates(json_content):
     """Escaping ampersand symbol form URIs.
 
     Arguments:
-    JSON_file_path -- path to the JSON file where the ampersand will be be escaped in URIs.
+    json_content -- JSON object where the ampersand will be be escaped in URIs.
     """
-    json_content = ""
+    for resource_group in json_content["resourceGroups"]:
+        for resource in resource_group["resources"]:
+            resource["uriTemplate"] = resource["uriTemplate"].replace('&', '&amp;')
+            for action in resource["actions"]:
+                action["attributes"]["uriTemplate"] = action["attributes"]["uriTemplate"].replace('&', '&amp;')
 
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
 
-    try:
-        json_content["description"] = markdown.markdown( json_content["description"].decode('utf-8'), extensions=['markdown.extensions.tables','markdown.extensions.fenced_code'] )
-    except UnicodeEncodeError as error:
-        json_content["description"] = markdown.markdown( json_content["description"], extensions=['markdown.extensions.tables','markdown.extensions.fenced_code'] )
+def add_search_index_to_json(json_content, dst_dir_path, API_specification_file_name, output_writer=None):
+    """Generates the search index of the API specification, saves it as a static JSON file
+    in the destination directory and adds its filename to the JSON.
+
+    Arguments:
+    json_content - JSON object containing the API parsed definition
+    dst_dir_path - directory where the search index file will be written
+    API_specification_file_name - name of the API specification, without extension
+    output_writer - OutputWriter of the build, or None to save the file right away
+    """
+    import search_index
+
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    search_index_filename = API_specification_file_name + '-search-index.json'
+    writer.write(os.path.join(dst_dir_path, search_index_filename),
+                 json.dumps(search_index.generate_search_index(json_content), separators=(',', ':'), sort_keys=True))
+
+    if output_writer is None:
+        writer.commit()
+
+    json_content['search_index_file'] = search_index_filename
+
+
+def remove_redundant_spaces(json_content):
+    """Remove redundant spaces from names of resources and actions
+
+    Arguments:
+    json_content - JSON object containing the API parsed definition"""
+    for resource_group in json_content["resourceGroups"]:
+        resource_group["name"] = re.sub( " +", " ", resource_group["name"] )
+        for resource in resource_group["resources"]:
+            resource["name"] = re.sub( " +", " ", resource["name"] )
+            for action in resource["actions"]:
+                action["name"] = re.sub( " +", " ", action["name"] )
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
 
+def generate_api_blueprint_json(extra_sections, API_blueprint, json_content=None, converted_markdown=None, markdown_jobs=None):
+    """Parses the extra sections and the API blueprint of an API specification and returns
+    the JSON object used to render it.
 
-def escape_ampersand_uri_templates(JSON_file_path):
-    """Renders the description of the API spscification to display it properly.
+    The Markdown texts of the metadata sections and descriptions are collected first, and converted
+    as a single batch, see convert_markdown_fields.
 
     Arguments:
-    JSON_file_path -- path to the JSON file where the description will be rendered.
+    extra_sections -- Text of the extra sections of the API specification
+    API_blueprint -- Text of the API blueprint of the API specification
+    json_content -- JSON object of the API blueprint already parsed by parser_api_blueprint, or None to parse it
+    converted_markdown -- Markdown conversions to reuse, see convert_markdown_fields
+    markdown_jobs -- Number of processes converting the Markdown texts, see markdown_batch.convert_markdown_texts
     """
-    json_content = ""
-    json_file_write_path = JSON_file_path + ".aux"
-    URI_regex = re.compile("^([\s\t]*)\"uriTemplate\":[ ]\"(.*)\"$")
+    if json_content is None:
+        json_content = parser_api_blueprint(API_blueprint)
 
-    with open(JSON_file_path, 'rU') as json_file_input, open(json_file_write_path, 'w') as json_file_output:
-        for line in json_file_input:
+    markdown_fields = []
 
-            URI_match = URI_regex.match(line)
-            if URI_match:
-                line = line.replace(URI_match.group(2), URI_match.group(2).replace('&', '&amp;'))
+    add_metadata_to_json(parse_meta_data(extra_sections, markdown_fields), json_content)
+    add_nested_parameter_description_to_json(API_blueprint, json_content)
+    parser_json_descriptions(json_content, markdown_fields)
+    parser_json_data_structures(json_content)
+    find_and_mark_empty_resources(json_content)
+    render_description(json_content, markdown_fields)
+    convert_markdown_fields(markdown_fields, converted_markdown, markdown_jobs)
+    highlight_requests_responses_json(json_content)
+    escape_ampersand_uri_templates(json_content)
+    remove_redundant_spaces(json_content)
+    navigation.generate_navigation_model(json_content)
+    add_reference_links_to_json(json_content)
 
-            json_file_output.write(line)
+    return json_content
 
-    shutil.move(json_file_write_path, JSON_file_path)
 
+def generate_api_specification_json(API_specification):
+    """Parses an API specification and returns the JSON object used to render it.
 
-def generate_resources_and_action_ids(JSON_file_path):
-    """Generate an ID for every resource and action in the given JSON file
+    The Markdown texts are converted by the calling process, as starting a pool of processes from
+    a host process with several threads isn't safe.
 
     Arguments:
-    JSON_file_path - path to the JSON file containing the API parsed definition"""
-    json_content = ""
+    API_specification -- Text of the API specification or file-like object to read it from
+    """
+    (extra_sections, API_blueprint) = split_api_specification(read_api_specification(API_specification))
 
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
+    return generate_api_blueprint_json(extra_sections, API_blueprint, markdown_jobs=1)
 
-    for resource_group in json_content["resourceGroups"]:
-        for resource in resource_group["resources"]:
-            if len( resource["name"] ) > 0:
-                resource["id"] = 'resource_' + slugify( resource["name"], '-' )
-            else:
-                resource["id"] = 'resource_' + slugify( resource["uriTemplate"], '-' )
 
-            for action in resource["actions"]:
-                if len( action["name"] ) > 0:
-                    action["id"] = 'action_' + slugify( action["name"],'-' )
-                else:
-                    if len( action["attributes"]["uriTemplate"] ) > 0:
-                        action["id"] = 'action_' + slugify( action["attributes"]["uriTemplate"], '-' )
-                    else:
-                        if resource["ignoreTOC"] == True:
-                            action["id"] = 'action_' + slugify( resource["uriTemplate"] + action["method"], '-' )
-                        else:
-                            action["id"] = 'action_' + slugify( resource["name"] + action["method"], '-' )
-
-    with open(JSON_file_path, 'w') as json_file:
+def generate_api_specification_context(API_specification_path, temp_dir_path):
+    """Parses an API specification and generates the JSON context used to render it.
+
+    The intermediate files are kept in the temporary directory for debugging purposes.
+
+    Arguments:
+    API_specification_path -- Path to API Blueprint specification
+    temp_dir_path -- Directory where the intermediate files will be generated
+
+    Returns the generated JSON context.
+    """
+    API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+
+    API_extra_sections_file_path = os.path.join(temp_dir_path, API_specification_file_name + '.extras')
+    API_blueprint_file_path = os.path.join(temp_dir_path + '/' + API_specification_file_name + '.apib')
+    API_blueprint_JSON_file_path = os.path.join(temp_dir_path + '/' + API_specification_file_name + '.json')
+
+    create_directory_if_not_exists(temp_dir_path)
+
+    with open(API_specification_path, 'rU') as API_specification_file:
+        (extra_sections, API_blueprint) = split_api_specification(read_api_specification(API_specification_file))
+
+    with open(API_extra_sections_file_path, 'w') as extra_sections_file:
+        extra_sections_file.write(extra_sections)
+    with open(API_blueprint_file_path, 'w') as API_blueprint_file:
+        API_blueprint_file.write(API_blueprint)
+
+    json_content = generate_api_blueprint_json(extra_sections, API_blueprint)
+
+    with open(API_blueprint_JSON_file_path, 'w') as json_file:
         json.dump(json_content, json_file, indent=4)
 
+    return json_content
 
-def remove_redundant_spaces(JSON_file_path):
-    """Remove redundant spaces from names of resources and actions
+
+def render_api_specification_context(json_content, API_specification_file_name, template_path, dst_dir_path, cover=None, asset_options=None,
+                                     output_writer=None):
+    """Renders an already generated JSON context using a template and saves it to destination directory.
 
     Arguments:
-    JSON_file_path - path to the JSON file containing the API parsed definition"""
-    json_content = ""
+    json_content -- JSON context generated by generate_api_specification_context
+    API_specification_file_name -- Name of the API specification, used to name the rendered page
+    template_path -- The Jinja2 template path
+    dst_dir_path -- Path to save the compiled site
+    cover -- The Jinja2 template path of the cover, only needed for pdf
+    asset_options -- Static asset options of the html page, see render_api_blueprint
+    output_writer -- OutputWriter of the build, or None to save the files right away
+    """
+    writer = output_writer if output_writer is not None else OutputWriter()
 
-    with open(JSON_file_path, 'rU') as json_file:
-        json_content = json.load(json_file)
+    # Every render adds its own keys, so they don't leak to other renders of the same context
+    json_content = dict(json_content)
 
-    for resource_group in json_content["resourceGroups"]:
-        resource_group["name"] = re.sub( " +", " ", resource_group["name"] )
-        for resource in resource_group["resources"]:
-            resource["name"] = re.sub( " +", " ", resource["name"] )
-            for action in resource["actions"]:
-                action["name"] = re.sub( " +", " ", action["name"] )
+    add_is_pdf_metadata_to_json(cover is not None, json_content)
 
-    with open(JSON_file_path, 'w') as json_file:
-        json.dump(json_content, json_file, indent=4)
+    if cover is None:
+        add_search_index_to_json(json_content, dst_dir_path, API_specification_file_name, writer)
+
+    render_api_blueprint(template_path, json_content, dst_dir_path, API_specification_file_name, asset_options if cover is None else None,
+                         output_writer=writer)
+
+    if (cover is not None): #cover needed for pdf
+        render_api_blueprint( cover, json_content, dst_dir_path, 'cover', output_writer=writer )
+
+    if output_writer is None:
+        writer.commit()
 
 
 def render_api_specification(API_specification_path, template_path, dst_dir_path, clear_temporal_dir=True, cover=None):
     """Renders an API specification using a template and saves it to destination directory.
-    
-    Arguments: 
+
+    Arguments:
     API_specification_path -- Path to API Blueprint specification
     template_path -- The Jinja2 template path
     dst_dir_path -- Path to save the compiled site
-    clear_temporal_dir -- Flag to clear temporary files generated by the script  
+    clear_temporal_dir -- Flag to clear temporary files generated by the script
+    """
+
+    temp_dir_path = create_temp_directory()
+    API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+
+    try:
+        json_content = generate_api_specification_context(API_specification_path, temp_dir_path)
+
+        render_api_specification_context(json_content, API_specification_file_name, template_path, dst_dir_path, cover)
+    finally:
+        remove_temp_directory(temp_dir_path, clear_temporal_dir)
+
+
+def render_pdf_from_context(json_content, API_specification_file_name, template_path, cover_template_path, dst_pdf_path):
+    """Renders an already generated JSON context to a pdf file.
+
+    Arguments:
+    json_content -- JSON context generated by generate_api_specification_context
+    API_specification_file_name -- Name of the API specification
+    template_path -- The Jinja2 template path of the pdf body
+    cover_template_path -- The Jinja2 template path of the pdf cover
+    dst_pdf_path -- Path of the resulting pdf file
+    """
+    # The pages read by wkhtmltopdf are rendered in a directory of their own, so pdfs rendered at
+    # the same time don't overwrite each other's pages
+    temp_pdf_path = create_temp_directory()
+    try:
+        rendered_HTML_path = os.path.join(temp_pdf_path, API_specification_file_name + ".html")
+        rendered_HTML_cover = os.path.join(temp_pdf_path, "cover" + ".html")
+
+        render_api_specification_context(json_content, API_specification_file_name, template_path, temp_pdf_path, cover_template_path)
+        call( ["wkhtmltopdf", '-d', '125', '--page-size','A4', "page", "file://"+rendered_HTML_cover ,"toc" ,"page", "file://"+rendered_HTML_path, '--footer-center', "Page [page]",'--footer-font-size', '8', '--footer-spacing', '3', dst_pdf_path ])
+    finally:
+        remove_temp_directory(temp_pdf_path)
+
+
+def save_compiled_context(json_content, API_specification_file_name, compiled_context_path, output_writer=None):
+    """Saves a JSON context as a versioned compiled context, which can be rendered later without parsing
+    the API specification again.
+
+    Arguments:
+    json_content -- JSON context generated by generate_api_specification_context
+    API_specification_file_name -- Name of the API specification
+    compiled_context_path -- Path of the resulting compiled context
+    output_writer -- OutputWriter of the build, or None to save the file right away
+    """
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    compiled_context = OrderedDict()
+    compiled_context['fabre_context_version'] = COMPILED_CONTEXT_VERSION
+    compiled_context['name'] = API_specification_file_name
+    compiled_context['context'] = json_content
+
+    writer.write(compiled_context_path, json.dumps(compiled_context, separators=(',', ':')))
+
+    if output_writer is None:
+        writer.commit()
+
+
+def load_compiled_context(compiled_context_path):
+    """Loads a compiled context.
+
+    Arguments:
+    compiled_context_path -- Path to the compiled context generated by save_compiled_context
+
+    Returns a tuple with the JSON context and the name of the API specification.
+    """
+    with open(compiled_context_path, 'rU') as compiled_context_file:
+        compiled_context = json.load(compiled_context_file, object_pairs_hook=OrderedDict)
+
+    if not isinstance(compiled_context, dict) or 'fabre_context_version' not in compiled_context:
+        raise ValueError(compiled_context_path + ' is not a fabre compiled context')
+
+    if compiled_context['fabre_context_version'] != COMPILED_CONTEXT_VERSION:
+        raise ValueError("Unsupported compiled context version %s (expected %s), compile the API specification again"
+                         % (compiled_context['fabre_context_version'], COMPILED_CONTEXT_VERSION))
+
+    return (compiled_context['context'], compiled_context['name'])
+
+
+def render_api_specification_context_formats(json_content, API_specification_file_name, formats, templates, dst_dir_path, asset_options=None,
+                                             output_writer=None):
+    """Renders an already generated JSON context to several output formats.
+
+    Arguments:
+    json_content -- JSON context generated by generate_api_specification_context
+    API_specification_file_name -- Name of the API specification, used to name the outputs
+    formats -- List of output formats ('html', 'pdf' and/or 'json')
+    templates -- Dict with the template paths to be used: 'html', 'pdf' and 'cover'
+    dst_dir_path -- Path to save the outputs. When it ends with ".pdf" and pdf is the only
+                    requested format, it is the path of the resulting pdf file.
+    asset_options -- Static asset options of the html page, see render_api_blueprint
+    output_writer -- OutputWriter of the build, or None to save the files right away
     """
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    if formats == ['pdf'] and dst_dir_path.endswith(".pdf"):
+        dst_pdf_path = dst_dir_path
+        dst_dir_path = os.path.dirname(dst_dir_path) or '.'
+    else:
+        dst_pdf_path = os.path.join(dst_dir_path, API_specification_file_name + ".pdf")
+
+    if 'json' in formats:
+        save_compiled_context(json_content, API_specification_file_name, os.path.join(dst_dir_path, API_specification_file_name + ".json"), writer)
 
-    temp_dir_path = "/var/tmp/fiware_api_blueprint_renderer_tmp"
+    for output_format in formats:
+        if output_format == 'html':
+            render_api_specification_context(json_content, API_specification_file_name, templates['html'], dst_dir_path,
+                                             asset_options=asset_options, output_writer=writer)
+        elif output_format == 'pdf':
+            # wkhtmltopdf saves the pdf to a file, which is staged like the other outputs
+            (fd, temp_pdf_file_path) = tempfile.mkstemp(suffix='.pdf')
+            os.close(fd)
+            try:
+                render_pdf_from_context(json_content, API_specification_file_name, templates['pdf'], templates['cover'], temp_pdf_file_path)
+                writer.copy(temp_pdf_file_path, dst_pdf_path)
+            finally:
+                os.remove(temp_pdf_file_path)
 
+    if output_writer is None:
+        writer.commit()
+
+
+def render_api_specification_formats(API_specification_path, formats, templates, dst_dir_path, clear_temporal_dir=True, asset_options=None,
+                                     output_writer=None):
+    """Renders an API specification to several output formats parsing it only once.
+
+    Arguments:
+    API_specification_path -- Path to API Blueprint specification
+    formats -- List of output formats ('html', 'pdf' and/or 'json')
+    templates -- Dict with the template paths to be used: 'html', 'pdf' and 'cover'
+    dst_dir_path -- Path to save the outputs. When it ends with ".pdf" and pdf is the only
+                    requested format, it is the path of the resulting pdf file.
+    clear_temporal_dir -- Flag to clear temporary files generated by the script
+    asset_options -- Static asset options of the html page, see render_api_blueprint
+    output_writer -- OutputWriter of the build, or None to save the files right away
+
+    The intermediate files are generated in a new temporary directory, see create_temp_directory.
+
+    Returns the changed, unchanged and removed files, see OutputWriter.commit, or None when the
+    files are staged in the given output_writer.
+    """
     API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    temp_dir_path = create_temp_directory()
+    try:
+        json_content = generate_api_specification_context(API_specification_path, temp_dir_path)
+        render_api_specification_context_formats(json_content, API_specification_file_name, formats, templates, dst_dir_path, asset_options, writer)
+    finally:
+        remove_temp_directory(temp_dir_path, clear_temporal_dir)
 
+    if output_writer is None:
+        return writer.commit()
 
-    API_extra_sections_file_path = os.path.join(temp_dir_path, API_specification_file_name + '.extras')
-    API_blueprint_file_path = os.path.join(temp_dir_path + '/' + API_specification_file_name + '.apib')
-    API_blueprint_JSON_file_path = os.path.join(temp_dir_path + '/' + API_specification_file_name + '.json')
-    
-    create_directory_if_not_exists(temp_dir_path)
-    separate_extra_sections_and_api_blueprint(API_specification_path, API_extra_sections_file_path, API_blueprint_file_path)
 
-    parser_api_blueprint(API_blueprint_file_path, API_blueprint_JSON_file_path)
-    add_metadata_to_json(parse_meta_data(API_extra_sections_file_path), API_blueprint_JSON_file_path)
-    add_nested_parameter_description_to_json(API_blueprint_file_path, API_blueprint_JSON_file_path)
-    parser_json_descriptions(API_blueprint_JSON_file_path)
-    parser_json_data_structures(API_blueprint_JSON_file_path)
-    find_and_mark_empty_resources(API_blueprint_JSON_file_path)
-    render_description(API_blueprint_JSON_file_path)
-    escape_requests_responses_json(API_blueprint_JSON_file_path)
-    escape_ampersand_uri_templates(API_blueprint_JSON_file_path)
-    generate_resources_and_action_ids(API_blueprint_JSON_file_path)
-    remove_redundant_spaces(API_blueprint_JSON_file_path)
-    add_reference_links_to_json(API_blueprint_JSON_file_path)
+def compile_api_specification(API_specification_path, compiled_context_path, clear_temporal_dir=True, output_writer=None):
+    """Parses an API specification and saves its compiled context.
+
+    Arguments:
+    API_specification_path -- Path to API Blueprint specification
+    compiled_context_path -- Path of the resulting compiled context. If it doesn't end with ".json"
+                             it is a directory where "<spec-name>.json" will be saved.
+    clear_temporal_dir -- Flag to clear temporary files generated by the script
+    output_writer -- OutputWriter of the build, or None to save the file right away
 
-    add_is_pdf_metadata_to_json(cover is not None, API_blueprint_JSON_file_path)
+    Returns the changed and unchanged files, see OutputWriter.commit, or None when the file is
+    staged in the given output_writer.
+    """
+    API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+    writer = output_writer if output_writer is not None else OutputWriter()
 
-    render_api_blueprint(template_path, API_blueprint_JSON_file_path, dst_dir_path)
+    if not compiled_context_path.endswith(".json"):
+        compiled_context_path = os.path.join(compiled_context_path, API_specification_file_name + ".json")
 
-    if (cover is not None): #cover needed for pdf
-        #rename json
-        cover_json_path = os.path.join( dst_dir_path + '/' + 'cover' + '.json' )
-        shutil.move(API_blueprint_JSON_file_path, cover_json_path)
-        render_api_blueprint( cover, cover_json_path, dst_dir_path )
-        shutil.move(cover_json_path, API_blueprint_JSON_file_path)
-        return
+    temp_dir_path = create_temp_directory()
+    try:
+        json_content = generate_api_specification_context(API_specification_path, temp_dir_path)
+        save_compiled_context(json_content, API_specification_file_name, compiled_context_path, writer)
+    finally:
+        remove_temp_directory(temp_dir_path, clear_temporal_dir)
+
+    if output_writer is None:
+        return writer.commit()
+
+
+def render_compiled_context(compiled_context_path, formats, templates, dst_dir_path, asset_options=None, output_writer=None):
+    """Renders a compiled context to several output formats without parsing the API specification again.
+
+    Arguments:
+    compiled_context_path -- Path to the compiled context generated by compile_api_specification
+    formats -- List of output formats ('html', 'pdf' and/or 'json')
+    templates -- Dict with the template paths to be used: 'html', 'pdf' and 'cover'
+    dst_dir_path -- Path to save the outputs
+    asset_options -- Static asset options of the html page, see render_api_blueprint
+    output_writer -- OutputWriter of the build, or None to save the files right away
+
+    Returns the changed, unchanged and removed files, see OutputWriter.commit, or None when the
+    files are staged in the given output_writer.
+    """
+    (json_content, API_specification_file_name) = load_compiled_context(compiled_context_path)
+    writer = output_writer if output_writer is not None else OutputWriter()
+
+    render_api_specification_context_formats(json_content, API_specification_file_name, formats, templates, dst_dir_path, asset_options, writer)
+
+    if output_writer is None:
+        return writer.commit()
+
+
+def render_api_specification_to_string(API_specification, template_path=DEFAULT_TEMPLATE_PATH):
+    """Renders an API specification in memory and returns the resulting HTML page.
+
+    No file is written: the static files needed by the page can be obtained with
+    get_static_asset_list. This function is re-entrant and can be called from several threads at
+    once; it starts no process other than drafter.
+
+    Arguments:
+    API_specification -- Text of the API specification or file-like object to read it from
+    template_path -- The Jinja2 template path
+    """
+    json_content = generate_api_specification_json(API_specification)
+    add_is_pdf_metadata_to_json(False, json_content)
+
+    return render_template(template_path, json_content)
+
+
+def render_api_specification_to_stream(API_specification, output_stream, template_path=DEFAULT_TEMPLATE_PATH):
+    """Renders an API specification in memory and writes the resulting HTML page, UTF-8 encoded,
+    to a file-like object.
+
+    Arguments:
+    API_specification -- Text of the API specification or file-like object to read it from
+    output_stream -- File-like object where the rendered page will be written
+    template_path -- The Jinja2 template path
+    """
+    output_stream.write(render_api_specification_to_string(API_specification, template_path).encode('utf-8'))
 
-    if( clear_temporal_dir == True ):
-        clear_directory( temp_dir_path )
+
+def get_static_asset_list(template_path=DEFAULT_TEMPLATE_PATH):
+    """Returns the static files needed by the pages rendered with a template.
+
+    Arguments:
+    template_path -- The Jinja2 template path
+
+    Returns a list of tuples with the path of every file relative to the rendered page and its absolute path.
+    """
+    return get_static_files(os.path.dirname(template_path))
 
 
 def main():   
     
-    usage = "Usage: \n\t" + sys.argv[0] + " -i <api-spec-path> -o <dst-dir> [--pdf] [--no-clear-temp-dir] [--template]"
+    usage = ("Usage: \n\t" + sys.argv[0] + " -i <api-spec-path> -o <dst-dir> [--pdf] [--formats html,pdf,json] [--no-clear-temp-dir] [--markdown-jobs <n>] [--template] [--html-template] [--pdf-template] [--cover-template] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--fragment-cache] [--cache-dir <dir>] [--archive <archive-path> [--archive-format zip|tar.gz]]"
+             + "\n\t" + sys.argv[0] + " compile -i <api-spec-path> -o <compiled-context-path> [--no-clear-temp-dir] [--markdown-jobs <n>] [--archive <archive-path> [--archive-format zip|tar.gz]]"
+             + "\n\t" + sys.argv[0] + " render --context <compiled-context-path> -o <dst-dir> [--pdf] [--formats html,pdf,json] [--template] [--html-template] [--pdf-template] [--cover-template] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--fragment-cache] [--cache-dir <dir>] [--archive <archive-path> [--archive-format zip|tar.gz]]"
+             + "\n\t" + sys.argv[0] + " site -o <dst-dir> [-i <api-spec-path>]... [<api-spec-path-or-dir>...] [--template] [--index-template] [--jobs <n>] [--no-clear-temp-dir] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--fragment-cache] [--cache-dir <dir>] [--archive <archive-path> [--archive-format zip|tar.gz]]"
+             + "\n\t" + sys.argv[0] + " versions -o <dst-dir> [-i <api-spec-path>]... [<api-spec-path>...] [--template] [--index-template] [--changelog-template] [--jobs <n>] [--markdown-jobs <n>] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--cache-dir <dir>] [--archive <archive-path> [--archive-format zip|tar.gz]]"
+             + "\n\t" + sys.argv[0] + " enqueue --queue <queue-dir> [-i <api-spec-path>]... [--context <compiled-context-path>]... [<api-spec-path-or-dir>...] [-o <dst-dir>] [--formats html,pdf,json] [--template] [--html-template] [--pdf-template] [--cover-template] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--fragment-cache]"
+             + "\n\t" + sys.argv[0] + " batch --journal <journal-path> -o <dst-dir> [-i <api-spec-path>]... [--context <compiled-context-path>]... [<api-spec-path-or-dir>...] [--formats html,pdf,json] [--template] [--html-template] [--pdf-template] [--cover-template] [--bundle-assets] [--prune-css] [--subset-fonts] [--hash-assets] [--fragment-cache] [--jobs <n>]"
+             + "\n\t" + sys.argv[0] + " worker --queue <queue-dir> --results <result-dir> [--heartbeat <seconds>] [--stale-timeout <seconds>] [--max-attempts <n>] [--drain]"
+             + "\n\t" + sys.argv[0] + " --check [-i <api-spec-path>]... [<api-spec-path-or-dir>...] [--check-report <report-path>] [--jobs <n>]"
+             + "\n\t" + sys.argv[0] + " --check-links [-i <api-spec-path>]... [<api-spec-path-or-dir>...] [--cache-dir <dir>] [--cache-ttl <seconds>] [--jobs <n>]")
     
-    default_theme = os.path.dirname(__file__)+"/../themes/default_theme/api-specification.tpl"
-    pdt_template_path= os.path.dirname(__file__)+"/../themes/default_theme/api-specification-pdf.tpl"
-    cover_template_path= os.path.dirname(__file__)+"/../themes/default_theme/cover.tpl"
-    template_path= default_theme
+    templates = {'html': DEFAULT_TEMPLATE_PATH, 'pdf': DEFAULT_PDF_TEMPLATE_PATH, 'cover': DEFAULT_COVER_TEMPLATE_PATH}
+    template_path = None
     clear_temporal_dir = True
     API_specification_path = None
+    API_specification_paths = []
+    compiled_context_path = None
+    compiled_context_paths = []
+    index_template_path = None
+    changelog_template_path = None
+    check = False
+    check_report_path = None
+    check_links = False
+    cache_dir_path = None
+    cache_ttl = None
+    jobs = None
+    asset_options = None
     dst_dir_path = None
-    temp_pdf_path = "/var/tmp/fiware_api_blueprint_renderer_tmp_pdf/"
-    pdf = False
+    formats = ['html']
+    queue_dir_path = None
+    result_dir_path = None
+    worker_options = {}
+    template_options = {}
+    archive_path = None
+    archive_format = None
+    journal_path = None
+
+    arguments = sys.argv[1:]
+    command = None
+    if arguments and arguments[0] in ("compile", "render", "site", "versions", "enqueue", "worker", "batch"):
+        command = arguments.pop(0)
 
     try:
-        opts, args = getopt.getopt(sys.argv[1:],"hi:o:ct:",["ifile=","odir=","no-clear-temp-dir","template=","pdf"])
+        opts, args = getopt.gnu_getopt(arguments,"hi:o:ct:j:",["ifile=","odir=","no-clear-temp-dir","template=","pdf",
+                                                         "formats=","html-template=","pdf-template=","cover-template=",
+                                                         "context=","check","check-report=","jobs=",
+                                                         "check-links","cache-dir=","cache-ttl=",
+                                                         "bundle-assets","prune-css","subset-fonts","hash-assets",
+                                                         "index-template=","queue=","results=","heartbeat=",
+                                                         "stale-timeout=","max-attempts=","drain","archive=",
+                                                         "archive-format=","journal=","fragment-cache",
+                                                         "changelog-template=","markdown-jobs="])
     except getopt.GetoptError:
       print usage
       sys.exit(2)
@@ -1005,20 +1569,339 @@ def main():
             sys.exit()
         elif opt in ("-i", "--input"):
             API_specification_path = arg
+            API_specification_paths.append(arg)
         elif opt in ("-o", "--output"):
             dst_dir_path = arg
         elif opt in ("-t", "--template"):
             template_path = arg
         elif opt in ("-c", "--no-clear-temp-dir"):
             clear_temporal_dir = False
-        elif opt in ("--pdf"):
-            pdf = True
-            #if no template is specified, uses the default pdf template
-            if not ('-t' in zip(*opts)[0] or '--template' in zip(*opts)[0]):
-                template_path = pdt_template_path
+        elif opt == "--pdf":
+            formats = ['pdf']
+        elif opt == "--formats":
+            formats = [output_format.strip() for output_format in arg.split(',') if output_format.strip()]
+        elif opt == "--html-template":
+            templates['html'] = template_options['html'] = arg
+        elif opt == "--pdf-template":
+            templates['pdf'] = template_options['pdf'] = arg
+        elif opt == "--cover-template":
+            templates['cover'] = template_options['cover'] = arg
+        elif opt == "--index-template":
+            index_template_path = arg
+        elif opt == "--changelog-template":
+            changelog_template_path = arg
+        elif opt == "--context":
+            compiled_context_path = arg
+            compiled_context_paths.append(arg)
+        elif opt == "--check":
+            check = True
+        elif opt == "--check-report":
+            check_report_path = arg
+        elif opt in ("-j", "--jobs"):
+            try:
+                jobs = int(arg)
+            except ValueError:
+                print "The number of jobs must be an integer"
+                print usage
+                sys.exit(2)
+        elif opt == "--markdown-jobs":
+            import markdown_batch
+
+            try:
+                markdown_batch.default_jobs = int(arg)
+            except ValueError:
+                print "The number of Markdown jobs must be an integer"
+                print usage
+                sys.exit(2)
+        elif opt == "--check-links":
+            check_links = True
+        elif opt == "--cache-dir":
+            cache_dir_path = arg
+        elif opt == "--cache-ttl":
+            try:
+                cache_ttl = int(arg)
+            except ValueError:
+                print "The cache TTL must be an integer number of seconds"
+                print usage
+                sys.exit(2)
+        elif opt in ("--bundle-assets", "--prune-css", "--subset-fonts"):
+            if asset_options is None:
+                asset_options = {}
+            asset_options['bundle'] = True
+            if opt == "--prune-css":
+                asset_options['prune_css'] = True
+            elif opt == "--subset-fonts":
+                asset_options['subset_fonts'] = True
+        elif opt == "--hash-assets":
+            if asset_options is None:
+                asset_options = {}
+            asset_options['hash_filenames'] = True
+        elif opt == "--fragment-cache":
+            if asset_options is None:
+                asset_options = {}
+            asset_options['fragment_cache'] = True
+        elif opt == "--queue":
+            queue_dir_path = arg
+        elif opt == "--results":
+            result_dir_path = arg
+        elif opt in ("--heartbeat", "--stale-timeout", "--max-attempts"):
+            try:
+                worker_options[opt[2:].replace('-', '_')] = int(arg)
+            except ValueError:
+                print "The " + opt + " option must be an integer"
+                print usage
+                sys.exit(2)
+        elif opt == "--drain":
+            worker_options['drain'] = True
+        elif opt == "--archive":
+            archive_path = arg
+        elif opt == "--archive-format":
+            archive_format = arg
+        elif opt == "--journal":
+            journal_path = arg
+
+    if asset_options is not None:
+        asset_options['cache_dir'] = cache_dir_path
+
+    if asset_options is not None and asset_options.get('subset_fonts', False):
+        import asset_bundle
+
+        if not asset_bundle.can_subset_fonts():
+            print "fontTools is not installed, fonts are not subset"
+
+    if check or check_links:
+        import spec_check
+
+        API_specification_paths = spec_check.find_api_specifications(API_specification_paths + args)
+        if not API_specification_paths:
+            print "API specification file must be specified"
+            print usage
+            sys.exit(3)
+
+        failed = 0
+
+        if check:
+            results = spec_check.check_api_specifications(API_specification_paths, jobs)
+            for result in results:
+                for problem in result['problems']:
+                    print spec_check.format_problem(problem).encode('utf-8')
+
+            if check_report_path is not None:
+                spec_check.write_check_report(results, check_report_path)
+
+            failed = len([result for result in results if not result['ok']])
+            print "%d specification(s) checked, %d failed" % (len(results), failed)
+
+        if check_links:
+            import link_check
+
+            links = link_check.check_api_specifications_links(API_specification_paths, cache_dir_path,
+                                                             cache_ttl if cache_ttl is not None else link_check.DEFAULT_CACHE_TTL,
+                                                             jobs or link_check.DEFAULT_THREADS)
+            broken_links = [link for link in links if not link['ok']]
+            for link in broken_links:
+                print link_check.format_broken_link(link).encode('utf-8')
+
+            print "%d link(s) checked, %d broken" % (len(links), len(broken_links))
+            failed += len(broken_links)
+
+        sys.exit(1 if failed else 0)
+
+    if template_path is not None:
+        #the generic template applies to the pdf when it is the only output
+        if formats == ['pdf']:
+            templates['pdf'] = template_options['pdf'] = template_path
+        else:
+            templates['html'] = template_options['html'] = template_path
+
+    for output_format in formats:
+        if output_format not in ('html', 'pdf', 'json'):
+            print "Unknown output format: " + output_format
+            print usage
+            sys.exit(2)
+
+    output_writer = None
+    if archive_path is not None:
+        import archive_writer
+
+        if command in ("enqueue", "worker", "batch"):
+            print "The " + command + " command can't write archives"
+            print usage
+            sys.exit(2)
+
+        if dst_dir_path is not None:
+            print "The destination directory and the archive can't be both specified"
+            print usage
+            sys.exit(2)
+
+        try:
+            archive_writer.get_archive_format(sys.stdout if archive_path == '-' else archive_path, archive_format)
+        except ValueError as error:
+            print error
+            print usage
+            sys.exit(2)
+
+        # The build is staged in memory and archived, nothing is written to its directory
+        output_writer = OutputWriter()
+        dst_dir_path = os.path.join(DEFAULT_TEMP_DIR_PATH, "archive-root")
 
+        if archive_path == '-':
+            # The archive takes the standard output: the messages of fabre, drafter and wkhtmltopdf
+            # go to the standard error
+            sys.stdout.flush()
+            archive_path = os.fdopen(os.dup(1), 'wb')
+            os.dup2(2, 1)
 
-    if API_specification_path is None:
+    if command in ("enqueue", "worker"):
+        import render_queue
+
+        if queue_dir_path is None:
+            print "Queue directory must be specified"
+            print usage
+            sys.exit(3)
+
+        if command == "enqueue":
+            import spec_check
+
+            API_specification_paths = spec_check.find_api_specifications(API_specification_paths + args)
+            if not API_specification_paths and not compiled_context_paths:
+                print "API specification file must be specified"
+                print usage
+                sys.exit(3)
+
+            for path in API_specification_paths:
+                print render_queue.enqueue_job(queue_dir_path, render_queue.create_job(formats, template_options, asset_options,
+                                                                                      API_specification_path=path, dst_dir_path=dst_dir_path))
+            for path in compiled_context_paths:
+                print render_queue.enqueue_job(queue_dir_path, render_queue.create_job(formats, template_options, asset_options,
+                                                                                      compiled_context_path=path, dst_dir_path=dst_dir_path))
+            sys.exit(0)
+
+        if result_dir_path is None:
+            print "Result directory must be specified"
+            print usage
+            sys.exit(4)
+
+        results = render_queue.run_worker(queue_dir_path, result_dir_path,
+                                          heartbeat_interval=worker_options.get('heartbeat', render_queue.DEFAULT_HEARTBEAT_INTERVAL),
+                                          stale_timeout=worker_options.get('stale_timeout', render_queue.DEFAULT_STALE_TIMEOUT),
+                                          max_attempts=worker_options.get('max_attempts', render_queue.DEFAULT_MAX_ATTEMPTS),
+                                          drain=worker_options.get('drain', False))
+        failed = len([result for result in results if result['status'] != 'done'])
+        print "%d job(s) rendered, %d failed" % (len(results) - failed, failed)
+        sys.exit(1 if failed else 0)
+
+    if command == "batch":
+        import render_batch
+        import render_queue
+        import spec_check
+
+        if journal_path is None:
+            print "Journal file must be specified"
+            print usage
+            sys.exit(3)
+
+        API_specification_paths = spec_check.find_api_specifications(API_specification_paths + args)
+        if not API_specification_paths and not compiled_context_paths:
+            print "API specification file must be specified"
+            print usage
+            sys.exit(3)
+
+        if dst_dir_path is None:
+            print "Destination directory must be specified"
+            print usage
+            sys.exit(4)
+
+        batch_jobs = [render_queue.create_job(formats, template_options, asset_options, API_specification_path=path, dst_dir_path=dst_dir_path)
+                      for path in API_specification_paths]
+        batch_jobs += [render_queue.create_job(formats, template_options, asset_options, compiled_context_path=path, dst_dir_path=dst_dir_path)
+                       for path in compiled_context_paths]
+
+        (records, skipped_count) = render_batch.run_batch(batch_jobs, journal_path, jobs)
+        failed = [record for record in records if record['status'] != 'done']
+        for record in failed:
+            print render_batch.format_batch_record(record).encode('utf-8')
+
+        print "%d item(s) rendered, %d skipped as already done, %d failed" % (len(records) - len(failed), skipped_count, len(failed))
+        for record in sorted(records, key=lambda record: record['duration'], reverse=True)[:render_batch.SLOWEST_ITEM_COUNT]:
+            print "slowest: " + render_batch.format_batch_record(record).encode('utf-8')
+        sys.exit(1 if failed else 0)
+
+    if command == "site":
+        import site_builder
+        import spec_check
+
+        API_specification_paths = spec_check.find_api_specifications(API_specification_paths + args)
+        if not API_specification_paths:
+            print "API specification file must be specified"
+            print usage
+            sys.exit(3)
+
+        if dst_dir_path is None:
+            print "Destination directory must be specified"
+            print usage
+            sys.exit(4)
+
+        (summaries, warnings, output_stats) = site_builder.render_site(API_specification_paths, templates['html'],
+                                                         index_template_path or site_builder.DEFAULT_SITE_INDEX_TEMPLATE_PATH,
+                                                         dst_dir_path, asset_options, jobs, clear_temporal_dir, output_writer)
+        for warning in warnings:
+            print warning.encode('utf-8')
+
+        print "%d specification(s) rendered" % len(summaries)
+        if get_page_fragment_cache(asset_options) is not None:
+            import rendered_fragments
+
+            print rendered_fragments.format_fragment_cache_summary(get_page_fragment_cache(asset_options))
+        if output_writer is not None:
+            print archive_writer.format_archive_summary(archive_writer.write_archive(output_writer, dst_dir_path, archive_path, archive_format,
+                                                                                     get_cache_directory('archive', cache_dir_path)))
+        else:
+            print format_output_summary(output_stats)
+        sys.exit(0)
+
+    if command == "versions":
+        import site_builder
+        import version_build
+
+        # The versions are taken in the given order, oldest first
+        API_specification_paths += args
+        if not API_specification_paths:
+            print "API specification file must be specified"
+            print usage
+            sys.exit(3)
+
+        if dst_dir_path is None:
+            print "Destination directory must be specified"
+            print usage
+            sys.exit(4)
+
+        # The fragment cache is always used, see version_build.build_versions
+        asset_options = dict(asset_options or {}, fragment_cache=True, cache_dir=cache_dir_path)
+
+        (summaries, converted_markdown_count, output_stats) = version_build.build_versions(
+            API_specification_paths, templates['html'], index_template_path or site_builder.DEFAULT_SITE_INDEX_TEMPLATE_PATH,
+            changelog_template_path or version_build.DEFAULT_CHANGELOG_TEMPLATE_PATH, dst_dir_path, asset_options, jobs, output_writer)
+        for summary in summaries:
+            print version_build.format_version_changes(summary).encode('utf-8')
+
+        print "%d version(s) rendered, %d Markdown text(s) converted" % (len(summaries), converted_markdown_count)
+        import rendered_fragments
+
+        print rendered_fragments.format_fragment_cache_summary(get_page_fragment_cache(asset_options))
+        if output_writer is not None:
+            print archive_writer.format_archive_summary(archive_writer.write_archive(output_writer, dst_dir_path, archive_path, archive_format,
+                                                                                     get_cache_directory('archive', cache_dir_path)))
+        else:
+            print format_output_summary(output_stats)
+        sys.exit(0)
+
+    if command == "render":
+        if compiled_context_path is None:
+            print "Compiled context file must be specified"
+            print usage
+            sys.exit(3)
+    elif API_specification_path is None:
         print "API specification file must be specified"
         print usage
         sys.exit(3)
@@ -1028,21 +1911,28 @@ def main():
         print usage
         sys.exit(4)
 
-    if pdf:
-        create_directory_if_not_exists(temp_pdf_path)
-        rendered_HTML_filename = os.path.splitext(os.path.basename(API_specification_path))[0]
-        rendered_HTML_path = os.path.join(temp_pdf_path, rendered_HTML_filename + ".html")
-        rendered_HTML_cover = os.path.join(temp_pdf_path, "cover" + ".html")
+    if command == "compile":
+        output_stats = compile_api_specification(API_specification_path, dst_dir_path, clear_temporal_dir, output_writer)
+    elif command == "render":
+        try:
+            output_stats = render_compiled_context(compiled_context_path, formats, templates, dst_dir_path, asset_options, output_writer)
+        except ValueError as error:
+            print error
+            sys.exit(5)
+    else:
+        output_stats = render_api_specification_formats(API_specification_path, formats, templates, dst_dir_path, clear_temporal_dir, asset_options,
+                                                        output_writer=output_writer)
+
+    if get_page_fragment_cache(asset_options) is not None:
+        import rendered_fragments
 
-        if ".pdf" not in dst_dir_path:
-            create_directory_if_not_exists(dst_dir_path)
-            dst_dir_path = os.path.join(dst_dir_path, rendered_HTML_filename + ".pdf")
+        print rendered_fragments.format_fragment_cache_summary(get_page_fragment_cache(asset_options))
 
-        render_api_specification(API_specification_path, template_path, temp_pdf_path, clear_temporal_dir, cover_template_path)
-        call( ["wkhtmltopdf", '-d', '125', '--page-size','A4', "page", "file://"+rendered_HTML_cover ,"toc" ,"page", "file://"+rendered_HTML_path, '--footer-center', "Page [page]",'--footer-font-size', '8', '--footer-spacing', '3','--run-script', "setInterval(function(){if(document.readyState=='complete') window.status='done';},100)", "--window-status", "done", dst_dir_path ])
+    if output_writer is not None:
+        print archive_writer.format_archive_summary(archive_writer.write_archive(output_writer, dst_dir_path, archive_path, archive_format,
+                                                                                 get_cache_directory('archive', cache_dir_path)))
     else:
-        create_directory_if_not_exists( dst_dir_path )
-        render_api_specification( API_specification_path, template_path, dst_dir_path, clear_temporal_dir, None)
+        print format_output_summary(output_stats)
     sys.exit(0)
 
 
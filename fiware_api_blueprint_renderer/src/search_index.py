@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+import re
+
+
+SEARCH_INDEX_VERSION = 1
+
+# Search terms are runs of characters other than whitespace and ASCII punctuation (except '_'), so
+# non-ASCII words are kept whole. themes/default_theme/js/search.js splits queries with the same
+# pattern, and both have to be changed together.
+word_regex = re.compile(u"[^\\s!-/:-@\\[-\\^`{-~]+", re.UNICODE)
+
+
+def tokenize(text):
+    """Returns the set of lowercase search terms found in a given text.
+
+    Both the whole identifiers (e.g. 'question_id') and their parts
+    (e.g. 'question', 'id') are returned.
+
+    Arguments:
+    text -- Text to be tokenized
+    """
+    if not text:
+        return set()
+
+    text = text.lower()
+    terms = set()
+    for word in word_regex.findall(text):
+        terms.add(word)
+        terms.update(part for part in word.split('_') if part)
+
+    return terms
+
+
+def get_data_structure_attribute_names(attributes):
+    """Recursively returns the names of the attributes and subproperties of a data structure"""
+
+    names = []
+    for attribute in attributes:
+        names.append(attribute['name'])
+        names += get_data_structure_attribute_names(attribute['subproperties'])
+
+    return names
+
+
+class SearchIndexBuilder(object):
+    """Builds an inverted index mapping search terms to document positions."""
+
+    def __init__(self):
+        self.docs = []
+        self.terms = {}
+
+    def add_document(self, anchor_id, title, kind, texts):
+        """Adds a new searchable document pointing to the given anchor
+
+        Arguments:
+        anchor_id -- HTML id of the element the document points to
+        title -- Text displayed in the search results
+        kind -- Type of the indexed element (group, resource, action, payload)
+        texts -- List of texts whose terms will be indexed
+        """
+        doc_index = len(self.docs)
+        self.docs.append([anchor_id, title, kind])
+
+        terms = set()
+        for text in texts:
+            terms |= tokenize(text)
+
+        for term in terms:
+            self.terms.setdefault(term, []).append(doc_index)
+
+    def to_json(self):
+        return {'version': SEARCH_INDEX_VERSION, 'docs': self.docs, 'terms': self.terms}
+
+
+def generate_search_index(json_content):
+    """Generates a compact inverted index over resource groups, resources, actions, URI templates,
+    parameters and data structure attributes of a parsed API specification.
+
+    Arguments:
+    json_content -- Parsed API specification, after the resources and actions ids have been generated
+    """
+    builder = SearchIndexBuilder()
+
+    for resource_group in json_content['resourceGroups']:
+        builder.add_document(resource_group['id'], resource_group['name'] or 'Default',
+                             'group', [resource_group['name']])
+
+        for resource in resource_group['resources']:
+            resource_texts = [resource['name'], resource['uriTemplate']]
+            resource_texts += [parameter['name'] for parameter in resource['parameters']]
+            builder.add_document(resource['id'], "%s [%s]" % (resource['name'] or '', resource['uriTemplate']),
+                                 'resource', resource_texts)
+
+            for action in resource['actions']:
+                action_uri = action['attributes']['uriTemplate'] or resource['uriTemplate']
+                action_texts = [action['name'], action['method'], action_uri]
+                action_texts += [parameter['name'] for parameter in action['parameters']]
+                builder.add_document(action['id'], "%s %s %s" % (action['method'], action['name'], action_uri),
+                                     'action', action_texts)
+
+    for data_structure_name, data_structure in json_content['data_structures'].iteritems():
+        texts = [data_structure_name] + get_data_structure_attribute_names(data_structure['attributes'])
+        builder.add_document(data_structure['id'], data_structure_name, 'payload', texts)
+
+    return builder.to_json()
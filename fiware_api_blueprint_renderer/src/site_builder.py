@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+from functools import partial
+import json
+import os
+import re
+
+import asset_bundle
+import navigation
+from output_writer import OutputWriter
+import renderer
+
+
+SITE_INDEX_PAGE_NAME = 'index'
+ANCHOR_MAP_FILE_NAME = 'anchors.json'
+
+DEFAULT_SITE_INDEX_TEMPLATE_PATH = os.path.join(renderer.DEFAULT_THEME_DIR_PATH, "site-index.tpl")
+
+STATUS_SECTION_NAMES = ["Status", "Status of this document"]
+
+# Links to another specification of the site, written as a link to its file: [text](other-spec.apib#anchor)
+cross_spec_link_regex = re.compile(r'''(\bhref=)(["'])(?:[^"'#]*/)?([^/"'#]+)\.apib(#[^"']*)?\2''')
+html_tag_regex = re.compile(r'<[^>]+>')
+
+
+def get_metadata_value(json_content, name):
+    """Returns the value of a metadata field (FORMAT, HOST, TITLE, VERSION...) of the API, or None"""
+    for metadata_value in json_content.get('metadata', []):
+        if metadata_value['name'] == name:
+            return metadata_value['value']
+
+    return None
+
+
+def find_metadata_section(section, names):
+    """Returns the first section, searching depth first, with one of the given names, or None"""
+    for subsection in section.get('subsections', []):
+        if subsection['name'] in names:
+            return subsection
+
+        found_section = find_metadata_section(subsection, names)
+        if found_section is not None:
+            return found_section
+
+    return None
+
+
+def html_to_text(html):
+    """Returns the text of an HTML fragment, with its whitespace collapsed"""
+    return re.sub(r'\s+', ' ', html_tag_regex.sub(' ', html)).strip()
+
+
+def get_specification_summary(json_content, page_name):
+    """Returns the entry of a specification in the site index page
+
+    Arguments:
+    json_content -- JSON context of the specification
+    page_name -- Name of the rendered page of the specification, without extension
+    """
+    summary = OrderedDict()
+    summary['page'] = page_name + '.html'
+    summary['title'] = get_metadata_value(json_content, 'TITLE') or json_content.get('name') or page_name
+    summary['version'] = get_metadata_value(json_content, 'VERSION')
+    summary['date'] = get_metadata_value(json_content, 'DATE')
+
+    status_section = find_metadata_section(json_content.get('api_metadata', {}), STATUS_SECTION_NAMES)
+    if status_section is not None:
+        summary['status'] = html_to_text(status_section['body']) or None
+    else:
+        summary['status'] = None
+
+    return summary
+
+
+def get_metadata_anchors(section, anchors):
+    """Adds the ids of the metadata sections to the anchors of a specification"""
+    for subsection in section.get('subsections', []):
+        anchors[subsection['id']] = subsection['name']
+        get_metadata_anchors(subsection, anchors)
+
+
+def get_toc_anchors(toc_nodes, anchors):
+    """Adds the ids of the table of contents entries to the anchors of a specification"""
+    for node in toc_nodes:
+        anchors[node['id']] = node['title']
+        get_toc_anchors(node['children'], anchors)
+
+
+def get_specification_anchors(json_content):
+    """Returns the ids of a specification that can be linked from other pages, with their titles"""
+    anchors = OrderedDict()
+
+    get_metadata_anchors(json_content.get('api_metadata', {}), anchors)
+    for data_structure_name in sorted(json_content.get('data_structures', {})):
+        anchors[json_content['data_structures'][data_structure_name]['id']] = data_structure_name
+    get_toc_anchors(json_content.get('api_toc', []), anchors)
+
+    return anchors
+
+
+def generate_anchor_map(site_specifications):
+    """Returns the map of the anchors of every page of a site
+
+    Arguments:
+    site_specifications -- List of tuples with the file name, page name and JSON context of every specification
+    """
+    anchor_map = OrderedDict()
+
+    for (API_specification_file_name, page_name, json_content) in site_specifications:
+        specification_anchors = OrderedDict()
+        specification_anchors['file'] = API_specification_file_name + '.apib'
+        specification_anchors['page'] = page_name + '.html'
+        specification_anchors['anchors'] = get_specification_anchors(json_content)
+        anchor_map[page_name] = specification_anchors
+
+    return anchor_map
+
+
+def get_anchor_map_by_file(anchor_map):
+    """Returns the anchor map entries by the name of their specification file, without extension.
+    When several specifications share their file name, links to that name point to the first one."""
+    anchor_map_by_file = {}
+
+    for specification_anchors in anchor_map.itervalues():
+        anchor_map_by_file.setdefault(specification_anchors['file'][:-len('.apib')], specification_anchors)
+
+    return anchor_map_by_file
+
+
+def rewrite_cross_spec_links(value, anchor_map_by_file, warnings):
+    """Returns a copy of a JSON context value with the links to other specifications of the
+    site pointing to their rendered pages.
+
+    Arguments:
+    value -- JSON context, or any value inside it
+    anchor_map_by_file -- Map of the site pages and anchors, as returned by get_anchor_map_by_file
+    warnings -- List where the links to unknown specifications or anchors are reported
+    """
+    if isinstance(value, dict):
+        return value.__class__((key, rewrite_cross_spec_links(item, anchor_map_by_file, warnings)) for key, item in value.iteritems())
+    elif isinstance(value, list):
+        return [rewrite_cross_spec_links(item, anchor_map_by_file, warnings) for item in value]
+    elif not isinstance(value, basestring) or '.apib' not in value:
+        return value
+
+    def rewrite(match):
+        (attribute, quote, API_specification_file_name, anchor) = match.groups()
+        if API_specification_file_name not in anchor_map_by_file:
+            warnings.append(u"link to a specification not in the site: " + renderer.to_unicode(API_specification_file_name) + ".apib")
+            return match.group(0)
+
+        specification_anchors = anchor_map_by_file[API_specification_file_name]
+        if anchor and anchor[1:] not in specification_anchors['anchors']:
+            warnings.append(u"link to an unknown anchor of " + renderer.to_unicode(API_specification_file_name) + ".apib: " + renderer.to_unicode(anchor))
+
+        return attribute + quote + specification_anchors['page'] + (anchor or '') + quote
+
+    return cross_spec_link_regex.sub(rewrite, value)
+
+
+def generate_site_contexts(API_specification_paths, temp_dir_path, jobs=None):
+    """Generates the JSON contexts of several specifications in parallel
+
+    Arguments:
+    API_specification_paths -- Paths to the API Blueprint specifications
+    temp_dir_path -- Directory where the intermediate files will be generated
+    jobs -- Number of worker processes, by default the number of CPUs
+
+    Returns the list of JSON contexts, in the same order as the paths.
+    """
+    import multiprocessing
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    jobs = min(jobs, len(API_specification_paths))
+
+    if jobs <= 1:
+        return [renderer.generate_api_specification_context(path, temp_dir_path) for path in API_specification_paths]
+
+    pool = multiprocessing.Pool(jobs)
+    try:
+        return pool.map(partial(renderer.generate_api_specification_context, temp_dir_path=temp_dir_path), API_specification_paths, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def fingerprint_site_pages(dst_dir_path, page_names, output_writer):
+    """Fingerprints the static files shared by the pages of a site, and rewrites the references of
+    the pages to them, see asset_bundle.fingerprint_static_files
+
+    Arguments:
+    dst_dir_path -- Path of the site
+    page_names -- Names of the pages of the site, without extension
+    output_writer -- OutputWriter of the build, with the pages and static files staged
+    """
+    asset_manifest = asset_bundle.fingerprint_static_files(dst_dir_path, renderer.STATIC_FILES_SUBDIRECTORIES, output_writer)
+    for page_name in page_names:
+        page_path = os.path.join(dst_dir_path, page_name + '.html')
+        page = output_writer.read(page_path).decode('utf-8')
+        output_writer.write(page_path, asset_bundle.rewrite_asset_references(page, asset_manifest))
+
+
+def render_site(API_specification_paths, template_path, index_template_path, dst_dir_path,
+                asset_options=None, jobs=None, clear_temporal_dir=True, output_writer=None):
+    """Renders several API specifications into a single site sharing its static files.
+
+    Every specification is rendered to its own page, named after its file. The site also gets an
+    index page listing every specification with its version, date and status, and the map of the
+    pages and anchors of every specification, saved as anchors.json. Links to another specification
+    of the site, written as links to its file ("other-spec.apib#anchor"), point to its page.
+
+    Arguments:
+    API_specification_paths -- Paths to the API Blueprint specifications
+    template_path -- The Jinja2 template path of the specification pages
+    index_template_path -- The Jinja2 template path of the index page
+    dst_dir_path -- Path to save the site
+    asset_options -- Static asset options of the pages, see renderer.render_api_blueprint
+    jobs -- Number of specifications parsed in parallel, by default the number of CPUs
+    clear_temporal_dir -- Flag to clear temporary files generated by the script
+    output_writer -- OutputWriter of the build, or None to save the files right away
+
+    Returns a tuple with the index entries of the specifications, the warnings found and the
+    changed, unchanged and removed files (see OutputWriter.commit), None when the files are
+    staged in the given output_writer.
+    """
+    writer = output_writer if output_writer is not None else OutputWriter()
+    if asset_options is None:
+        asset_options = {}
+
+    used_page_names = set([SITE_INDEX_PAGE_NAME])
+    site_specifications = []
+    temp_dir_path = renderer.create_temp_directory()
+    try:
+        contexts = generate_site_contexts(API_specification_paths, temp_dir_path, jobs)
+    finally:
+        renderer.remove_temp_directory(temp_dir_path, clear_temporal_dir)
+    for (API_specification_path, json_content) in zip(API_specification_paths, contexts):
+        API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+        page_name = navigation.get_unique_id(API_specification_file_name, used_page_names)
+        site_specifications.append((API_specification_file_name, page_name, json_content))
+
+    anchor_map = generate_anchor_map(site_specifications)
+    anchor_map_by_file = get_anchor_map_by_file(anchor_map)
+
+    writer.write(os.path.join(dst_dir_path, ANCHOR_MAP_FILE_NAME), json.dumps(anchor_map, indent=4))
+
+    renderer.copy_static_files(os.path.dirname(template_path), dst_dir_path, writer)
+
+    summaries = []
+    warnings = []
+    for (API_specification_path, (API_specification_file_name, page_name, json_content)) in zip(API_specification_paths, site_specifications):
+        specification_warnings = []
+        json_content = rewrite_cross_spec_links(json_content, anchor_map_by_file, specification_warnings)
+        warnings += [renderer.to_unicode(API_specification_path) + u": warning: " + warning for warning in specification_warnings]
+
+        renderer.add_is_pdf_metadata_to_json(False, json_content)
+        renderer.add_search_index_to_json(json_content, dst_dir_path, page_name, writer)
+        json_content['site_index_page'] = SITE_INDEX_PAGE_NAME + '.html'
+
+        renderer.render_api_blueprint(template_path, json_content, dst_dir_path, page_name, asset_options, with_static_files=False,
+                                      output_writer=writer)
+        summaries.append(get_specification_summary(json_content, page_name))
+
+    index_content = {'name': "API specifications", 'specifications': summaries}
+    renderer.render_api_blueprint(index_template_path, index_content, dst_dir_path, SITE_INDEX_PAGE_NAME, asset_options, with_static_files=False,
+                                  output_writer=writer)
+
+    if asset_options.get('hash_filenames'):
+        fingerprint_site_pages(dst_dir_path, [SITE_INDEX_PAGE_NAME] + [page_name for (_, page_name, _) in site_specifications], writer)
+
+    return (summaries, warnings, writer.commit() if output_writer is None else None)
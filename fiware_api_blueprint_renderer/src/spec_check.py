@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import io
+import json
+import os
+from subprocess import Popen, PIPE
+
+import apib_extra_parse_utils
+import apib_patterns
+import ast_loader
+import navigation
+import renderer
+
+
+def create_problem(file_path, line_number, severity, message):
+    """Returns a problem found while checking an API specification
+
+    Arguments:
+    file_path -- Path of the API specification
+    line_number -- Line of the API specification where the problem was found, or None if unknown
+    severity -- 'error' when the specification can't be rendered, 'warning' otherwise
+    message -- Description of the problem
+    """
+    problem = OrderedDict()
+    problem['file'] = file_path
+    problem['line'] = line_number
+    problem['severity'] = severity
+    problem['message'] = message
+
+    return problem
+
+
+def get_specification_line_number(API_blueprint_line_numbers, API_blueprint_line_number):
+    """Translates a line number of the API blueprint to its line number in the API specification"""
+    if API_blueprint_line_number is None:
+        return None
+
+    index = API_blueprint_line_number - 1
+    if 0 <= index < len(API_blueprint_line_numbers):
+        return API_blueprint_line_numbers[index]
+
+    return None
+
+
+def find_line_number(API_blueprint_lines, API_blueprint_line_numbers, text, start=0):
+    """Returns the line number in the API specification of the first API blueprint line
+    that contains the given text once stripped, or None if not found"""
+    text = text.strip()
+    for index in range(start, len(API_blueprint_lines)):
+        if API_blueprint_lines[index].strip() == text:
+            return API_blueprint_line_numbers[index]
+
+    return None
+
+
+def parse_drafter_annotations(drafter_output):
+    """Returns the warnings and errors reported by drafter on its standard error
+
+    Arguments:
+    drafter_output -- Text written by drafter on its standard error
+
+    Returns a list of tuples with the severity, the API blueprint line and the message of every annotation.
+    """
+    annotations = []
+
+    for line in drafter_output.splitlines():
+        match = apib_patterns.drafter_annotation_regex.match(line.strip())
+        if match:
+            (severity, code, message, line_number) = match.groups()
+            if line_number is not None:
+                line_number = int(line_number)
+            annotations.append((severity, line_number, message))
+
+    return annotations
+
+
+def parser_api_blueprint_with_annotations(API_blueprint):
+    """Parses an API blueprint with drafter collecting its warnings and errors.
+
+    Arguments:
+    API_blueprint -- API Blueprint definition text
+
+    Returns a tuple with the JSON object of the API (None if drafter failed) and the drafter annotations.
+    """
+    drafter = Popen(["drafter", "--format", "json", "--use-line-num"], stdin=PIPE, stdout=PIPE, stderr=PIPE)
+    (output, errors) = drafter.communicate(API_blueprint)
+
+    annotations = parse_drafter_annotations(errors)
+
+    json_content = None
+    if output:
+        try:
+            json_content = ast_loader.loads_api_blueprint_ast(output)
+        except ValueError:
+            json_content = None
+
+    if json_content is None and not any(annotation[0] == 'error' for annotation in annotations):
+        annotations.append(('error', None, "drafter failed to parse the API blueprint (exit code %d)" % drafter.returncode))
+
+    return (json_content, annotations)
+
+
+def check_nested_parameter_descriptions(file_path, API_blueprint, API_blueprint_lines, API_blueprint_line_numbers, json_content):
+    """Checks that every nested parameter value description belongs to a parsed resource or action"""
+    problems = []
+
+    nested_descriptions_list = apib_extra_parse_utils.get_nested_parameter_values_description_from_file(io.BytesIO(API_blueprint))
+
+    for nested_description in nested_descriptions_list:
+        parent = nested_description["parent"]
+        line_number = find_line_number(API_blueprint_lines, API_blueprint_line_numbers, parent)
+
+        try:
+            found_object = renderer.find_action_or_resource_json(json_content, renderer.to_unicode(parent))
+        except (AttributeError, KeyError, ValueError):
+            problems.append(create_problem(file_path, line_number, 'error',
+                                           "Header is not a valid resource or action header: " + renderer.to_unicode(parent)))
+            continue
+
+        if found_object is None:
+            problems.append(create_problem(file_path, line_number, 'warning',
+                                           "Parameter values are described under a header that doesn't match any parsed resource or action: " + renderer.to_unicode(parent)))
+
+    return problems
+
+
+def check_data_structures(file_path, API_blueprint_lines, API_blueprint_line_numbers, json_content):
+    """Checks that every property of the defined data structures is a valid MSON property member declaration"""
+    problems = []
+
+    if len(json_content['content']) == 0:
+        return problems
+
+    data = json_content['content'][0]
+    if not data.get("content") or not data["content"][0].get("sections") or data["content"][0]["sections"][0].get("class") != u'blockDescription':
+        return problems
+
+    data_structures_start = 0
+    for index, line in enumerate(API_blueprint_lines):
+        if line.strip() == "## Data Structures":
+            data_structures_start = index
+            break
+
+    for content in data["content"]:
+        if content["sections"] == []:
+            continue
+
+        for declaration in content["sections"][0]["content"].split('\n'):
+            if declaration.strip() == '':
+                continue
+
+            try:
+                renderer.parse_property_member_declaration(declaration)
+            except (AttributeError, KeyError):
+                line_number = find_line_number(API_blueprint_lines, API_blueprint_line_numbers,
+                                               declaration.encode('utf-8'), data_structures_start)
+                problems.append(create_problem(file_path, line_number, 'error',
+                                               "Malformed MSON property in data structure " + content["name"]["literal"] + ": " + declaration.strip()))
+
+    return problems
+
+
+def check_api_specification(API_specification_path):
+    """Checks that an API specification can be parsed and rendered, without rendering it.
+
+    Runs the scanning, drafter and the structural enrichment stages, skipping the Markdown
+    conversion, the templates and the static files.
+
+    Arguments:
+    API_specification_path -- Path to API Blueprint specification
+
+    Returns a dict with the path of the specification, whether it passed the check and the problems found.
+    """
+    problems = []
+
+    try:
+        with open(API_specification_path, 'rU') as API_specification_file:
+            input_lines = renderer.read_api_specification(API_specification_file)
+
+        (_, API_blueprint_lines, API_blueprint_line_numbers) = renderer.split_api_specification_lines(input_lines)
+        API_blueprint = ''.join(API_blueprint_lines)
+
+        (json_content, annotations) = parser_api_blueprint_with_annotations(API_blueprint)
+        for (severity, line_number, message) in annotations:
+            problems.append(create_problem(API_specification_path,
+                                           get_specification_line_number(API_blueprint_line_numbers, line_number),
+                                           severity, renderer.to_unicode(message)))
+
+        if json_content is not None:
+            problems += check_nested_parameter_descriptions(API_specification_path, API_blueprint, API_blueprint_lines,
+                                                            API_blueprint_line_numbers, json_content)
+            problems += check_data_structures(API_specification_path, API_blueprint_lines, API_blueprint_line_numbers, json_content)
+
+            renderer.find_and_mark_empty_resources(json_content)
+            navigation.generate_navigation_model(json_content)
+    except (IOError, OSError, ValueError) as e:
+        # The specification can't be read, drafter can't be run, or the specification isn't UTF-8.
+        # Other errors are bugs of the checks and are raised.
+        problems.append(create_problem(API_specification_path, None, 'error', renderer.to_unicode(str(e))))
+
+    result = OrderedDict()
+    result['file'] = API_specification_path
+    result['ok'] = not any(problem['severity'] == 'error' for problem in problems)
+    result['problems'] = problems
+
+    return result
+
+
+def find_api_specifications(paths):
+    """Expands the given paths to a list of API specification files.
+
+    Directories are walked looking for ".apib" files.
+    """
+    API_specification_paths = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    if file_name.endswith('.apib'):
+                        API_specification_paths.append(os.path.join(dir_path, file_name))
+        else:
+            API_specification_paths.append(path)
+
+    return API_specification_paths
+
+
+def check_api_specifications(API_specification_paths, jobs=None):
+    """Checks several API specifications in parallel.
+
+    Arguments:
+    API_specification_paths -- Paths to the API Blueprint specifications
+    jobs -- Number of worker processes, by default the number of CPUs
+
+    Returns the list of results of check_api_specification, in the same order as the paths.
+    """
+    import multiprocessing
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    jobs = min(jobs, len(API_specification_paths))
+
+    if jobs <= 1:
+        return [check_api_specification(path) for path in API_specification_paths]
+
+    pool = multiprocessing.Pool(jobs)
+    try:
+        return pool.map(check_api_specification, API_specification_paths, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def format_problem(problem):
+    """Returns a problem formatted as a compiler message: file:line: severity: message"""
+    location = problem['file']
+    if problem['line'] is not None:
+        location += ':' + str(problem['line'])
+
+    return u"%s: %s: %s" % (renderer.to_unicode(location), problem['severity'], problem['message'])
+
+
+def write_check_report(results, report_path):
+    """Saves the results of a check as a JSON file
+
+    Arguments:
+    results -- List of results of check_api_specification
+    report_path -- Path of the resulting JSON file
+    """
+    report = OrderedDict()
+    report['ok'] = all(result['ok'] for result in results)
+    report['checked'] = len(results)
+    report['failed'] = len([result for result in results if not result['ok']])
+    report['results'] = results
+
+    with open(report_path, 'w') as report_file:
+        json.dump(report, report_file, indent=4)
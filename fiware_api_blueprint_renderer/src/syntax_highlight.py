@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import cgi
+import re
+
+
+json_token_regex = re.compile(r'("(?:[^"\\\n]|\\.)*")(\s*:)?|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|\b(true|false|null)\b')
+xml_token_regex = re.compile(r'(<!--.*?-->)|(<\?.*?\?>)|(<!\[CDATA\[.*?\]\]>)|(</?)([\w:.-]+)([^<>]*?)(/?>)', re.DOTALL)
+xml_attribute_regex = re.compile(r'([\w:.-]+)(\s*=\s*)("[^"]*"|\'[^\']*\')')
+header_regex = re.compile(r'^([^:\n]+)(:[ \t]*)(.*)$')
+
+
+def escape(text):
+    """Escapes the HTML special characters of a given text"""
+    return cgi.escape(text)
+
+
+def span(css_class, escaped_text):
+    """Wraps an already escaped text with a highlight.js compatible span"""
+    return '<span class="hljs-%s">%s</span>' % (css_class, escaped_text)
+
+
+def highlight_json(text):
+    """Returns the HTML highlighted version of a JSON text.
+
+    The text doesn't need to be valid JSON, unrecognized chunks are just escaped.
+    """
+    result = []
+    last_end = 0
+
+    for match in json_token_regex.finditer(text):
+        result.append(escape(text[last_end:match.start()]))
+
+        string, colon, number, literal = match.groups()
+        if string is not None:
+            if colon is not None:
+                result.append(span('attribute', escape(string)) + colon)
+            else:
+                result.append(span('string', escape(string)))
+        elif number is not None:
+            result.append(span('number', number))
+        else:
+            result.append(span('literal', literal))
+
+        last_end = match.end()
+
+    result.append(escape(text[last_end:]))
+    return ''.join(result)
+
+
+def highlight_xml_attributes(text):
+    """Returns the HTML highlighted version of the attributes of a XML tag"""
+    result = []
+    last_end = 0
+
+    for match in xml_attribute_regex.finditer(text):
+        result.append(escape(text[last_end:match.start()]))
+        result.append(span('attribute', escape(match.group(1))) + escape(match.group(2)) + span('value', escape(match.group(3))))
+        last_end = match.end()
+
+    result.append(escape(text[last_end:]))
+    return ''.join(result)
+
+
+def highlight_xml(text):
+    """Returns the HTML highlighted version of a XML text"""
+    result = []
+    last_end = 0
+
+    for match in xml_token_regex.finditer(text):
+        result.append(escape(text[last_end:match.start()]))
+
+        comment, processing_instruction, cdata, tag_open, tag_name, tag_attributes, tag_close = match.groups()
+        if comment is not None:
+            result.append(span('comment', escape(comment)))
+        elif processing_instruction is not None:
+            result.append(span('pi', escape(processing_instruction)))
+        elif cdata is not None:
+            result.append(span('cdata', escape(cdata)))
+        else:
+            result.append(span('tag', escape(tag_open) + span('title', escape(tag_name))
+                               + highlight_xml_attributes(tag_attributes) + escape(tag_close)))
+
+        last_end = match.end()
+
+    result.append(escape(text[last_end:]))
+    return ''.join(result)
+
+
+def highlight_header_lines(text):
+    """Returns the HTML highlighted version of HTTP headers written one per line"""
+    lines = []
+    for line in text.split('\n'):
+        match = header_regex.match(line)
+        if match:
+            lines.append(span('attribute', escape(match.group(1))) + match.group(2) + span('string', escape(match.group(3))))
+        else:
+            lines.append(escape(line))
+
+    return '\n'.join(lines)
+
+
+def highlight_text(text):
+    """Returns the HTML version of a plain text"""
+    return escape(text)
+
+
+highlighters = {
+    'json': highlight_json,
+    'xml': highlight_xml,
+    'text': highlight_text,
+    'http': highlight_header_lines,
+}
+
+
+def guess_language(text, content_type=None):
+    """Guesses the language of a request or response body from its Content-Type, or from
+    its first character when the Content-Type is not conclusive.
+
+    Arguments:
+    text -- Body to be highlighted
+    content_type -- Value of the Content-Type header of the body, if any
+    """
+    if content_type:
+        content_type = content_type.lower()
+        if 'json' in content_type:
+            return 'json'
+        if 'xml' in content_type or 'html' in content_type:
+            return 'xml'
+
+    stripped_text = text.lstrip()
+    if stripped_text.startswith('{') or stripped_text.startswith('['):
+        return 'json'
+    if stripped_text.startswith('<'):
+        return 'xml'
+
+    return 'text'
+
+
+def highlight(text, language):
+    """Returns the HTML highlighted version of a text written in the given language"""
+    return highlighters[language](text)
@@ -0,0 +1,3 @@
+# Version of fabre. setup.py reads it from this file, and batch journals record it, so upgrading
+# renders everything again.
+FABRE_VERSION = '0.2.2'
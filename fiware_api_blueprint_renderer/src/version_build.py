@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import os
+import re
+
+import navigation
+from output_writer import OutputWriter
+import renderer
+import site_builder
+
+
+CHANGELOG_PAGE_SUFFIX = '-changes'
+
+DEFAULT_CHANGELOG_TEMPLATE_PATH = os.path.join(renderer.DEFAULT_THEME_DIR_PATH, "changelog.tpl")
+
+version_name_regex = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def read_api_specification_version(API_specification_path):
+    """Returns the extra sections and the API blueprint of an API specification file"""
+    with open(API_specification_path, 'rU') as API_specification_file:
+        return renderer.split_api_specification(renderer.read_api_specification(API_specification_file))
+
+
+def generate_version_contexts(API_specification_paths, jobs=None):
+    """Generates the JSON contexts of several versions of an API specification.
+
+    The versions are parsed by concurrent drafter processes, and then processed one after another
+    sharing their Markdown conversions, so the descriptions and sections that don't change from
+    a version to the next are only converted once.
+
+    Arguments:
+    API_specification_paths -- Paths to the versions of the API specification
+    jobs -- Number of versions parsed at once, by default the number of CPUs
+
+    Returns a tuple with the list of JSON contexts, in the same order as the paths, and the number
+    of Markdown texts converted.
+    """
+    import multiprocessing
+    from multiprocessing.pool import ThreadPool
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    jobs = max(1, min(jobs, len(API_specification_paths)))
+
+    versions = [read_api_specification_version(path) for path in API_specification_paths]
+
+    # drafter runs in its own process, so threads are enough to run several at once
+    pool = ThreadPool(jobs)
+    try:
+        API_blueprint_asts = pool.map(renderer.parser_api_blueprint, [API_blueprint for (_, API_blueprint) in versions], chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    converted_markdown = {}
+    contexts = [renderer.generate_api_blueprint_json(extra_sections, API_blueprint, API_blueprint_ast, converted_markdown)
+                for ((extra_sections, API_blueprint), API_blueprint_ast) in zip(versions, API_blueprint_asts)]
+
+    return (contexts, len(converted_markdown))
+
+
+def get_own_content(node, children_key):
+    """Returns a copy of a node without its children"""
+    return dict((key, value) for (key, value) in node.iteritems() if key != children_key)
+
+
+def get_metadata_section_nodes(section, nodes):
+    """Adds the metadata sections, at any depth, to the nodes of a version"""
+    for subsection in section.get('subsections', []):
+        nodes[('section', subsection['id'])] = (subsection['name'], get_own_content(subsection, 'subsections'))
+        get_metadata_section_nodes(subsection, nodes)
+
+
+def get_version_nodes(json_content):
+    """Returns the nodes of a version of an API specification compared by diff_versions: its metadata
+    sections, data structures, resource groups, resources and actions.
+
+    The nodes are returned in document order, in an OrderedDict of (title, content) tuples by (kind, id).
+    The ids are the ones generated by navigation.generate_navigation_model. The content of a section,
+    resource group or resource leaves its children out, so a change in one of them only changes itself.
+    The content of a resource or action comes with the id of its parent, so moving it to another
+    resource group or resource changes it.
+    """
+    nodes = OrderedDict()
+
+    get_metadata_section_nodes(json_content.get('api_metadata', {}), nodes)
+
+    for data_structure_name in sorted(json_content.get('data_structures', {})):
+        data_structure = json_content['data_structures'][data_structure_name]
+        nodes[('data structure', data_structure['id'])] = (data_structure_name, data_structure)
+
+    for resource_group in json_content['resourceGroups']:
+        group_title = "Group " + (resource_group['name'] or "default")
+        nodes[('resource group', resource_group['id'])] = (group_title, get_own_content(resource_group, 'resources'))
+
+        for resource in resource_group['resources']:
+            resource_title = "Resource " + (resource['name'] or resource['uriTemplate'])
+            nodes[('resource', resource['id'])] = (resource_title, (resource_group['id'], get_own_content(resource, 'actions')))
+
+            for action in resource['actions']:
+                nodes[('action', action['id'])] = (navigation.get_action_toc_title(action, resource), (resource['id'], action))
+
+    return nodes
+
+
+def diff_versions(previous_json_content, json_content):
+    """Returns the changes of a version of an API specification from the previous one.
+
+    Every change is a dict with its 'status' ('added', 'changed' or 'removed'), and the 'kind', 'id'
+    and 'title' of the node (see get_version_nodes). The changes are sorted in document order, the
+    removed nodes last.
+
+    Arguments:
+    previous_json_content -- JSON context of the previous version
+    json_content -- JSON context of the version
+    """
+    previous_nodes = get_version_nodes(previous_json_content)
+    nodes = get_version_nodes(json_content)
+
+    def create_change(status, node_key, title):
+        change = OrderedDict()
+        change['status'] = status
+        (change['kind'], change['id']) = node_key
+        change['title'] = title
+        return change
+
+    changes = []
+    for (node_key, (title, content)) in nodes.iteritems():
+        if node_key not in previous_nodes:
+            changes.append(create_change('added', node_key, title))
+        elif previous_nodes[node_key][1] != content:
+            changes.append(create_change('changed', node_key, title))
+
+    for (node_key, (title, content)) in previous_nodes.iteritems():
+        if node_key not in nodes:
+            changes.append(create_change('removed', node_key, title))
+
+    return changes
+
+
+def get_version_page_name(API_specification_file_name, json_content):
+    """Returns the name of the page of a version: the name of its file followed by its VERSION metadata"""
+    version = site_builder.get_metadata_value(json_content, 'VERSION')
+    if not version:
+        return API_specification_file_name
+
+    return API_specification_file_name + '-' + version_name_regex.sub('-', version)
+
+
+def build_versions(API_specification_paths, template_path, index_template_path, changelog_template_path, dst_dir_path,
+                   asset_options=None, jobs=None, output_writer=None):
+    """Renders the released versions of an API specification into a single site, with the changes of
+    every version from the previous one.
+
+    Every version is rendered to its own page, named after its file and its VERSION metadata, and gets
+    a changelog page listing the metadata sections, data structures, resource groups, resources and
+    actions added, changed and removed by it (see diff_versions). The index page of the site lists the
+    versions. The Markdown texts and the rendered fragments of the parts that don't change from a
+    version to the next are reused, so the versions after the first mostly cost their changes: the
+    fragment cache (see renderer.get_page_fragment_cache) is always used.
+
+    Arguments:
+    API_specification_paths -- Paths to the versions of the API specification, oldest first
+    template_path -- The Jinja2 template path of the version pages
+    index_template_path -- The Jinja2 template path of the index page
+    changelog_template_path -- The Jinja2 template path of the changelog pages
+    dst_dir_path -- Path to save the site
+    asset_options -- Static asset options of the pages, see renderer.render_api_blueprint
+    jobs -- Number of versions parsed at once, by default the number of CPUs
+    output_writer -- OutputWriter of the build, or None to save the files right away
+
+    Returns a tuple with the index entries of the versions, with their 'changes' (None for the first
+    version), the number of Markdown texts converted, and the changed, unchanged and removed files (see
+    OutputWriter.commit), None when the files are staged in the given output_writer.
+    """
+    writer = output_writer if output_writer is not None else OutputWriter()
+    asset_options = dict(asset_options or {})
+    asset_options['fragment_cache'] = True
+
+    (contexts, converted_markdown_count) = generate_version_contexts(API_specification_paths, jobs)
+
+    used_page_names = set([site_builder.SITE_INDEX_PAGE_NAME])
+    page_names = []
+    for (API_specification_path, json_content) in zip(API_specification_paths, contexts):
+        API_specification_file_name = os.path.splitext(os.path.basename(API_specification_path))[0]
+        page_names.append(navigation.get_unique_id(get_version_page_name(API_specification_file_name, json_content), used_page_names))
+
+    # The contexts are compared before rendering adds its own keys to them
+    versions_changes = [None] + [diff_versions(previous_json_content, json_content) for (previous_json_content, json_content) in zip(contexts, contexts[1:])]
+
+    renderer.copy_static_files(os.path.dirname(template_path), dst_dir_path, writer)
+
+    summaries = []
+    for (page_name, json_content, changes) in zip(page_names, contexts, versions_changes):
+        renderer.add_is_pdf_metadata_to_json(False, json_content)
+        renderer.add_search_index_to_json(json_content, dst_dir_path, page_name, writer)
+        json_content['site_index_page'] = site_builder.SITE_INDEX_PAGE_NAME + '.html'
+
+        renderer.render_api_blueprint(template_path, json_content, dst_dir_path, page_name, asset_options, with_static_files=False,
+                                      output_writer=writer)
+
+        summary = site_builder.get_specification_summary(json_content, page_name)
+        summary['changelog'] = page_name + CHANGELOG_PAGE_SUFFIX + '.html'
+        summary['changes'] = changes
+
+        changelog_content = {'name': "Changes in " + summary['title'] + (" " + summary['version'] if summary['version'] else ""),
+                             'specification': summary, 'previous_specification': summaries[-1] if summaries else None,
+                             'changes': changes, 'site_index_page': site_builder.SITE_INDEX_PAGE_NAME + '.html'}
+        renderer.render_api_blueprint(changelog_template_path, changelog_content, dst_dir_path, page_name + CHANGELOG_PAGE_SUFFIX, asset_options,
+                                      with_static_files=False, output_writer=writer)
+
+        summaries.append(summary)
+
+    index_content = {'name': "Versions of " + summaries[-1]['title'], 'specifications': summaries}
+    renderer.render_api_blueprint(index_template_path, index_content, dst_dir_path, site_builder.SITE_INDEX_PAGE_NAME, asset_options,
+                                  with_static_files=False, output_writer=writer)
+
+    if asset_options.get('hash_filenames'):
+        site_builder.fingerprint_site_pages(dst_dir_path, [site_builder.SITE_INDEX_PAGE_NAME] + page_names
+                                            + [page_name + CHANGELOG_PAGE_SUFFIX for page_name in page_names], writer)
+
+    return (summaries, converted_markdown_count, writer.commit() if output_writer is None else None)
+
+
+def format_version_changes(summary):
+    """Returns the summary line of the changes of a version"""
+    if summary['changes'] is None:
+        return "%s: first version" % summary['page']
+
+    counts = dict((status, len([change for change in summary['changes'] if change['status'] == status]))
+                  for status in ('added', 'changed', 'removed'))
+
+    return "%s: %d added, %d changed, %d removed" % (summary['page'], counts['added'], counts['changed'], counts['removed'])
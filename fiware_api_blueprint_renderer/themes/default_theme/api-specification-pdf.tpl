@@ -1,13 +1,3 @@
-{% from 'fragments/id-generation-macros.tpl' import 
-    slug, 
-    gen_resource_id, 
-    gen_action_id, 
-    gen_resource_group_id, 
-    gen_resource_group_example_id, 
-    gen_resource_example_id,
-    gen_apiary_link
-%}
-
 {% set top_metadata = ["Introduction", "Concepts", "Terminology"] %}
 {% set bottom_metadata = ["Examples", "Acknowledgements", "References"] %}
 {% set intro_metadata = ["Copyright", "Abstract", "Status", "Status of this document", "Editors", "Versions"]%}
@@ -22,8 +12,6 @@
     <link href="css/font-awesome.css" rel="stylesheet">
     <link rel="stylesheet" href="css/bootstrap.min.css">
     <link rel="stylesheet" href="css/idea.css">
-    <script src="js/highlight.pack.js"></script>
-    <script>hljs.initHighlightingOnLoad();</script>
 
     <link rel="stylesheet" type="text/css" href="css/api-specification.css">
     <link rel="stylesheet" type="text/css" href="css/api-specification-pdf.css"> 
@@ -43,15 +31,13 @@
 
     {% if data_structures|length > 1 %}
       {# Common payload #}
-      {% from 'fragments/common_payload.tpl' import renderPayloadAttributes %}
       
       <section id="common-payload-definition">
       <h2>Common Payload Definition</h2>
 
       {% for data_structure_name, data_structure in data_structures.iteritems() %}
           {% if data_structure_name != "REST API" %}
-              <h3>{{ data_structure_name }}</h3>
-              {{ renderPayloadAttributes( data_structure['attributes'] ) }}
+              {{ cached_fragment("fragments/data_structure.tpl", {"data_structure_name": data_structure_name, "data_structure": data_structure}) }}
           {% endif %}
       {% endfor %}
       </section>
@@ -1,13 +1,3 @@
-{% from 'fragments/id-generation-macros.tpl' import 
-    slug, 
-    gen_resource_id, 
-    gen_action_id, 
-    gen_resource_group_id, 
-    gen_resource_group_example_id, 
-    gen_resource_example_id,
-    gen_apiary_link
-%}
-
 {% set top_metadata = ["Introduction", "Concepts", "Terminology"] %}
 {% set bottom_metadata = ["Examples", "Acknowledgements", "References"] %}
 {% set intro_metadata = ["Copyright", "Abstract", "Status", "Status of this document", "Editors", "Versions"]%}
@@ -22,16 +12,26 @@
     <link href="css/font-awesome.css" rel="stylesheet">
     <link rel="stylesheet" href="css/bootstrap.min.css">
     <link rel="stylesheet" href="css/idea.css">
-    <script src="js/highlight.pack.js"></script>
-    <script>hljs.initHighlightingOnLoad();</script>
 
     <link rel="stylesheet" type="text/css" href="css/api-specification.css"> 
+    {% if search_index_file %}
+    <script src="js/search.js"></script>
+    {% endif %}
 
     
 </head>
 <body id="respecDocument" class="h-entry">
 <div class="container">
   <div id="TOC-container">
+    {% if site_index_page %}
+      <a id="site-index-link" href="{{ site_index_page }}">All specifications</a>
+    {% endif %}
+    {% if search_index_file %}
+      <div id="search">
+        <input id="search-input" type="search" placeholder="Search" data-index="{{ search_index_file }}" disabled>
+        <ul id="search-results"></ul>
+      </div>
+    {% endif %}
     {% include "fragments/toc.tpl" %}
   </div>
   <div id="API-content">
@@ -42,15 +42,13 @@
 
     {% if data_structures|length > 1 %}
       {# Common payload #}
-      {% from 'fragments/common_payload.tpl' import renderPayloadAttributes %}
       
       <section id="common-payload-definition">
       <h2>Common Payload Definition</h2>
 
       {% for data_structure_name, data_structure in data_structures.iteritems() %}
           {% if data_structure_name != "REST API" %}
-              <h3>{{ data_structure_name }}</h3>
-              {{ renderPayloadAttributes( data_structure['attributes'] ) }}
+              {{ cached_fragment("fragments/data_structure.tpl", {"data_structure_name": data_structure_name, "data_structure": data_structure}) }}
           {% endif %}
       {% endfor %}
       </section>
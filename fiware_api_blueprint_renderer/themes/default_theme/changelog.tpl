@@ -0,0 +1,55 @@
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <meta http-equiv="X-UA-Compatible" content="IE=edge">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>{{ name }}</title>
+    <link href="css/bootstrap-combined.no-icons.min.css" rel="stylesheet">
+    <link rel="stylesheet" href="css/bootstrap.min.css">
+
+    <link rel="stylesheet" type="text/css" href="css/api-specification.css">
+</head>
+<body id="respecDocument" class="h-entry">
+<div class="container">
+  <div id="changelog">
+    <a id="site-index-link" href="{{ site_index_page }}">All versions</a>
+    <h1>{{ name }}</h1>
+    {% if previous_specification %}
+      <p>
+        Changes of <a href="{{ specification.page }}">{{ specification.title }} {{ specification.version or "" }}</a>
+        from <a href="{{ previous_specification.page }}">{{ previous_specification.title }} {{ previous_specification.version or "" }}</a>.
+      </p>
+      {% if changes %}
+        <table class="table table-striped">
+          <thead>
+            <tr>
+              <th>Change</th>
+              <th>Kind</th>
+              <th>Element</th>
+            </tr>
+          </thead>
+          <tbody>
+          {% for change in changes %}
+            <tr class="change-{{ change.status }}">
+              <td>{{ change.status }}</td>
+              <td>{{ change.kind }}</td>
+              {% if change.status == "removed" %}
+                <td><a href="{{ previous_specification.page }}#{{ change.id }}">{{ change.title }}</a></td>
+              {% else %}
+                <td><a href="{{ specification.page }}#{{ change.id }}">{{ change.title }}</a></td>
+              {% endif %}
+            </tr>
+          {% endfor %}
+          </tbody>
+        </table>
+      {% else %}
+        <p>No changes.</p>
+      {% endif %}
+    {% else %}
+      <p>First version: <a href="{{ specification.page }}">{{ specification.title }} {{ specification.version or "" }}</a>.</p>
+    {% endif %}
+  </div>
+</div>
+</body>
+</html>
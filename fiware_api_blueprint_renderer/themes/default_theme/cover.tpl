@@ -1,13 +1,3 @@
-{% from 'fragments/id-generation-macros.tpl' import 
-    slug, 
-    gen_resource_id, 
-    gen_action_id, 
-    gen_resource_group_id, 
-    gen_resource_group_example_id, 
-    gen_resource_example_id,
-    gen_apiary_link
-%}
-
 {% set top_metadata = ["Introduction", "Concepts", "Terminology"] %}
 {% set bottom_metadata = ["Examples", "Acknowledgements", "References"] %}
 {% set intro_metadata = ["Copyright", "Abstract", "Status", "Status of this document", "Editors", "Versions"]%}
@@ -22,8 +12,6 @@
     <link href="css/font-awesome.css" rel="stylesheet">
     <link rel="stylesheet" href="css/bootstrap.min.css">
     <link rel="stylesheet" href="css/idea.css">
-    <script src="js/highlight.pack.js"></script>
-    <script>hljs.initHighlightingOnLoad();</script>
 
     <link rel="stylesheet" type="text/css" href="css/api-specification.css">
     <link rel="stylesheet" type="text/css" href="css/api-specification-pdf.css"> 
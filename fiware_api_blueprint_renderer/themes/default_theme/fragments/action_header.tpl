@@ -0,0 +1,11 @@
+{% macro displayActionHeader( id, action, resource ) %}
+    <h4 id="{{id}}">
+        {{ action.name }} -
+        {{ action.method }}
+        {% if action.attributes.uriTemplate | length > 0 %}
+            {{ action.attributes.uriTemplate }}
+        {% else %}
+            {{ resource.uriTemplate }}
+        {% endif %}
+    </h4>
+{% endmacro %}
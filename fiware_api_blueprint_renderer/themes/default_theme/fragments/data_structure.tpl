@@ -0,0 +1,3 @@
+{% from 'fragments/common_payload.tpl' import renderPayloadAttributes %}
+<h3 id="{{ data_structure.id }}">{{ data_structure_name }}</h3>
+{{ renderPayloadAttributes( data_structure['attributes'] ) }}
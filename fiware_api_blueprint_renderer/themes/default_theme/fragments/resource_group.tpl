@@ -0,0 +1,65 @@
+{% from "fragments/action_header.tpl" import displayActionHeader %}
+        {% if resourceGroup.name|length > 0 %}
+            <section id="{{ resourceGroup.id }}" class="resourceGroup">
+            <h2 id="{{ resourceGroup.header_id }}">{{ resourceGroup.name }}</h2>
+        {% else %}
+            <section id="{{ resourceGroup.id }}" class="resourceGroup">
+             <div class= "header" ><h2 id="{{ resourceGroup.header_id }}"> Default </h2></div>
+        {% endif %}
+	{{ resourceGroup.description }}
+        {% for resource in resourceGroup.resources %}
+            <section id="{{ resource.id }}" class="resource">
+                 <div class= "header" ><h3 id="{{ resource.header_id }}">{{ resource.name }} [{{ resource.uriTemplate}}]</h3> </div>
+                {{ resource.description }}
+                {% set parameters = resource.parameters %}
+                {% set parameters_definition_caption = "Parameters" %}
+
+		        {# Display attributes #}
+                {% set packet_contents = resource.content %}
+                {% include "fragments/resource_attributes.tpl" %}
+
+                {% include "fragments/parameters_definition.tpl" %}
+
+                    {% for action in resource.actions %}
+                        <div id="{{ action.id }}" class="action {{action.method}}">
+
+                        {{ displayActionHeader( action.header_id, action, resource ) }}
+        
+                            <div id="{{ action.body_id }}" class="">
+                                {{action.description}}
+                                {% set parameters = action.parameters %}
+                                {% set parameters_table_caption = "Parameters" %}
+                                {% include "fragments/parameters_definition.tpl" %}			
+                                {% set packet_contents = action.content %}
+                                {% include "fragments/rest_packet_general_contents.tpl" %}      
+                                    {% for example in action.examples %}
+        	                            {% for request in example.requests %}
+                                            {% set rest_packet = request %}
+                                            {% set packet_type = "Request" %}
+                                            {% set loop_index = loop.index %}
+                                            {% include "fragments/rest_packet.tpl" %}
+        	                            {% endfor %}
+    
+        	                            {% for response in example.responses %}
+        		                            {% set rest_packet = response %}
+                                        {% set packet_type = "Response" %}
+                                        {% set loop_index = loop.index %}
+                                        {% include "fragments/rest_packet.tpl" %}
+        	                            {% endfor %}
+                                    {% endfor %}
+                                    
+                                    <div class="goExample">
+                                        <a href="#{{ action.examples_id }}">Go to example</a>
+                                    </div>
+                                    <div class="goApiary">
+                                    {% if action.apiary_link %}
+                                        <a target="_blank" href="{{ action.apiary_link }}">View in Apiary</a>
+                                    {% endif %}
+                                    </div>
+                                
+                            </div>
+                        </div>
+                    {% endfor %}
+            </section>
+        {% endfor %}
+    </section>
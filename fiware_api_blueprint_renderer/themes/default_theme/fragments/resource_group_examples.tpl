@@ -0,0 +1,58 @@
+{% from "fragments/action_header.tpl" import displayActionHeader %}
+        {% if resourceGroup.name|length > 0 %}
+            <section id="{{ resourceGroup.example_id }}" class="resourceGroupExample">
+                <div class= "header" ><h3 id="{{ resourceGroup.example_header_id }}">{{ resourceGroup.name }}</h3> </div>
+        {% else %}
+            <section id="{{ resourceGroup.example_id }}" class="resourceGroupExample">
+                <div class= "header" ><h3 id="{{ resourceGroup.example_header_id }}">Default</h3> </div>
+        {% endif %}
+
+                {% for resource in resourceGroup.resources %}
+                    <section id="{{ resource.example_id }}" class="resourceExample">
+                         <div class= "header" ><h4 id="{{ resource.example_header_id }}">{{ resource.name }} [{{ resource.uriTemplate}}]</h4></div>
+                            
+                            {% set parameters = resource.parameters %}
+                            {% set parameters_definition_caption = "Parameters" %}
+
+                            {#  Display attributes #}
+                            {% set packet_contents = resource.content %}
+                            {# {% include "fragments/resource_attributes.tpl" %} #}
+
+                            {% include "fragments/parameters_definition.tpl" %}
+
+                            {% for action in resource.actions %}
+                                <div id="{{ action.examples_id }}" class="actionExample {{action.method}}">
+
+                                    {{ displayActionHeader( action.examples_header_id, action, resource ) }}
+                
+                                    <div id="{{ action.examples_body_id }}" class=""> 
+                                        {% set parameters = action.parameters %}
+                                        {% set parameters_table_caption = "Parameters" %}
+                                        
+                                        {% include "fragments/parameters_definition.tpl" %}         
+                                        {% set packet_contents = action.content %}
+                                        {#{% include "fragments/rest_packet_general_contents.tpl" %}  #}    
+                                            {% for example in action.examples %}
+                                                {% for request in example.requests %}
+                                                    {% set rest_packet = request %}
+                                                    {% set packet_type = "Request" %}
+                                                    {% set loop_index = loop.index %}
+                                                    {% include "fragments/rest_packet_examples.tpl" %}
+                                                {% endfor %}
+            
+                                                {% for response in example.responses %}
+                                                    {% set rest_packet = response %}
+                                                {% set packet_type = "Response" %}
+                                                {% set loop_index = loop.index %}
+                                                {% include "fragments/rest_packet_examples.tpl" %}
+                                                {% endfor %}
+                                            {% endfor %}
+                                            <div class="goActions">
+                                                <a href="#{{ action.id }}">Go to specification</a>
+                                            </div>
+                                    </div>
+                                </div>
+                            {% endfor %}
+                    </section>
+            {% endfor %}
+        </section>
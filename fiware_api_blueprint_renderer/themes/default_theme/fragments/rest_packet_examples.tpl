@@ -1,4 +1,4 @@
-{% macro rest_packet_body_div_id() %}{{ gen_action_id( action.name ) }}_{{ packet_type }}_{{ loop_index }}_body{% endmacro %}
+{% macro rest_packet_body_div_id() %}{{ action.examples_id }}_{{ packet_type }}_{{ loop_index }}_body{% endmacro %}
 {% macro rest_packet_mime(headers) -%}
     {% for header in headers %}
         {% if 'Content-Type'==header.name %}
@@ -6,6 +6,14 @@
         {% endif %}
     {% endfor %}
 {%- endmacro %}
+{% macro render_block(block_id, block_use, css_class) -%}
+    {% set block = blocks[block_id] %}
+    {% if block_use == "reference" %}
+        <p class="shared-block">Same as in <a href="#{{ block.id }}">{{ block.title }}</a></p>
+    {% else %}
+        <pre{% if block_use == "anchor" %} id="{{ block.id }}"{% endif %}><code class="{{ css_class }}">{{ block.html }}</code></pre>
+    {% endif %}
+{%- endmacro %}
 <div class="rest-packet-div">
 
             <span class="packetType">{{ packet_type }} {{ rest_packet.name }}</span> {{rest_packet_mime(rest_packet.headers)}}
@@ -21,22 +29,17 @@
 
                 {% if rest_packet.headers | length > 0 %}
         	         <div class= "header"><p>Headers</p></div>
-                    {% set headersStr = [] %}
-                    {% for header in rest_packet.headers %}
-                        {% if headersStr.append( header.name + ": " + header.value ) %}{% endif %}
-                    {% endfor %}
-
-        	        <pre><code>{{ headersStr | join( "\n" ) | e }}</code></pre>
+        	        {{ render_block(rest_packet.headers_block, rest_packet.headers_block_use, "hljs http") }}
                 {% endif %}
 
                 {% if rest_packet.body | length > 0 %}
                     <div class= "header"><p>Body</p></div>
-                    <pre><code>{{ rest_packet.body }}</code></pre>
+                    {{ render_block(rest_packet.body_block, rest_packet.body_block_use, "hljs " + blocks[rest_packet.body_block].language) }}
                 {% endif %}
 
                 {% if rest_packet.schema | length > 0 %}
                     <div class= "header"><p>Schema</p></div>
-                    <pre><code>{{ rest_packet.schema }}</code></pre>
+                    {{ render_block(rest_packet.schema_block, rest_packet.schema_block_use, "hljs") }}
                 {% endif %}
             </div>
             
@@ -10,6 +10,17 @@
     {% endif%}
 </li>
 
+{%- endmacro %}
+{% macro render_api_toc(node) -%}
+<li><a href="#{{ node.id }}" title = "{{ node.title }}">{{ node.text }}</a>
+    {% if node.children %}
+        <ul class="toc">
+        {% for child in node.children %}
+            {{ render_api_toc(child) }}
+        {% endfor %}
+        </ul>
+    {% endif %}
+</li>
 {%- endmacro %}
 <section id="toc">
 
@@ -51,53 +62,9 @@
 {# API #}
 <li><a href="#API_specification">API Specification</a>
     <ul class="toc">
-    {% for resourceGroup in resourceGroups %}
-
-                        <li>
-                            {% if resourceGroup.name|length > 1 %}
-                                <a href="#{{ gen_resource_group_id( resourceGroup.name ) }}" title = "Group {{ resourceGroup.name }}">Group {{ resourceGroup.name }}</a>
-                            {% else %}
-                                <a href="#default_group" title = "Group default">Default</a>
-                            {% endif %}
-                            <ul class="toc">
-                              {% for resource in resourceGroup.resources %}
-                                {% if resource.ignoreTOC %}
-                                    {% for action in resource.actions %}
-                                        {% if action.name %}
-                                            <li><a href="#{{ action.id }}" title = "{{action.method}} - {{ action.name }}">{{action.method}} - {{ action.name  }}</a></li>
-                                        {% else %}
-                                            {% if action.attributes.uriTemplate %}
-                                                <li><a href="#{{ action.id }}" title ="{{action.method}} - {{ action.attributes.uriTemplate }}">{{action.method}} - {{ action.attributes.uriTemplate }}  </a></li>
-                                            {% else %}
-                                                <li><a href="#{{ action.id }}" title ="{{action.method}} - {{ resource.uriTemplate }}">{{action.method}} - {{ resource.uriTemplate }} </a></li>
-                                            {% endif %}
-
-                                        {% endif %}
-                                        
-                                    {% endfor %}
-                                {% else %}
-                                    <li>
-                                        <a href="#{{ resource.id }}" title = "Resource {{ resource.name }}">Resource {{ resource.name }}</a>
-                                        <ul class="toc  ">
-                                        {% for action in resource.actions %}
-                                            {% if action.name %}
-                                                <li><a href="#{{ action.id }}" title ="{{action.method}} - {{ action.name }}">{{action.method}} - {{ action.name }}</a></li>
-                                            {% else %}
-                                                {% if action.attributes.uriTemplate %}
-                                                    <li><a href="#{{ action.id }}" title ="{{action.method}} - {{ action.attributes.uriTemplate }}">{{action.method}} - {{ action.attributes.uriTemplate  }}</a></li>
-                                                {% else %}
-                                                    <li><a href="#{{ action.id }}" title ="{{action.method}}">{{action.method}}</a></li>
-                                                {% endif %}
-                                            {% endif %}
-
-                                        {% endfor %}
-                                        </ul>
-                                    </li>
-                                {% endif %}
-                              {% endfor %}
-                            </ul>
-                        </li>
-                      {% endfor %}
+    {% for node in api_toc %}
+        {{ render_api_toc(node) }}
+    {% endfor %}
     <li><a href="#examples">Examples</a></li>
     </ul>
 </li>
@@ -0,0 +1,111 @@
+/*
+ * Client side search over the index generated by fabre at render time.
+ *
+ * The index maps every search term to the list of documents (resource groups,
+ * resources, actions and payloads) containing it, so a lookup only needs a
+ * binary search over the sorted terms instead of a scan of the whole page.
+ */
+(function () {
+    var MAX_RESULTS = 20;
+
+    function lowerBound(terms, prefix) {
+        var low = 0, high = terms.length;
+        while (low < high) {
+            var middle = (low + high) >>> 1;
+            if (terms[middle] < prefix) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        return low;
+    }
+
+    function findDocuments(index, sortedTerms, prefix) {
+        var found = {};
+        for (var i = lowerBound(sortedTerms, prefix); i < sortedTerms.length; i++) {
+            var term = sortedTerms[i];
+            if (term.lastIndexOf(prefix, 0) !== 0) {
+                break;
+            }
+            var docs = index.terms[term];
+            for (var j = 0; j < docs.length; j++) {
+                found[docs[j]] = true;
+            }
+        }
+        return found;
+    }
+
+    function search(index, sortedTerms, query) {
+        // Same pattern as search_index.word_regex, which splits the indexed texts
+        var words = query.toLowerCase().match(/[^\s!-\/:-@\[-\^`{-~]+/g);
+        if (!words) {
+            return [];
+        }
+
+        var result = null;
+        for (var i = 0; i < words.length; i++) {
+            var found = findDocuments(index, sortedTerms, words[i]);
+            if (result === null) {
+                result = found;
+            } else {
+                for (var doc in result) {
+                    if (!found[doc]) {
+                        delete result[doc];
+                    }
+                }
+            }
+        }
+
+        var docs = [];
+        for (var doc in result) {
+            docs.push(parseInt(doc, 10));
+        }
+        docs.sort(function (a, b) { return a - b; });
+        return docs.slice(0, MAX_RESULTS);
+    }
+
+    function renderResults(container, index, docs) {
+        container.innerHTML = "";
+        for (var i = 0; i < docs.length; i++) {
+            var doc = index.docs[docs[i]];
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = "#" + doc[0];
+            link.className = "search-result-" + doc[2];
+            link.appendChild(document.createTextNode(doc[1]));
+            item.appendChild(link);
+            container.appendChild(item);
+        }
+    }
+
+    function init() {
+        var input = document.getElementById("search-input");
+        var results = document.getElementById("search-results");
+        if (!input || !results) {
+            return;
+        }
+
+        var request = new XMLHttpRequest();
+        request.open("GET", input.getAttribute("data-index"), true);
+        request.onload = function () {
+            if (request.status !== 200 && request.status !== 0) {
+                return;
+            }
+            var index = JSON.parse(request.responseText);
+            var sortedTerms = Object.keys(index.terms).sort();
+
+            input.disabled = false;
+            input.oninput = function () {
+                renderResults(results, index, search(index, sortedTerms, input.value));
+            };
+        };
+        request.send();
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", init);
+    } else {
+        init();
+    }
+})();
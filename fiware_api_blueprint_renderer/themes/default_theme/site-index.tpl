@@ -0,0 +1,46 @@
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <meta http-equiv="X-UA-Compatible" content="IE=edge">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>{{ name }}</title>
+    <link href="css/bootstrap-combined.no-icons.min.css" rel="stylesheet">
+    <link rel="stylesheet" href="css/bootstrap.min.css">
+
+    <link rel="stylesheet" type="text/css" href="css/api-specification.css">
+</head>
+<body id="respecDocument" class="h-entry">
+<div class="container">
+  <div id="site-index">
+    <h1>{{ name }}</h1>
+    <table class="table table-striped">
+      <thead>
+        <tr>
+          <th>Specification</th>
+          <th>Version</th>
+          <th>Date</th>
+          <th>Status</th>
+          {% if specifications and specifications[0].changelog %}
+          <th>Changes</th>
+          {% endif %}
+        </tr>
+      </thead>
+      <tbody>
+      {% for specification in specifications %}
+        <tr>
+          <td><a href="{{ specification.page }}">{{ specification.title }}</a></td>
+          <td>{{ specification.version or "" }}</td>
+          <td>{{ specification.date or "" }}</td>
+          <td>{{ specification.status or "" }}</td>
+          {% if specification.changelog %}
+          <td><a href="{{ specification.changelog }}">{{ specification.changes | length if specification.changes is not none else "First version" }}</a></td>
+          {% endif %}
+        </tr>
+      {% endfor %}
+      </tbody>
+    </table>
+  </div>
+</div>
+</body>
+</html>
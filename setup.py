@@ -4,6 +4,7 @@ import os
 from os import mkdir, umask
 from shutil import rmtree
 import errno
+import re
 
 
 def get_packages(package):
@@ -13,8 +14,14 @@ def get_packages(package):
             if os.path.exists(os.path.join(dirpath, '__init__.py'))]
 
 
+def get_version():
+    """Return the version of the package, read without importing it."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fiware_api_blueprint_renderer', 'src', 'version.py')) as version_file:
+        return re.search(r"^FABRE_VERSION = '([^']+)'", version_file.read(), re.M).group(1)
+
+
 setup(name='fiware_api_blueprint_renderer',
-      version='0.2.2',
+      version=get_version(),
       description='Python module to aid with parsing FIWARE API specification files and rendering them to HTML pages.',
       url='https://github.com/FiwareULPGC/fiware-api-blueprint-renderer',
       author='FIWARE ULPGC',
@@ -26,10 +33,8 @@ setup(name='fiware_api_blueprint_renderer',
         'jinja2>=2.7.3',
         'markdown>=2.6.2'
       ],
+      scripts=['bin/fabre'],
       entry_points={
-        'console_scripts': [
-          'fabre = fiware_api_blueprint_renderer.src.renderer:main',
-        ],
         'fiware_api_blueprint_renderer.themes': [
             'default = fiware_api_blueprint_renderer.themes.default_theme'
         ]
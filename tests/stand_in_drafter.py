@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# Stand-in for drafter 0.1.9, writing the legacy AST of the subset of API Blueprint used by the
+# tests: metadata, groups, resources, actions, requests and responses with headers and bodies,
+# parameters and named data structures. Like drafter, it reads the blueprint from its standard
+# input, writes the AST to its standard output and its annotations to its standard error, and
+# warns about the data structures referenced with "+ Attributes (Name)" but never defined.
+
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+
+BASE_TYPES = frozenset(['object', 'array', 'string', 'number', 'boolean', 'enum'])
+
+name_regex = re.compile(r'^# (.*)$')
+group_regex = re.compile(r'^# Group (.*)$')
+data_structures_regex = re.compile(r'^(#{1,2}) Data Structures$')
+data_structure_regex = re.compile(r'^(#{2,3}) (\w+)')
+resource_regex = re.compile(r'^## (.*) \[(.*)\]$')
+action_regex = re.compile(r'^### (.*) \[(\w+) ?(.*)\]$')
+packet_regex = re.compile(r'^\+ (Request|Response) ?(\S*) ?(?:\((.*)\))?')
+parameter_regex = re.compile(r'^    \+ (\w+): (\S+) \((.*)\) - (.*)$')
+attributes_regex = re.compile(r'^\+ Attributes \((\w+)\)')
+packet_header_regex = re.compile(r'^ {12}([\w-]+): (.*)$')
+
+
+def get_defined_names(lines):
+    """Returns the names of the data structures defined in the Data Structures sections"""
+    defined_names = set()
+    data_structures_level = None
+
+    for line in lines:
+        match = data_structures_regex.match(line)
+        if match:
+            data_structures_level = len(match.group(1))
+        elif data_structures_level is not None and line.startswith('#'):
+            match = data_structure_regex.match(line)
+            if match and len(match.group(1)) > data_structures_level:
+                defined_names.add(match.group(2))
+            else:
+                data_structures_level = None
+
+    return defined_names
+
+
+def parse_api_blueprint(lines):
+    """Returns the legacy AST of the lines of an API blueprint and its annotations"""
+    ast = {"_version": "3.0", "metadata": [], "name": "", "description": "", "resourceGroups": [], "content": []}
+    annotations = []
+
+    index = 0
+    while index < len(lines) and ':' in lines[index] and not lines[index].startswith('#'):
+        (name, value) = lines[index].split(':', 1)
+        ast['metadata'].append({"name": name.strip(), "value": value.strip()})
+        index += 1
+
+    defined_names = get_defined_names(lines)
+    group = resource = action = packet = data_structure = None
+    # Every Data Structures section is a category of its own, ending at the next heading of its level or above
+    data_structures = data_structures_level = None
+
+    for (line_index, line) in enumerate(lines[index:], index):
+        line_number = line_index + 1
+
+        match = data_structures_regex.match(line)
+        if match:
+            data_structures = {"element": "category", "content": []}
+            data_structures_level = len(match.group(1))
+            ast['content'].append(data_structures)
+            data_structure = None
+            continue
+
+        if data_structures is not None:
+            match = data_structure_regex.match(line)
+            if match and len(match.group(1)) > data_structures_level:
+                data_structure = {"element": "dataStructure", "name": {"literal": match.group(2)},
+                                  "sections": [{"class": "blockDescription", "content": ""}]}
+                data_structures['content'].append(data_structure)
+                continue
+            if not line.startswith('#'):
+                if data_structure is not None:
+                    data_structure['sections'][0]['content'] += line[4:] + '\n'
+                continue
+            data_structures = data_structure = None
+
+        match = group_regex.match(line)
+        if match:
+            group = {"name": match.group(1).strip(), "description": "", "resources": []}
+            ast['resourceGroups'].append(group)
+            resource = action = packet = None
+            continue
+
+        match = name_regex.match(line)
+        if match and group is None and not ast['name']:
+            ast['name'] = match.group(1)
+            continue
+
+        match = resource_regex.match(line)
+        if match:
+            if group is None:
+                group = {"name": "", "description": "", "resources": []}
+                ast['resourceGroups'].append(group)
+            resource = {"name": match.group(1), "description": "", "uriTemplate": match.group(2), "parameters": [], "actions": [],
+                        "content": [], "model": {}}
+            group['resources'].append(resource)
+            action = packet = None
+            continue
+
+        match = action_regex.match(line)
+        if match and resource is not None:
+            action = {"name": match.group(1), "description": "", "method": match.group(2), "parameters": [],
+                      "attributes": {"relation": "", "uriTemplate": match.group(3)}, "content": [],
+                      "examples": [{"name": "", "description": "", "requests": [], "responses": []}]}
+            resource['actions'].append(action)
+            packet = None
+            continue
+
+        match = packet_regex.match(line)
+        if match and action is not None:
+            packet = {"name": match.group(2), "description": "", "headers": [], "body": "", "schema": "",
+                      "content": [{"element": "asset", "content": ""}]}
+            if match.group(3):
+                packet['headers'].append({"name": "Content-Type", "value": match.group(3)})
+            action['examples'][0]['requests' if match.group(1) == 'Request' else 'responses'].append(packet)
+            continue
+
+        match = attributes_regex.match(line)
+        if match:
+            if match.group(1) not in defined_names and match.group(1) not in BASE_TYPES:
+                annotations.append("warning: (4)  unable to find the symbol `%s`; line %d, column 1 - line %d, column %d"
+                                   % (match.group(1), line_number, line_number, len(line)))
+            continue
+
+        match = parameter_regex.match(line)
+        if match and (action or resource) is not None:
+            (action or resource)['parameters'].append({"name": match.group(1), "description": match.group(4),
+                                                       "type": match.group(3).split(',')[-1].strip(), "required": 'required' in match.group(3),
+                                                       "default": "", "example": match.group(2), "values": []})
+            continue
+
+        if packet is not None and line.startswith('        '):
+            match = packet_header_regex.match(line)
+            if match and not packet['body']:
+                packet['headers'].append({"name": match.group(1), "value": match.group(2)})
+            else:
+                packet['body'] += line[12:] + '\n'
+                packet['content'][0]['content'] = packet['body']
+            continue
+
+        if line.startswith('+') or line.startswith('    +') or line.startswith('#'):
+            continue
+
+        for target in (packet, action, resource, group, ast):
+            if target is not None:
+                target['description'] += line + '\n'
+                break
+
+    return (ast, annotations)
+
+
+def main():
+    (ast, annotations) = parse_api_blueprint(sys.stdin.read().splitlines())
+
+    for annotation in annotations:
+        sys.stderr.write(annotation + '\n')
+    json.dump(ast, sys.stdout, indent=4)
+
+
+def install_stand_in_drafter(bin_dir_path, exit_code=None):
+    """Installs the stand-in drafter as bin_dir_path/drafter, run with the Python interpreter of the
+    tests. With an exit_code, the installed drafter writes its output as usual and then exits with it."""
+    drafter_path = os.path.join(bin_dir_path, 'drafter')
+    command = '"%s" "%s" "$@"' % (sys.executable, os.path.splitext(os.path.abspath(__file__))[0] + '.py')
+    with open(drafter_path, 'w') as drafter_file:
+        if exit_code is None:
+            drafter_file.write('#!/bin/sh\nexec %s\n' % command)
+        else:
+            drafter_file.write('#!/bin/sh\n%s\nexit %d\n' % (command, exit_code))
+    os.chmod(drafter_path, os.stat(drafter_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+class StandInDrafterTestCase(unittest.TestCase):
+    """Test case running the stand-in drafter as drafter, with its own temporary directory, set as
+    the temporary directory of the renderer too"""
+
+    def setUp(self):
+        from fiware_api_blueprint_renderer.src import renderer
+
+        self.temp_dir_path = tempfile.mkdtemp()
+        self.bin_dir_path = os.path.join(self.temp_dir_path, 'bin')
+        os.mkdir(self.bin_dir_path)
+        install_stand_in_drafter(self.bin_dir_path)
+
+        self.saved_path = os.environ['PATH']
+        os.environ['PATH'] = self.bin_dir_path + os.pathsep + self.saved_path
+        self.saved_temp_dir_path = renderer.DEFAULT_TEMP_DIR_PATH
+        renderer.DEFAULT_TEMP_DIR_PATH = os.path.join(self.temp_dir_path, 'renderer-tmp')
+
+    def tearDown(self):
+        from fiware_api_blueprint_renderer.src import renderer
+
+        os.environ['PATH'] = self.saved_path
+        renderer.DEFAULT_TEMP_DIR_PATH = self.saved_temp_dir_path
+        shutil.rmtree(self.temp_dir_path, ignore_errors=True)
+
+    def write_file(self, name, content):
+        """Writes a file in the temporary directory of the test, returning its path"""
+        path = os.path.join(self.temp_dir_path, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as written_file:
+            written_file.write(content)
+
+        return path
+
+
+if __name__ == '__main__':
+    main()
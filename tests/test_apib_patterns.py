@@ -0,0 +1,162 @@
+import glob
+import os
+import random
+import re
+from timeit import default_timer
+import unittest
+
+from fiware_api_blueprint_renderer.src import apib_patterns
+
+
+EXAMPLES_DIR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'apib-example')
+
+# Time a pattern may take on a line, in seconds
+LINE_TIME_BUDGET = 0.01
+
+# Times a line over the budget is timed again, the fastest time being the one compared with the
+# budget, so a pause of the process isn't taken for backtracking
+LINE_TIME_RETRIES = 5
+
+ADVERSARIAL_LINE_LENGTH = 2000
+RANDOM_ADVERSARIAL_LINES = 500
+
+# Pieces of the adversarial lines: beginnings of valid lines, repeated fragments that can be
+# matched in several ways by careless patterns, and endings that make the match fail late
+ADVERSARIAL_PREFIXES = ["", "# ", "## ", "# Group ", "## Name [", "### Name [GET ", "+ ", "    - ", "- a ", "- a (", "- a: ",
+                        "+ a [b](", "<", "<http://", '<a href="http://', "[", "warning: (5) ", "x "]
+ADVERSARIAL_FRAGMENTS = [" ", "\t", "  -", " [", "[", "]", "(", ")", ") ", ") -", "a ", "a,", ":", "#", "-", "+ ", "<http://",
+                         '<a href="http://', '">', "][]", "[a", "; line 1", "a b"]
+ADVERSARIAL_ENDINGS = ["", "x", "\n", "]", ")", "(", "-", ">", "\nx"]
+
+# Patterns as they were before the registry, compiled on every use. The registry patterns must
+# match the lines of the example specifications the same way.
+OLD_PATTERNS = {
+    'group_regex': (r"^#*[ ]Group([ \w\W\-\_]*)$", 'match'),
+    'resource_regex': (r"^#*[ ]([ \w\W\-\_]*) \[([ \w\W\-\_]*)\]$", 'match'),
+    'direct_URI_regex': (r"^#*[ ]([ ]*[/][ \w\W\-\_]*)$", 'match'),
+    'header_regex': (r"^(#+)[ ]*(.*)$", 'match'),
+    'param_keyword_regex': (r"^[+|-][ ]Parameters[ ]*$", 'match'),
+    'param_regex': (r"^[ \t]*[+|-][ ]([^ \(\)]*)[ ][^\(\)]*\(.*\).*$", 'match'),
+    'members_keyword_regex': (r"^([^+-]*)[+|-][ ]Members[ ]*$", 'match'),
+    'member_regex': (r"^[ \t]*[+|-][ ]([^ +-]*)[ ]*-?(.*)$", 'match'),
+    'blank_line_regex': (r"^ *$", 'match'),
+    'property_member_declaration_regex': (r"^[ ]*[-|+][ ](?P<property_name>\w+)[ ]*(?:[[: ][\w, ]*]?[ ]*\((?P<type_definition_list>[\w\W ]+)\))?"
+                                          r"[ ]*(?:[-](?P<property_description>[ \w\W]+))?\Z", 'match'),
+    'model_reference_regex': (r"\[[^\]\n]+\]\[\]", 'search'),
+    'link_regex': (r"\[(?P<linkText>[^\(\)\[\]]*)\]\((?P<linkRef>[^\(\)\[\]]*)\)", 'findall'),
+    'auto_link_regex': (r"\<(?P<linkRef>http[s]?://.*)\>", 'findall'),
+    'html_link_regex': (r"\<a href=\"(?P<linkRef>http[s]?://.*)\"\>(?P<linkText>[^\<]*)\</a>", 'findall'),
+}
+
+
+def generate_adversarial_lines(line_length, random_line_count, seed):
+    """Generates lines built to make backtracking patterns explode"""
+    for prefix in ADVERSARIAL_PREFIXES:
+        for fragment in ADVERSARIAL_FRAGMENTS:
+            for ending in ADVERSARIAL_ENDINGS:
+                yield prefix + fragment * (line_length // len(fragment)) + ending
+
+    random_generator = random.Random(seed)
+    for _ in range(random_line_count):
+        line = random_generator.choice(ADVERSARIAL_PREFIXES)
+        while len(line) < line_length:
+            line += random_generator.choice(ADVERSARIAL_FRAGMENTS) * random_generator.randint(1, 8)
+        yield line + random_generator.choice(ADVERSARIAL_ENDINGS)
+
+
+def time_use(use, line):
+    start_time = default_timer()
+    use(line)
+    return default_timer() - start_time
+
+
+def get_match_result(match):
+    """Returns what the parser reads from the result of a pattern: the matched text and groups of a match"""
+    if match is None or isinstance(match, list):
+        return match
+    return (match.group(0), match.groups())
+
+
+def split_markdown_header_as_before(markdown_header):
+    """Splits a resource or action header title as before the registry, with two greedy patterns"""
+    match = re.match(r"(.*) \[(\w*) (.*)\]", markdown_header)
+    if match:
+        return match.groups()
+
+    match = re.match(r"(.*) \[(.*)\]", markdown_header)
+    if match:
+        return (match.group(1), None, match.group(2))
+
+    return None
+
+
+def get_example_lines():
+    """Returns the lines of the example specifications, with and without their line ends"""
+    lines = []
+    for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR_PATH, '*.apib'))):
+        with open(path) as example_file:
+            for line in example_file:
+                lines += [line, line.rstrip('\n')]
+
+    return lines
+
+
+class PatternTimeTest(unittest.TestCase):
+
+    def test_every_pattern_is_under_the_budget_on_adversarial_lines(self):
+        pattern_uses = apib_patterns.get_pattern_uses()
+        over_budget = []
+
+        for line in generate_adversarial_lines(ADVERSARIAL_LINE_LENGTH, RANDOM_ADVERSARIAL_LINES, 0):
+            for (name, use) in pattern_uses.iteritems():
+                if time_use(use, line) > LINE_TIME_BUDGET:
+                    elapsed_time = min(time_use(use, line) for _ in range(LINE_TIME_RETRIES))
+                    if elapsed_time > LINE_TIME_BUDGET:
+                        over_budget.append("%s: %.3f ms on %r" % (name, elapsed_time * 1000, line[:80]))
+
+        self.assertEqual(over_budget, [])
+
+    def test_the_budget_catches_backtracking(self):
+        # The property declaration pattern before the registry is cubic on a run of spaces: about
+        # 300 ms on this line, while the registry one takes a few microseconds
+        (pattern, method) = OLD_PATTERNS['property_member_declaration_regex']
+        line = "- a" + " " * 1000 + "x"
+
+        self.assertGreater(time_use(getattr(re.compile(pattern), method), line), LINE_TIME_BUDGET)
+        self.assertLess(time_use(apib_patterns.property_member_declaration_regex.match, line), LINE_TIME_BUDGET)
+
+
+class PatternMatchTest(unittest.TestCase):
+
+    def test_patterns_match_the_examples_as_before(self):
+        example_lines = get_example_lines()
+        self.assertTrue(example_lines)
+
+        for (name, (pattern, method)) in sorted(OLD_PATTERNS.iteritems()):
+            old_use = getattr(re.compile(pattern), method)
+            use = getattr(getattr(apib_patterns, name), method)
+            for line in example_lines:
+                self.assertEqual(get_match_result(use(line)), get_match_result(old_use(line)), "%s on %r" % (name, line))
+
+    def test_headers_are_split_as_before(self):
+        titles = [apib_patterns.header_regex.match(line).group(2) for line in get_example_lines()
+                  if apib_patterns.header_regex.match(line) and line.rstrip().endswith(']')]
+        self.assertTrue(titles)
+
+        for title in titles:
+            self.assertEqual(apib_patterns.split_markdown_header(title), split_markdown_header_as_before(title), title)
+
+    def test_split_markdown_header(self):
+        self.assertEqual(apib_patterns.split_markdown_header("Get a room [GET /rooms/{id}]"), ("Get a room", "GET", "/rooms/{id}"))
+        self.assertEqual(apib_patterns.split_markdown_header("Room [/rooms/{id}]"), ("Room", None, "/rooms/{id}"))
+        self.assertEqual(apib_patterns.split_markdown_header("Room [a] [/rooms/{id}]"), ("Room [a]", None, "/rooms/{id}"))
+        self.assertIsNone(apib_patterns.split_markdown_header("Rooms"))
+
+    def test_links_of_a_line_are_found_one_by_one(self):
+        line = "See <http://example.com/a> and <http://example.com/b>"
+
+        self.assertEqual(apib_patterns.auto_link_regex.findall(line), ["http://example.com/a", "http://example.com/b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import StringIO
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from fiware_api_blueprint_renderer.src import archive_writer
+from fiware_api_blueprint_renderer.src.output_writer import OutputWriter
+
+
+FILES = {
+    'rooms.html': '<html>' + 'Rooms API ' * 500 + '</html>',
+    'rooms-search-index.json': '{}',
+    'css/api.css': 'body { color: black; }\n' * 50,
+    'img/empty.png': '',
+}
+
+
+class WriteArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.build_dir_path = os.path.join(self.dir_path, 'out')
+        self.cache_dir_path = os.path.join(self.dir_path, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def create_output_writer(self):
+        """Returns an OutputWriter with FILES staged in the build directory, css/ and img/ being theme assets"""
+        writer = OutputWriter()
+        for (name, content) in FILES.iteritems():
+            writer.write(os.path.join(self.build_dir_path, name), content)
+        writer.manage_directory(os.path.join(self.build_dir_path, 'css'))
+        writer.manage_directory(os.path.join(self.build_dir_path, 'img'))
+
+        return writer
+
+    def read_zip(self, zip_archive):
+        with zipfile.ZipFile(zip_archive) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            return dict((name, zip_file.read(name)) for name in zip_file.namelist())
+
+    def read_tar_gz(self, tar_gz_archive):
+        tar_file = tarfile.open(fileobj=tar_gz_archive, mode='r:gz') if hasattr(tar_gz_archive, 'read') else tarfile.open(tar_gz_archive, 'r:gz')
+        try:
+            return dict((member.name, tar_file.extractfile(member).read()) for member in tar_file.getmembers())
+        finally:
+            tar_file.close()
+
+    def test_zip(self):
+        archive_path = os.path.join(self.dir_path, 'site.zip')
+        stats = archive_writer.write_archive(self.create_output_writer(), self.build_dir_path, archive_path)
+
+        self.assertEqual(self.read_zip(archive_path), FILES)
+        self.assertEqual(stats, {'files': len(FILES), 'compressed': len(FILES), 'cached': 0})
+
+    def test_tar_gz(self):
+        archive_path = os.path.join(self.dir_path, 'site.tgz')
+        archive_writer.write_archive(self.create_output_writer(), self.build_dir_path, archive_path)
+
+        self.assertEqual(self.read_tar_gz(archive_path), FILES)
+        with tarfile.open(archive_path, 'r:gz') as tar_file:
+            self.assertEqual(tar_file.getnames(), sorted(FILES))
+            self.assertEqual(set(member.mode for member in tar_file.getmembers()), set([0644]))
+
+    def test_stream(self):
+        stream = StringIO.StringIO()
+        archive_writer.write_archive(self.create_output_writer(), self.build_dir_path, stream)
+        stream.seek(0)
+
+        self.assertEqual(self.read_tar_gz(stream), FILES)
+
+    def test_nothing_is_written_to_the_build_directory(self):
+        writer = self.create_output_writer()
+        archive_writer.write_archive(writer, self.build_dir_path, os.path.join(self.dir_path, 'site.zip'))
+
+        self.assertFalse(os.path.exists(self.build_dir_path))
+        self.assertEqual(writer.commit(), {'changed': [], 'unchanged': [], 'removed': []})
+
+    def test_theme_assets_are_compressed_once(self):
+        for archive_name in ('site.zip', 'site.tar.gz', 'site-2.zip'):
+            archive_path = os.path.join(self.dir_path, archive_name)
+            stats = archive_writer.write_archive(self.create_output_writer(), self.build_dir_path, archive_path, cache_dir_path=self.cache_dir_path)
+            read_archive = self.read_zip if archive_name.endswith('.zip') else self.read_tar_gz
+            self.assertEqual(read_archive(archive_path), FILES)
+
+        # The empty asset of the tar has no compressed piece
+        self.assertEqual(stats, {'files': len(FILES), 'compressed': 2, 'cached': 2})
+        self.assertEqual(len(os.listdir(self.cache_dir_path)), 2)
+
+    def test_files_outside_of_the_build_directory(self):
+        writer = self.create_output_writer()
+        writer.write(os.path.join(self.dir_path, 'other', 'page.html'), 'page')
+
+        self.assertRaises(ValueError, archive_writer.write_archive, writer, self.build_dir_path, os.path.join(self.dir_path, 'site.zip'))
+
+
+class GetArchiveFormatTest(unittest.TestCase):
+
+    def test_format_of_the_extension(self):
+        self.assertEqual(archive_writer.get_archive_format('site.zip'), 'zip')
+        self.assertEqual(archive_writer.get_archive_format('site.tar.gz'), 'tar.gz')
+        self.assertEqual(archive_writer.get_archive_format('site.tgz'), 'tar.gz')
+        self.assertRaises(ValueError, archive_writer.get_archive_format, 'site.rar')
+
+    def test_explicit_format(self):
+        self.assertEqual(archive_writer.get_archive_format('site', 'zip'), 'zip')
+        self.assertEqual(archive_writer.get_archive_format('site.zip', 'tar.gz'), 'tar.gz')
+        self.assertRaises(ValueError, archive_writer.get_archive_format, 'site.zip', 'rar')
+
+    def test_streams_default_to_tar_gz(self):
+        self.assertEqual(archive_writer.get_archive_format(StringIO.StringIO()), archive_writer.DEFAULT_STREAM_ARCHIVE_FORMAT)
+
+
+if __name__ == '__main__':
+    unittest.main()
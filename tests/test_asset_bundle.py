@@ -0,0 +1,187 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from fiware_api_blueprint_renderer.src import asset_bundle
+from fiware_api_blueprint_renderer.src.output_writer import OutputWriter
+
+
+PAGE = """<html><head>
+<link rel="stylesheet" href="css/base.css">
+<link rel="stylesheet" href="https://example.com/remote.css">
+<link rel="stylesheet" href="css/extra.css">
+</head><body>
+<div id="content" class="action GET"><span class="title">Rooms</span></div>
+<script src="js/a.js"></script>
+<script src="js/b.js"></script>
+</body></html>"""
+
+BASE_CSS = """/* base */
+@import url("fonts.css");
+body { margin: 0 }
+.action.GET > .title { color: blue }
+.unused, #content { padding: 1px }
+@media print { .unused { display: none } .title:hover { color: red } }
+@font-face { font-family: icons; src: url(../font/icons.woff) }
+"""
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fiware_api_blueprint_renderer', 'themes', 'default_theme',
+                         'font', 'fontawesome-webfont.woff')
+
+
+class PruneCssTest(unittest.TestCase):
+
+    def test_unused_selectors_are_dropped(self):
+        used_tokens = asset_bundle.get_used_tokens(PAGE, [])
+        css = asset_bundle.serialize_css(asset_bundle.parse_css(BASE_CSS), used_tokens)
+
+        self.assertEqual(css.split('\n'), ['@import url("fonts.css");',
+                                           'body{margin: 0}',
+                                           '.action.GET > .title{color: blue}',
+                                           '#content{padding: 1px}',
+                                           '@media print{',
+                                           '.title:hover{color: red}',
+                                           '}',
+                                           '@font-face { font-family: icons; src: url(../font/icons.woff) }'])
+
+    def test_nested_at_rules_without_used_selectors_are_dropped(self):
+        css = asset_bundle.serialize_css(asset_bundle.parse_css("@media print { .unused { display: none } }"), asset_bundle.get_used_tokens(PAGE, []))
+
+        self.assertEqual(css, '')
+
+    def test_words_of_the_scripts_are_used(self):
+        used_tokens = asset_bundle.get_used_tokens(PAGE, ['element.classList.add("unused")'])
+        css = asset_bundle.serialize_css(asset_bundle.parse_css(".unused { display: none }"), used_tokens)
+
+        self.assertEqual(css, '.unused{display: none}')
+
+    def test_everything_is_kept_without_used_tokens(self):
+        self.assertIn('.unused,#content{padding: 1px}', asset_bundle.serialize_css(asset_bundle.parse_css(BASE_CSS)))
+
+
+class BundlePageAssetsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.template_dir_path = tempfile.mkdtemp()
+        self.dst_dir_path = tempfile.mkdtemp()
+        for (path, content) in [('css/base.css', BASE_CSS), ('css/extra.css', '.title { background: url(../img/bg.png) }'),
+                                ('js/a.js', 'var a = 1;'), ('js/b.js', 'var b = 2;')]:
+            path = os.path.join(self.template_dir_path, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as asset_file:
+                asset_file.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir_path)
+        shutil.rmtree(self.dst_dir_path)
+
+    def test_local_assets_are_bundled(self):
+        writer = OutputWriter()
+        html = asset_bundle.bundle_page_assets(PAGE, self.template_dir_path, self.dst_dir_path, 'rooms', output_writer=writer)
+
+        self.assertEqual(html, """<html><head>
+<link rel="stylesheet" href="css/rooms.bundle.css">
+<link rel="stylesheet" href="https://example.com/remote.css">
+</head><body>
+<div id="content" class="action GET"><span class="title">Rooms</span></div>
+<script src="js/rooms.bundle.js"></script>
+</body></html>""")
+        self.assertEqual(writer.read(os.path.join(self.dst_dir_path, 'js', 'rooms.bundle.js')), 'var a = 1;;\nvar b = 2;')
+
+        css = writer.read(os.path.join(self.dst_dir_path, 'css', 'rooms.bundle.css'))
+        self.assertIn('.unused,#content{padding: 1px}', css)
+        self.assertTrue(css.endswith('.title{background: url(../img/bg.png)}'))
+
+    def test_pruned_bundle(self):
+        writer = OutputWriter()
+        asset_bundle.bundle_page_assets(PAGE, self.template_dir_path, self.dst_dir_path, 'rooms', prune_css=True, output_writer=writer)
+
+        css = writer.read(os.path.join(self.dst_dir_path, 'css', 'rooms.bundle.css'))
+        self.assertNotIn('.unused', css)
+        self.assertIn('#content{padding: 1px}', css)
+
+    def test_parsed_stylesheets_are_cached(self):
+        cache_dir_path = os.path.join(self.dst_dir_path, 'cache')
+        os.mkdir(cache_dir_path)
+
+        items = asset_bundle.get_stylesheets_manifest(self.template_dir_path, ['css/base.css'], cache_dir_path)
+        self.assertEqual(len(os.listdir(cache_dir_path)), 1)
+        self.assertEqual(asset_bundle.get_stylesheets_manifest(self.template_dir_path, ['css/base.css'], cache_dir_path), items)
+
+
+class SubsetFontsTest(unittest.TestCase):
+
+    CSS = '@font-face { font-family: icons; src: url(../font/icons.woff) }\n.home:before { content: "\\f015" }'
+
+    def setUp(self):
+        self.dst_dir_path = tempfile.mkdtemp()
+        self.cache_dir_path = os.path.join(self.dst_dir_path, 'cache')
+        with open(FONT_PATH, 'rb') as font_file:
+            self.font = font_file.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.dst_dir_path)
+
+    def subset_fonts(self):
+        writer = OutputWriter()
+        writer.write(os.path.join(self.dst_dir_path, 'font', 'icons.woff'), self.font)
+        css = asset_bundle.subset_fonts(self.CSS, self.dst_dir_path, self.cache_dir_path, writer)
+
+        return (css, writer.read(os.path.join(self.dst_dir_path, 'font', 'icons.subset.woff')))
+
+    @unittest.skipUnless(asset_bundle.can_subset_fonts(), "fontTools is not installed")
+    def test_fonts_are_subset_and_cached(self):
+        (css, subset_font) = self.subset_fonts()
+
+        self.assertEqual(css, self.CSS.replace('icons.woff', 'icons.subset.woff'))
+        self.assertLess(len(subset_font), len(self.font) / 10)
+        [cached_font_name] = os.listdir(self.cache_dir_path)
+        self.assertTrue(cached_font_name.endswith('.woff'))
+
+        # A font in the cache is used as it is
+        with open(os.path.join(self.cache_dir_path, cached_font_name), 'wb') as cached_font_file:
+            cached_font_file.write('cached')
+        self.assertEqual(self.subset_fonts(), (css, 'cached'))
+
+    def test_stylesheets_without_icons_are_unchanged(self):
+        css = self.CSS.split('\n')[0]
+
+        self.assertEqual(asset_bundle.subset_fonts(css, self.dst_dir_path, self.cache_dir_path, OutputWriter()), css)
+        self.assertFalse(os.path.exists(self.cache_dir_path))
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dst_dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dst_dir_path)
+
+    def get_fingerprint(self, content):
+        return hashlib.sha1(content).hexdigest()[:asset_bundle.FINGERPRINT_LENGTH]
+
+    def test_static_files_and_their_references_are_renamed(self):
+        writer = OutputWriter()
+        writer.write(os.path.join(self.dst_dir_path, 'img', 'bg.png'), 'png')
+        writer.write(os.path.join(self.dst_dir_path, 'css', 'style.css'), '.title { background: url("../img/bg.png?v=1") }')
+
+        asset_manifest = asset_bundle.fingerprint_static_files(self.dst_dir_path, ['css', 'img'], writer)
+
+        png_path = 'img/bg.%s.png' % self.get_fingerprint('png')
+        css = '.title { background: url("../%s?v=1") }' % png_path
+        css_path = 'css/style.%s.css' % self.get_fingerprint(css)
+        self.assertEqual(dict(asset_manifest), {'img/bg.png': png_path, 'css/style.css': css_path})
+        self.assertEqual(writer.read(os.path.join(self.dst_dir_path, css_path)), css)
+        self.assertEqual(writer.get_staged_paths(os.path.join(self.dst_dir_path, 'img')), [os.path.join(self.dst_dir_path, png_path)])
+
+        html = '<link rel="stylesheet" href="css/style.css"><img src="./img/bg.png#top"><a href="https://example.com/css/style.css">'
+        self.assertEqual(asset_bundle.rewrite_asset_references(html, asset_manifest),
+                         '<link rel="stylesheet" href="%s"><img src="%s#top"><a href="https://example.com/css/style.css">' % (css_path, png_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import sys
+import unittest
+
+from fiware_api_blueprint_renderer.src import ast_loader
+from tests import stand_in_drafter
+from tests.test_renderer import API_SPECIFICATION
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def add_unused_members(value):
+    """Adds to every object of a drafter AST the members drafter outputs and the pipeline doesn't use"""
+    if isinstance(value, dict):
+        for item in value.values():
+            add_unused_members(item)
+        value['sourcemap'] = [[[12, 34]], {'nested': [1, 2]}]
+        if 'uriTemplate' in value:
+            value['sourceMap'] = {'name': [[0, 5]]}
+            value['model'] = {'name': "Room", 'body': "{}", 'content': [{'element': 'asset', 'content': "{}"}]}
+    elif isinstance(value, list):
+        for item in value:
+            add_unused_members(item)
+
+
+def prune(value):
+    """Returns a copy of a JSON value without the pruned members and elements"""
+    if isinstance(value, dict):
+        pruned_value = dict((key, prune(item)) for (key, item) in value.iteritems() if key not in ast_loader.PRUNED_MEMBERS)
+        if isinstance(pruned_value.get('content'), list):
+            pruned_value['content'] = [element for element in pruned_value['content']
+                                       if not (isinstance(element, dict) and element.get('element') in ast_loader.PRUNED_ELEMENTS)]
+        return pruned_value
+    elif isinstance(value, list):
+        return [prune(item) for item in value]
+
+    return value
+
+
+def generate_drafter_output():
+    """Returns the AST of a blueprint as drafter writes it, with every member drafter can output"""
+    API_blueprint = API_SPECIFICATION % {'title': u"Habitaciones API".encode('utf-8')} + """
++ Request (application/json)
+
+        {"name": "Habitaci\xc3\xb3n", "temperature": 23.5, "floor": -1, "open": true, "door": null}
+
+# Data Structures
+
+## Room (object)
+
+    + id: Room1 (string)
+"""
+    (ast, _) = stand_in_drafter.parse_api_blueprint(API_blueprint.splitlines())
+    add_unused_members(ast)
+    ast['_version'] = 3.0
+    ast['numbers'] = [0, -1, 23.5, 1e100, 12345678901234567890]
+    ast['literals'] = [True, False, None, u"\xf1", {}, []]
+
+    return json.dumps(ast, indent=4)
+
+
+class LoadApiBlueprintAstTest(unittest.TestCase):
+
+    def load_without_ijson(self, AST):
+        saved_ijson = sys.modules.get('ijson')
+        # Makes the import of ijson fail
+        sys.modules['ijson'] = None
+        try:
+            return ast_loader.loads_api_blueprint_ast(AST)
+        finally:
+            if saved_ijson is None:
+                del sys.modules['ijson']
+            else:
+                sys.modules['ijson'] = saved_ijson
+
+    def test_pruned_members_and_elements(self):
+        AST = generate_drafter_output()
+        for member in ('"model"', '"sourcemap"', '"sourceMap"', '"asset"'):
+            self.assertIn(member, AST)
+
+        API_blueprint_ast = self.load_without_ijson(AST)
+        self.assertEqual(API_blueprint_ast, prune(json.loads(AST)))
+
+        pruned_AST = json.dumps(API_blueprint_ast)
+        for member in ('"model"', '"sourcemap"', '"sourceMap"', '"asset"'):
+            self.assertNotIn(member, pruned_AST)
+        self.assertEqual(API_blueprint_ast['resourceGroups'][0]['resources'][0]['content'], [])
+        self.assertEqual(API_blueprint_ast['content'][0]['content'][0]['name'], {'literal': 'Room'})
+
+    @unittest.skipIf(ijson is None, "ijson is not installed")
+    def test_streaming_and_json_load_asts_are_equal(self):
+        AST = generate_drafter_output()
+
+        API_blueprint_ast = ast_loader.loads_api_blueprint_ast(AST)
+        self.assertEqual(API_blueprint_ast, self.load_without_ijson(AST))
+        self.assertEqual(json.dumps(API_blueprint_ast, sort_keys=True), json.dumps(self.load_without_ijson(AST), sort_keys=True))
+
+    def test_invalid_ast(self):
+        self.assertRaises(ValueError, self.load_without_ijson, '{"name": ')
+        self.assertRaises(ValueError, ast_loader.loads_api_blueprint_ast, '{"name": ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import StringIO
+import sys
+import unittest
+
+from fiware_api_blueprint_renderer.src import ast_loader
+from fiware_api_blueprint_renderer.src import drafter_shards
+from tests.stand_in_drafter import StandInDrafterTestCase, install_stand_in_drafter
+
+
+HEADER = """FORMAT: 1A
+HOST: http://example.com
+
+# Building API
+
+Rooms and sensors of a building.
+
+"""
+
+GROUP = """# Group %(name)ss
+
+Every %(name)s of the building.
+
+## %(name)s [/%(name)ss/{id}]
+
+### Get a %(name)s [GET]
+
++ Response 200 (application/json)
+
++ Attributes (%(name)s)
+
++ Attributes (Missing%(name)s)
+
+        {"id": "%(name)s1"}
+
+"""
+
+DATA_STRUCTURES = """# Data Structures
+
+## %(name)s (object)
+
+    + id: %(name)s1 (string)
+
+"""
+
+
+def generate_api_blueprint(names, data_structures_names):
+    """Returns an API blueprint with a group for every name, followed by the Data Structures section
+    of the names of data_structures_names when they are given by name"""
+    API_blueprint = HEADER
+    for name in names:
+        API_blueprint += GROUP % {'name': name}
+        if name in data_structures_names:
+            API_blueprint += DATA_STRUCTURES % {'name': data_structures_names[name]}
+
+    return API_blueprint
+
+
+class ParseApiBlueprintShardsTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        self.saved_min_sharded_lines = drafter_shards.MIN_SHARDED_LINES
+        drafter_shards.MIN_SHARDED_LINES = 1
+
+    def tearDown(self):
+        drafter_shards.MIN_SHARDED_LINES = self.saved_min_sharded_lines
+        StandInDrafterTestCase.tearDown(self)
+
+    def parse(self, API_blueprint, jobs):
+        """Returns the AST of a blueprint parsed by jobs drafter processes and the annotations written"""
+        saved_stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+        try:
+            if jobs == 1:
+                (output, errors, returncode) = drafter_shards.run_drafter(API_blueprint)
+                self.assertEqual(returncode, 0)
+                sys.stderr.write(errors)
+                API_blueprint_ast = ast_loader.loads_api_blueprint_ast(output)
+            else:
+                API_blueprint_ast = drafter_shards.parse_api_blueprint_shards(API_blueprint, jobs)
+                self.assertIsNotNone(API_blueprint_ast)
+            return (API_blueprint_ast, sys.stderr.getvalue())
+        finally:
+            sys.stderr = saved_stderr
+
+    def assertShardedLikeSingleRun(self, API_blueprint):
+        (single_ast, single_errors) = self.parse(API_blueprint, 1)
+        for jobs in (2, 3):
+            self.assertEqual(self.parse(API_blueprint, jobs), (single_ast, single_errors))
+
+        return (single_ast, single_errors)
+
+    def test_trailing_data_structures(self):
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor', 'Door'], {'Door': 'Room'})
+        (API_blueprint_ast, errors) = self.assertShardedLikeSingleRun(API_blueprint)
+
+        self.assertEqual(len(API_blueprint_ast['resourceGroups']), 3)
+        self.assertEqual([category['content'][0]['name']['literal'] for category in API_blueprint_ast['content']], ['Room'])
+        self.assertNotIn("`Room`", errors)
+        self.assertEqual(errors.count("unable to find the symbol"), 5)
+
+    def test_data_structures_between_groups(self):
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor', 'Door', 'Window'], {'Room': 'Window', 'Door': 'Sensor'})
+        (API_blueprint_ast, errors) = self.assertShardedLikeSingleRun(API_blueprint)
+
+        self.assertEqual([category['content'][0]['name']['literal'] for category in API_blueprint_ast['content']], ['Window', 'Sensor'])
+        self.assertEqual(errors.count("unable to find the symbol"), 6)
+
+    def test_data_structures_of_the_header(self):
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor'], {}).replace(
+            "# Group Rooms", DATA_STRUCTURES.replace('# ', '## ') % {'name': 'Sensor'} + "# Group Rooms")
+        (API_blueprint_ast, errors) = self.assertShardedLikeSingleRun(API_blueprint)
+
+        self.assertEqual(len(API_blueprint_ast['content']), 1)
+        self.assertEqual(errors.count("unable to find the symbol"), 3)
+
+    def test_annotation_line_numbers_are_the_ones_of_the_blueprint(self):
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor', 'Door'], {'Door': 'Room'})
+        (_, errors) = self.parse(API_blueprint, 3)
+
+        lines = API_blueprint.split('\n')
+        for annotation in errors.splitlines():
+            line_number = int(annotation.split('; line ')[1].split(',')[0])
+            symbol = annotation.split('`')[1]
+            self.assertEqual(lines[line_number - 1], "+ Attributes (%s)" % symbol)
+
+    def test_failed_shard(self):
+        install_stand_in_drafter(self.bin_dir_path, exit_code=1)
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor'], {'Sensor': 'Room'})
+
+        self.assertRaises(RuntimeError, self.parse, API_blueprint, 2)
+
+    def test_small_blueprints_are_not_sharded(self):
+        drafter_shards.MIN_SHARDED_LINES = self.saved_min_sharded_lines
+        API_blueprint = generate_api_blueprint(['Room', 'Sensor'], {'Sensor': 'Room'})
+
+        self.assertIsNone(drafter_shards.parse_api_blueprint_shards(API_blueprint, 2))
+
+
+class SplitApiBlueprintGroupsTest(unittest.TestCase):
+
+    def test_groups_and_data_structures(self):
+        API_blueprint_lines = generate_api_blueprint(['Room', 'Sensor'], {'Sensor': 'Room'}).splitlines(True)
+        (header_lines, group_ranges, data_structures_ranges) = drafter_shards.split_api_blueprint_groups(API_blueprint_lines)
+
+        self.assertEqual(''.join(header_lines), HEADER)
+        self.assertEqual([API_blueprint_lines[first] for (first, last) in group_ranges], ["# Group Rooms\n", "# Group Sensors\n"])
+        self.assertEqual(group_ranges[-1][1], len(API_blueprint_lines))
+        self.assertEqual([''.join(API_blueprint_lines[first:last]) for (first, last) in data_structures_ranges],
+                         [DATA_STRUCTURES % {'name': 'Room'}])
+
+    def test_resources_before_the_first_group(self):
+        API_blueprint_lines = (HEADER + "## Building [/building]\n\n" + GROUP % {'name': 'Room'} + GROUP % {'name': 'Sensor'}).splitlines(True)
+
+        self.assertIsNone(drafter_shards.split_api_blueprint_groups(API_blueprint_lines))
+
+    def test_single_group(self):
+        API_blueprint_lines = generate_api_blueprint(['Room'], {}).splitlines(True)
+
+        self.assertIsNone(drafter_shards.split_api_blueprint_groups(API_blueprint_lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
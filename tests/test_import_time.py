@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+REPOSITORY_DIR_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start budget of the command line tool, in seconds. Importing the renderer takes about 30 ms,
+# and about 65 ms with the stage modules and multiprocessing imported eagerly, which the tests of
+# the loaded modules catch first; the budget leaves room for slower machines.
+IMPORT_TIME_BUDGET = 0.1
+
+# Runs of the import, the fastest one being compared with the budget
+IMPORT_TIME_RUNS = 3
+
+# Modules only the stages using them import
+DEFERRED_MODULES = ['multiprocessing', 'jinja2', 'markdown', 'cgi', 'pprint', 'inspect', 'pkg_resources',
+                    'fiware_api_blueprint_renderer.src.ast_loader', 'fiware_api_blueprint_renderer.src.asset_bundle',
+                    'fiware_api_blueprint_renderer.src.drafter_shards', 'fiware_api_blueprint_renderer.src.markdown_batch',
+                    'fiware_api_blueprint_renderer.src.rendered_fragments', 'fiware_api_blueprint_renderer.src.search_index',
+                    'fiware_api_blueprint_renderer.src.syntax_highlight']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.time()
+from fiware_api_blueprint_renderer.src import renderer
+elapsed = time.time() - start
+if sys.argv[1:] == ['main']:
+    sys.argv = ['fabre']
+    try:
+        renderer.main()
+    except SystemExit:
+        pass
+sys.stdout = sys.__stdout__
+print(json.dumps({'elapsed': elapsed, 'modules': [name for name in sys.modules if sys.modules[name] is not None]}))
+"""
+
+
+def run_import_script(*args):
+    """Imports the renderer in a new interpreter, returning the seconds it took and the modules loaded"""
+    script = subprocess.Popen([sys.executable, '-c', IMPORT_SCRIPT] + list(args), cwd=REPOSITORY_DIR_PATH,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    (output, errors) = script.communicate()
+    if script.returncode != 0:
+        raise AssertionError(errors)
+
+    result = json.loads(output.splitlines()[-1])
+    return (result['elapsed'], set(result['modules']))
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def assertNotLoaded(self, modules):
+        self.assertEqual(sorted(name for name in modules if name.split('.')[0] in DEFERRED_MODULES or name in DEFERRED_MODULES), [])
+
+    def test_import_loads_no_deferred_module(self):
+        (_, modules) = run_import_script()
+
+        self.assertIn('fiware_api_blueprint_renderer.src.renderer', modules)
+        self.assertNotLoaded(modules)
+
+    def test_argument_check_loads_no_deferred_module(self):
+        (_, modules) = run_import_script('main')
+
+        self.assertNotLoaded(modules)
+
+    def test_import_time_is_within_budget(self):
+        elapsed = min(run_import_script()[0] for _ in range(IMPORT_TIME_RUNS))
+
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
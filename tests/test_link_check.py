@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import BaseHTTPServer
+import os
+import shutil
+import socket
+import SocketServer
+import tempfile
+import threading
+import time
+import unittest
+
+from fiware_api_blueprint_renderer.src import link_check
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers the requests of the link checker tests, recording them in the server"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.server.requests.append((time.time(), self.command, self.path))
+
+        if self.path in ('/ok', '/a%C3%B1o?q=caf%C3%A9'):
+            self.answer(200)
+        elif self.path == '/moved':
+            self.answer(301, [('Location', '/ok')])
+        elif self.path == '/moved-to-missing':
+            self.answer(302, [('Location', 'http://%s:%d/missing' % self.server.server_address)])
+        elif self.path == '/loop':
+            self.answer(302, [('Location', '/loop')])
+        elif self.path == '/get-only' and self.command == 'HEAD':
+            self.answer(405)
+        elif self.path == '/get-only':
+            self.answer(200)
+        else:
+            self.answer(404)
+
+    do_GET = do_HEAD
+
+    def answer(self, status, headers=()):
+        self.send_response(status)
+        for (name, value) in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+
+class LinkCheckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(('127.0.0.1', 0), StandInHandler)
+        self.server.requests = []
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        self.cache_dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir_path)
+
+    def get_url(self, path):
+        return u"http://%s:%d%s" % (self.server.server_address + (path,))
+
+    def check_urls(self, paths, **options):
+        options.setdefault('requests_per_second', None)
+        results = link_check.check_urls([self.get_url(path) for path in paths], self.cache_dir_path, **options)
+
+        return [(results[self.get_url(path)]['status'], results[self.get_url(path)]['ok']) for path in paths]
+
+    def test_status(self):
+        self.assertEqual(self.check_urls(['/ok', '/missing']), [(200, True), (404, False)])
+
+    def test_redirects_are_followed(self):
+        self.assertEqual(self.check_urls(['/moved', '/moved-to-missing']), [(200, True), (404, False)])
+
+    def test_redirect_loops_are_broken(self):
+        results = link_check.check_urls([self.get_url('/loop')], self.cache_dir_path, requests_per_second=None)
+
+        self.assertEqual(results[self.get_url('/loop')]['ok'], False)
+        self.assertEqual(results[self.get_url('/loop')]['reason'], "Too many redirections")
+        self.assertEqual(len(self.server.requests), link_check.MAX_REDIRECTS + 1)
+
+    def test_get_when_head_is_not_allowed(self):
+        self.assertEqual(self.check_urls(['/get-only']), [(200, True)])
+        self.assertEqual([command for (request_time, command, path) in self.server.requests], ['HEAD', 'GET'])
+
+    def test_non_ascii_urls_are_percent_encoded(self):
+        self.assertEqual(self.check_urls([u'/año?q=café']), [(200, True)])
+        self.assertEqual(self.server.requests[0][2], '/a%C3%B1o?q=caf%C3%A9')
+
+    def test_rate_limit(self):
+        self.check_urls(['/ok', '/missing', '/moved'], requests_per_second=10)
+
+        request_times = [request_time for (request_time, command, path) in self.server.requests]
+        self.assertEqual(len(request_times), 4)
+        for (previous_time, request_time) in zip(request_times, request_times[1:]):
+            self.assertGreaterEqual(request_time - previous_time, 0.09)
+
+    def test_results_are_cached_until_they_expire(self):
+        self.check_urls(['/ok', '/missing'])
+        self.assertEqual(self.check_urls(['/ok', '/missing'], ttl=60), [(200, True), (404, False)])
+        self.assertEqual(len(self.server.requests), 2)
+
+        time.sleep(0.2)
+        self.check_urls(['/ok'], ttl=0.1)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_network_errors_are_not_cached(self):
+        closed_socket = socket.socket()
+        closed_socket.bind(('127.0.0.1', 0))
+        closed_url = u"http://%s:%d/ok" % closed_socket.getsockname()
+        closed_socket.close()
+
+        results = link_check.check_urls([closed_url], self.cache_dir_path, timeout=1)
+        self.assertEqual((results[closed_url]['status'], results[closed_url]['ok']), (None, False))
+
+        cache_file_path = os.path.join(self.cache_dir_path, 'links', link_check.CACHE_FILE_NAME)
+        self.assertEqual(link_check.load_links_cache(cache_file_path, 60), {})
+
+
+class GetRequestUriTest(unittest.TestCase):
+
+    def test_reserved_characters_and_escapes_are_kept(self):
+        self.assertEqual(link_check.get_request_uri(u"http://example.com/a%20b/c;d=e?f=g&h=i+j~"), "/a%20b/c;d=e?f=g&h=i+j~")
+
+    def test_non_ascii_and_spaces_are_encoded(self):
+        self.assertEqual(link_check.get_request_uri(u"http://example.com/año nuevo"), "/a%C3%B1o%20nuevo")
+
+    def test_empty_path(self):
+        self.assertEqual(link_check.get_request_uri(u"http://example.com"), "/")
+
+
+if __name__ == '__main__':
+    unittest.main()
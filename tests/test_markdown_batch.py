@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from fiware_api_blueprint_renderer.src import markdown_batch
+from fiware_api_blueprint_renderer.src import renderer
+
+
+TABLE = """| Name | Type |
+|------|------|
+| id   | string |
+| temperature | number |
+"""
+
+
+def create_markdown_texts(count):
+    """Returns (extensions, text) tuples of texts of several lengths, some of them with tables"""
+    markdown_texts = []
+    for index in range(count):
+        text = u"Room *%d* of the building, with %d windows.\n\n" % (index, index) * (1 + index % 7)
+        if index % 3 == 0:
+            text += u"\n" + TABLE
+            extensions = renderer.DESCRIPTION_MARKDOWN_EXTENSIONS
+        else:
+            text += u"\n```\n{\"id\": \"Room%d\"}\n```\n" % index
+            extensions = renderer.SECTION_MARKDOWN_EXTENSIONS
+        markdown_texts.append((extensions, text))
+
+    return markdown_texts
+
+
+def convert_markdown_texts_process(result_path):
+    """Converts a batch of Markdown texts in parallel from a daemon process, writing their HTML"""
+    html_texts = markdown_batch.convert_markdown_texts(create_markdown_texts(20), jobs=2, min_parallel_cost=0)
+
+    with open(result_path, 'w') as result_file:
+        json.dump(html_texts, result_file)
+
+
+class GetChunksTest(unittest.TestCase):
+
+    def test_chunks_keep_the_order_of_the_texts(self):
+        markdown_texts = create_markdown_texts(30)
+        costs = [markdown_batch.get_conversion_cost(text) for (extensions, text) in markdown_texts]
+
+        for chunk_count in (1, 2, 7, 30, 50):
+            chunks = markdown_batch.get_chunks(markdown_texts, costs, chunk_count)
+            self.assertTrue(len(chunks) <= chunk_count, chunk_count)
+            self.assertEqual([markdown_text for chunk in chunks for markdown_text in chunk], markdown_texts)
+            self.assertNotIn([], chunks)
+
+    def test_costly_texts_get_chunks_of_their_own(self):
+        chunks = markdown_batch.get_chunks(['a', 'b', 'c', 'd', 'e'], [1, 1, 100, 1, 1], 3)
+
+        self.assertEqual(chunks, [['a', 'b', 'c'], ['d', 'e']])
+
+
+class ConvertMarkdownTextsTest(unittest.TestCase):
+
+    def test_parallel_conversion_is_the_serial_one(self):
+        markdown_texts = create_markdown_texts(40)
+        saved_pool = multiprocessing.Pool
+        pool_sizes = []
+
+        def pool(processes):
+            pool_sizes.append(processes)
+            return saved_pool(processes)
+
+        multiprocessing.Pool = pool
+        try:
+            html_texts = markdown_batch.convert_markdown_texts(markdown_texts, jobs=2, min_parallel_cost=0)
+        finally:
+            multiprocessing.Pool = saved_pool
+
+        self.assertEqual(pool_sizes, [2])
+        self.assertEqual(html_texts, markdown_batch.convert_markdown_texts(markdown_texts, jobs=1))
+        self.assertIn(u"<table>", html_texts[0])
+        self.assertIn(u"<em>39</em>", html_texts[39])
+
+    def test_daemon_processes_convert_serially(self):
+        temp_dir_path = tempfile.mkdtemp()
+        try:
+            result_path = os.path.join(temp_dir_path, 'result.json')
+            # Daemon processes can't start a pool of their own
+            process = multiprocessing.Process(target=convert_markdown_texts_process, args=(result_path,))
+            process.daemon = True
+            process.start()
+            process.join(60)
+
+            self.assertEqual(process.exitcode, 0)
+            with open(result_path) as result_file:
+                self.assertEqual(json.load(result_file), markdown_batch.convert_markdown_texts(create_markdown_texts(20), jobs=1))
+        finally:
+            shutil.rmtree(temp_dir_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from fiware_api_blueprint_renderer.src import navigation
+
+
+def create_action(name, method='GET', uri_template=''):
+    return {'name': name, 'method': method, 'attributes': {'uriTemplate': uri_template}}
+
+
+def create_resource(name, actions, uri_template='/rooms'):
+    return {'name': name, 'uriTemplate': uri_template, 'actions': actions}
+
+
+def get_anchors(json_content):
+    """Returns every id and anchor of the resource groups, resources and actions of a navigation model"""
+    anchors = []
+    for resource_group in json_content['resourceGroups']:
+        anchors += [resource_group[key] for key in ('id', 'header_id', 'example_id', 'example_header_id')]
+        for resource in resource_group['resources']:
+            anchors += [resource[key] for key in ('id', 'header_id', 'example_id', 'example_header_id')]
+            for action in resource['actions']:
+                anchors += [action[key] for key in ('id', 'header_id', 'body_id', 'examples_id', 'examples_header_id', 'examples_body_id')]
+
+    return anchors
+
+
+class GetUniqueIdTest(unittest.TestCase):
+
+    def test_suffixes(self):
+        used_ids = set(['room'])
+
+        self.assertEqual(navigation.get_unique_id('room', used_ids), 'room-2')
+        self.assertEqual(navigation.get_unique_id('room', used_ids), 'room-3')
+        self.assertEqual(navigation.get_unique_id('sensor', used_ids), 'sensor')
+        self.assertEqual(used_ids, set(['room', 'room-2', 'room-3', 'sensor']))
+
+    def test_anchors_are_reserved(self):
+        used_ids = set()
+
+        self.assertEqual(navigation.get_unique_id('room', used_ids, ("h-%s", "%s_example")), 'room')
+        self.assertEqual(used_ids, set(['room', 'h-room', 'room_example']))
+        self.assertEqual(navigation.get_unique_id('room_example', used_ids), 'room_example-2')
+
+    def test_ids_whose_anchors_are_used_get_a_suffix(self):
+        used_ids = set(['room_example'])
+
+        self.assertEqual(navigation.get_unique_id('room', used_ids, ("h-%s", "%s_example")), 'room-2')
+
+
+class GenerateNavigationModelTest(unittest.TestCase):
+
+    def test_derived_anchors_never_collide(self):
+        json_content = {'resourceGroups': [{'name': "Rooms", 'resources': [
+            create_resource("foo", [create_action("get"), create_action("get_body")]),
+            create_resource("foo_example", [create_action("get_examples")]),
+        ]}]}
+
+        navigation.generate_navigation_model(json_content)
+
+        anchors = get_anchors(json_content)
+        self.assertEqual(len(anchors), len(set(anchors)))
+        resources = json_content['resourceGroups'][0]['resources']
+        self.assertEqual(resources[0]['example_id'], 'resource_foo_example')
+        self.assertEqual(resources[1]['id'], 'resource_foo_example-2')
+        self.assertEqual(resources[0]['actions'][1]['id'], 'action_get_body-2')
+
+    def test_reserved_ids_and_data_structures(self):
+        json_content = {'data_structures': {'Examples': {'id': 'examples'}},
+                        'resourceGroups': [{'name': "", 'resources': []}]}
+
+        navigation.generate_navigation_model(json_content)
+
+        self.assertEqual(json_content['data_structures']['Examples']['id'], 'examples-2')
+        self.assertEqual(json_content['resourceGroups'][0]['id'], 'default_group')
+
+    def test_table_of_contents(self):
+        json_content = {'resourceGroups': [{'name': "Rooms", 'resources': [
+            create_resource("Room", [create_action("Get a room"), create_action("", 'DELETE', '/rooms/{id}')]),
+        ]}]}
+
+        navigation.generate_navigation_model(json_content)
+
+        [group_node] = json_content['api_toc']
+        self.assertEqual((group_node['id'], group_node['title']), ('resource_group_rooms', "Group Rooms"))
+        [resource_node] = group_node['children']
+        self.assertEqual((resource_node['id'], resource_node['title']), ('resource_room', "Resource Room"))
+        self.assertEqual([(node['id'], node['title']) for node in resource_node['children']],
+                         [('action_get-a-room', "GET - Get a room"), ('action_roomsid', "DELETE - /rooms/{id}")])
+
+    def test_apiary_links(self):
+        json_content = {'metadata': [{'name': "APIARY_PROJECT", 'value': "rooms"}],
+                        'resourceGroups': [{'name': "Rooms", 'resources': [create_resource("Room", [create_action("Get a room")])]}]}
+
+        navigation.generate_navigation_model(json_content)
+
+        action = json_content['resourceGroups'][0]['resources'][0]['actions'][0]
+        self.assertEqual(action['apiary_link'], "http://docs.rooms.apiary.io/#reference/rooms/room/get-a-room")
+
+
+if __name__ == '__main__':
+    unittest.main()
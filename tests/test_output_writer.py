@@ -0,0 +1,194 @@
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+
+from fiware_api_blueprint_renderer.src import output_writer
+
+
+def get_file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+class WriteFileAtomicallyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def test_file_mode_follows_the_umask(self):
+        path = os.path.join(self.dir_path, 'page.html')
+        output_writer.write_file_atomically(path, 'content')
+
+        self.assertEqual(get_file_mode(path), 0644 & ~output_writer.PROCESS_UMASK)
+
+    def test_concurrent_writes_keep_the_umask_of_other_threads(self):
+        umask = os.umask(output_writer.PROCESS_UMASK)
+        os.umask(umask)
+
+        def write_files(thread_index):
+            for file_index in range(50):
+                output_writer.write_file_atomically(os.path.join(self.dir_path, 'atomic-%d-%d' % (thread_index, file_index)), 'content')
+                with open(os.path.join(self.dir_path, 'plain-%d-%d' % (thread_index, file_index)), 'w') as plain_file:
+                    plain_file.write('content')
+
+        threads = [threading.Thread(target=write_files, args=(thread_index,)) for thread_index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for file_name in os.listdir(self.dir_path):
+            expected_mode = (0644 if file_name.startswith('atomic-') else 0666) & ~umask
+            self.assertEqual(get_file_mode(os.path.join(self.dir_path, file_name)), expected_mode, file_name)
+
+    def test_creates_the_directory(self):
+        path = os.path.join(self.dir_path, 'a', 'b', 'page.html')
+        output_writer.write_file_atomically(path, 'content')
+
+        with open(path) as written_file:
+            self.assertEqual(written_file.read(), 'content')
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['page.html'])
+
+
+class OutputWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.writer = output_writer.OutputWriter()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def get_path(self, *names):
+        return os.path.join(self.dir_path, *names)
+
+    def write_existing_file(self, name, content):
+        with open(self.get_path(name), 'wb') as existing_file:
+            existing_file.write(content)
+        # Back in time, so a rewrite would show in the modification time
+        os.utime(self.get_path(name), (1000000000, 1000000000))
+
+    def read_file(self, name):
+        with open(self.get_path(name), 'rb') as written_file:
+            return written_file.read()
+
+    def test_nothing_is_written_before_commit(self):
+        self.writer.write(self.get_path('page.html'), 'content')
+
+        self.assertEqual(os.listdir(self.dir_path), [])
+
+    def test_commit_reports_changed_and_unchanged_files(self):
+        self.write_existing_file('same.html', 'same')
+        self.write_existing_file('changed.html', 'old')
+        self.writer.write(self.get_path('same.html'), 'same')
+        self.writer.write(self.get_path('changed.html'), 'new')
+        self.writer.write(self.get_path('new.html'), 'new')
+
+        stats = self.writer.commit()
+
+        self.assertEqual(stats, {'changed': [self.get_path('changed.html'), self.get_path('new.html')],
+                                 'unchanged': [self.get_path('same.html')], 'removed': []})
+        self.assertEqual(self.read_file('changed.html'), 'new')
+        self.assertEqual(self.read_file('new.html'), 'new')
+
+    def test_unchanged_files_keep_their_modification_time(self):
+        self.write_existing_file('same.html', 'same')
+        self.write_existing_file('changed.html', 'old')
+        self.writer.write(self.get_path('same.html'), 'same')
+        self.writer.write(self.get_path('changed.html'), 'new')
+
+        self.writer.commit()
+
+        self.assertEqual(os.path.getmtime(self.get_path('same.html')), 1000000000)
+        self.assertNotEqual(os.path.getmtime(self.get_path('changed.html')), 1000000000)
+
+    def test_a_file_of_the_same_size_with_another_content_is_changed(self):
+        self.write_existing_file('page.html', 'abc')
+        self.writer.write(self.get_path('page.html'), 'abd')
+
+        self.assertEqual(self.writer.commit()['changed'], [self.get_path('page.html')])
+        self.assertEqual(self.read_file('page.html'), 'abd')
+
+    def test_unicode_content_is_saved_as_utf8(self):
+        self.writer.write(self.get_path('page.html'), u'a\xf1o')
+        self.writer.commit()
+
+        self.assertEqual(self.read_file('page.html'), 'a\xc3\xb1o')
+
+    def test_stale_files_of_managed_directories_are_removed(self):
+        os.makedirs(self.get_path('site', 'css'))
+        self.write_existing_file(os.path.join('site', 'kept.html'), 'kept')
+        self.write_existing_file(os.path.join('site', 'css', 'stale.css'), 'stale')
+        self.write_existing_file('outside.html', 'outside')
+        self.writer.manage_directory(self.get_path('site'))
+        self.writer.write(self.get_path('site', 'kept.html'), 'kept')
+
+        stats = self.writer.commit()
+
+        self.assertEqual(stats['removed'], [self.get_path('site', 'css', 'stale.css')])
+        self.assertEqual(sorted(os.listdir(self.dir_path)), ['outside.html', 'site'])
+        self.assertEqual(os.listdir(self.get_path('site', 'css')), [])
+
+    def test_temporary_files_of_other_builds_are_kept(self):
+        os.makedirs(self.get_path('site'))
+        temp_file_name = '.page.html.x1y2z3' + output_writer.TEMP_FILE_SUFFIX
+        self.write_existing_file(os.path.join('site', temp_file_name), 'partial')
+        self.writer.manage_directory(self.get_path('site'))
+
+        self.assertEqual(self.writer.commit()['removed'], [])
+        self.assertEqual(os.listdir(self.get_path('site')), [temp_file_name])
+
+    def test_copy_stages_the_content_of_a_file(self):
+        self.write_existing_file('logo.png', 'image')
+        self.writer.copy(self.get_path('logo.png'), self.get_path('img', 'logo.png'))
+        self.writer.commit()
+
+        self.assertEqual(self.read_file(os.path.join('img', 'logo.png')), 'image')
+
+    def test_read_returns_the_staged_content_or_the_one_on_disk(self):
+        self.write_existing_file('staged.html', 'old')
+        self.write_existing_file('on-disk.html', 'on disk')
+        self.writer.write(self.get_path('staged.html'), 'staged')
+
+        self.assertEqual(self.writer.read(self.get_path('staged.html')), 'staged')
+        self.assertEqual(self.writer.read(self.get_path('on-disk.html')), 'on disk')
+
+    def test_removed_files_are_not_saved(self):
+        self.writer.write(self.get_path('page.html'), 'content')
+        self.writer.remove(self.get_path('page.html'))
+        self.writer.remove(self.get_path('never-staged.html'))
+
+        self.assertEqual(self.writer.commit(), {'changed': [], 'unchanged': [], 'removed': []})
+        self.assertEqual(os.listdir(self.dir_path), [])
+
+    def test_get_staged_paths_of_a_directory(self):
+        self.writer.write(self.get_path('site', 'page.html'), 'content')
+        self.writer.write(self.get_path('site', 'css', 'page.css'), 'content')
+        self.writer.write(self.get_path('site-2', 'page.html'), 'content')
+
+        self.assertEqual(self.writer.get_staged_paths(self.get_path('site')),
+                         [self.get_path('site', 'page.html'), self.get_path('site', 'css', 'page.css')])
+
+    def test_commit_starts_a_new_build(self):
+        self.writer.write(self.get_path('page.html'), 'content')
+        self.writer.manage_directory(self.dir_path)
+        self.writer.commit()
+
+        self.assertEqual(self.writer.commit(), {'changed': [], 'unchanged': [], 'removed': []})
+        self.assertEqual(os.listdir(self.dir_path), ['page.html'])
+
+
+class FormatOutputSummaryTest(unittest.TestCase):
+
+    def test_summary(self):
+        self.assertEqual(output_writer.format_output_summary({'changed': ['a', 'b'], 'unchanged': ['c'], 'removed': []}),
+                         "2 file(s) written, 1 unchanged, 0 removed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import os
+import StringIO
+import sys
+import unittest
+
+from fiware_api_blueprint_renderer.src import render_batch
+from fiware_api_blueprint_renderer.src import render_queue
+from tests.stand_in_drafter import StandInDrafterTestCase
+from tests.test_renderer import API_SPECIFICATION
+
+
+class RunBatchTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        self.journal_path = os.path.join(self.temp_dir_path, 'journal', 'batch.jsonl')
+        self.dst_dir_path = os.path.join(self.temp_dir_path, 'out')
+        self.saved_stderr = sys.stderr
+        # Failed items print their traceback
+        sys.stderr = StringIO.StringIO()
+
+    def tearDown(self):
+        sys.stderr = self.saved_stderr
+        StandInDrafterTestCase.tearDown(self)
+
+    def write_specification(self, name, title=None):
+        return self.write_file(name + '.apib', API_SPECIFICATION % {'title': title or name})
+
+    def create_jobs(self, names):
+        return [render_queue.create_job(['html'], API_specification_path=os.path.join(self.temp_dir_path, name + '.apib'),
+                                        dst_dir_path=self.dst_dir_path) for name in names]
+
+    def get_statuses(self, records):
+        return sorted((os.path.splitext(os.path.basename(record['input']))[0], record['status']) for record in records)
+
+    def test_resumed_batch_skips_the_items_done(self):
+        for name in ('rooms', 'sensors', 'doors'):
+            self.write_specification(name)
+
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('rooms', 'done'), ('sensors', 'done')], 0))
+        self.assertTrue(os.path.isfile(os.path.join(self.dst_dir_path, 'rooms', 'rooms.html')))
+
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors', 'doors']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('doors', 'done')], 2))
+        self.assertEqual(len(render_batch.read_journal(self.journal_path)), 3)
+
+    def test_resumed_batch_renders_the_failed_items_again(self):
+        self.write_specification('rooms')
+
+        (records, _) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+        self.assertEqual(self.get_statuses(records), [('rooms', 'done'), ('sensors', 'failed')])
+        self.assertIn("IOError", [record for record in records if record['status'] == 'failed'][0]['error'])
+
+        self.write_specification('sensors')
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('sensors', 'done')], 1))
+
+    def test_changed_items_are_rendered_again(self):
+        self.write_specification('rooms')
+        self.write_specification('sensors')
+        render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+
+        self.write_specification('rooms', "Rooms API 2")
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('rooms', 'done')], 1))
+
+    def test_items_listed_twice_are_rendered_once(self):
+        self.write_specification('rooms')
+
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'rooms']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('rooms', 'done')], 1))
+        self.assertEqual(len(render_batch.read_journal(self.journal_path)), 1)
+
+    def test_parallel_batch(self):
+        names = ['rooms-%d' % index for index in range(4)]
+        for name in names:
+            self.write_specification(name)
+
+        (records, _) = render_batch.run_batch(self.create_jobs(names), self.journal_path, 2)
+        self.assertEqual(self.get_statuses(records), [(name, 'done') for name in names])
+        self.assertEqual(self.get_statuses(render_batch.read_journal(self.journal_path)), [(name, 'done') for name in names])
+
+    def test_batch_resumes_after_a_record_cut_short(self):
+        self.write_specification('rooms')
+        self.write_specification('sensors')
+        render_batch.run_batch(self.create_jobs(['rooms']), self.journal_path, 1)
+
+        # A crash while the record of sensors was appended
+        sensors_record = render_batch.get_job_record(self.create_jobs(['sensors'])[0], {})
+        sensors_record['status'] = 'done'
+        with open(self.journal_path, 'a') as journal_file:
+            journal_file.write(json.dumps(sensors_record)[:40])
+
+        (records, skipped_count) = render_batch.run_batch(self.create_jobs(['rooms', 'sensors']), self.journal_path, 1)
+        self.assertEqual((self.get_statuses(records), skipped_count), ([('sensors', 'done')], 1))
+        self.assertEqual(self.get_statuses(render_batch.read_journal(self.journal_path)), [('rooms', 'done'), ('sensors', 'done')])
+
+
+class JournalTest(unittest.TestCase):
+
+    def test_missing_journal_has_no_records(self):
+        self.assertEqual(render_batch.read_journal(os.path.join(os.path.dirname(__file__), 'missing.jsonl')), [])
+
+    def test_last_record_of_an_item_wins(self):
+        records = [{'key': 'a', 'status': 'done'}, {'key': 'b', 'status': 'done'}, {'key': 'b', 'status': 'failed'},
+                   {'key': 'c', 'status': 'failed'}, {'key': 'c', 'status': 'done'}]
+
+        self.assertEqual(render_batch.get_done_keys(records), set(['a', 'c']))
+
+
+if __name__ == '__main__':
+    unittest.main()
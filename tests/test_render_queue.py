@@ -0,0 +1,183 @@
+import json
+import multiprocessing
+import os
+import time
+import unittest
+
+from fiware_api_blueprint_renderer.src import render_queue
+from fiware_api_blueprint_renderer.src import renderer
+from tests.stand_in_drafter import StandInDrafterTestCase
+from tests.test_renderer import API_SPECIFICATION
+
+
+WORKER_COUNT = 4
+
+
+def silence_output():
+    """Sends the output of a worker process to /dev/null, so the tests print nothing"""
+    devnull_fd = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull_fd, 1)
+    os.dup2(devnull_fd, 2)
+    os.close(devnull_fd)
+
+
+def run_worker_process(queue_dir_path, result_dir_path, worker_id, stale_timeout, max_attempts):
+    silence_output()
+    render_queue.run_worker(queue_dir_path, result_dir_path, worker_id, heartbeat_interval=1, stale_timeout=stale_timeout,
+                            poll_interval=0.1, max_attempts=max_attempts, drain=True)
+
+
+def claim_jobs_process(queue_dir_path, worker_id, claimed_ids_path):
+    """Claims jobs until the queue is empty, writing the ids of the jobs claimed"""
+    claimed_ids = []
+    while True:
+        claimed_job = render_queue.claim_job(queue_dir_path, worker_id)
+        if claimed_job is None:
+            break
+        claimed_ids.append(claimed_job[0])
+
+    with open(claimed_ids_path, 'w') as claimed_ids_file:
+        json.dump(claimed_ids, claimed_ids_file)
+
+
+class RenderQueueTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        self.queue_dir_path = os.path.join(self.temp_dir_path, 'queue')
+        self.result_dir_path = os.path.join(self.temp_dir_path, 'results')
+
+    def enqueue_jobs(self, count, attempts=0):
+        job_ids = []
+        for index in range(count):
+            API_specification_path = self.write_file('rooms-%d.apib' % index, API_SPECIFICATION % {'title': "Rooms API %d" % index})
+            job = render_queue.create_job(['html'], API_specification_path=API_specification_path)
+            job['attempts'] = attempts
+            job_ids.append(render_queue.enqueue_job(self.queue_dir_path, job))
+
+        return job_ids
+
+    def run_worker_processes(self, worker_count, stale_timeout=render_queue.DEFAULT_STALE_TIMEOUT, max_attempts=render_queue.DEFAULT_MAX_ATTEMPTS):
+        workers = [multiprocessing.Process(target=run_worker_process, args=(self.queue_dir_path, self.result_dir_path, 'worker-%d' % index,
+                                                                            stale_timeout, max_attempts))
+                   for index in range(worker_count)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+    def read_results(self):
+        results = {}
+        for file_name in os.listdir(self.result_dir_path):
+            if file_name.endswith('.json'):
+                with open(os.path.join(self.result_dir_path, file_name)) as result_file:
+                    result = json.load(result_file)
+                results[result['job']] = result
+
+        return results
+
+    def list_jobs(self, dir_name):
+        return [render_queue.get_job_id(file_name) for file_name in
+                render_queue.list_job_file_names(os.path.join(self.queue_dir_path, dir_name))]
+
+    def age_file(self, path, seconds):
+        mtime = time.time() - seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_concurrent_claims_are_exclusive(self):
+        job_ids = self.enqueue_jobs(40)
+        claimed_ids_paths = [os.path.join(self.temp_dir_path, 'claimed-%d.json' % index) for index in range(WORKER_COUNT)]
+        workers = [multiprocessing.Process(target=claim_jobs_process, args=(self.queue_dir_path, 'worker-%d' % index, claimed_ids_path))
+                   for (index, claimed_ids_path) in enumerate(claimed_ids_paths)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+
+        claimed_ids = []
+        for claimed_ids_path in claimed_ids_paths:
+            with open(claimed_ids_path) as claimed_ids_file:
+                claimed_ids += json.load(claimed_ids_file)
+        self.assertEqual(sorted(claimed_ids), sorted(job_ids))
+
+    def test_workers_render_every_job_once(self):
+        job_ids = self.enqueue_jobs(8)
+        self.run_worker_processes(WORKER_COUNT)
+
+        results = self.read_results()
+        self.assertEqual(sorted(results), sorted(job_ids))
+        for result in results.values():
+            self.assertEqual((result['status'], result['attempt']), ('done', 1))
+            self.assertIn(result['job'].split('-', 1)[1].rsplit('-', 1)[0] + '.html', os.listdir(result['output']))
+        self.assertEqual(sorted(self.list_jobs(render_queue.DONE_DIR_NAME)), sorted(job_ids))
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir_path, render_queue.CLAIMED_DIR_NAME)), [])
+        self.assertEqual(os.listdir(renderer.DEFAULT_TEMP_DIR_PATH), [])
+
+    def test_jobs_of_dead_workers_are_reclaimed(self):
+        job_ids = self.enqueue_jobs(3)
+        for _ in range(2):
+            (job_id, claimed_job_path) = render_queue.claim_job(self.queue_dir_path, 'dead-worker')
+            self.age_file(claimed_job_path, 600)
+
+        self.run_worker_processes(2, stale_timeout=30)
+
+        results = self.read_results()
+        self.assertEqual(sorted(results), sorted(job_ids))
+        self.assertEqual(set(result['status'] for result in results.values()), set(['done']))
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir_path, render_queue.CLAIMED_DIR_NAME)), [])
+
+    def test_jobs_are_failed_after_max_attempts(self):
+        [abandoned_job_id] = self.enqueue_jobs(1, attempts=2)
+        self.run_worker_processes(2, max_attempts=2)
+
+        result = self.read_results()[abandoned_job_id]
+        self.assertEqual((result['status'], result['attempt']), ('failed', 3))
+        self.assertIn("Abandoned after 2 attempts", result['error'])
+        self.assertEqual(self.list_jobs(render_queue.FAILED_DIR_NAME), [abandoned_job_id])
+
+    def test_a_job_that_waited_long_is_not_stale_once_claimed(self):
+        [job_id] = self.enqueue_jobs(1)
+        self.age_file(os.path.join(self.queue_dir_path, render_queue.PENDING_DIR_NAME, job_id + render_queue.JOB_FILE_EXTENSION), 600)
+
+        (_, claimed_job_path) = render_queue.claim_job(self.queue_dir_path, 'worker')
+
+        self.assertEqual(render_queue.reclaim_stale_jobs(self.queue_dir_path, 60), [])
+        self.assertTrue(os.path.isfile(claimed_job_path))
+
+    def test_a_reclaimed_job_is_not_run(self):
+        [job_id] = self.enqueue_jobs(1)
+        (_, claimed_job_path) = render_queue.claim_job(self.queue_dir_path, 'worker')
+        self.age_file(claimed_job_path, 600)
+        self.assertEqual(render_queue.reclaim_stale_jobs(self.queue_dir_path, 60), [job_id])
+
+        self.assertIsNone(render_queue.run_job(self.queue_dir_path, self.result_dir_path, 'worker', job_id, claimed_job_path, 1,
+                                               render_queue.DEFAULT_MAX_ATTEMPTS))
+        self.assertEqual(self.list_jobs(render_queue.PENDING_DIR_NAME), [job_id])
+
+    def test_a_job_reclaimed_while_read_is_not_run(self):
+        [job_id] = self.enqueue_jobs(1)
+        (_, claimed_job_path) = render_queue.claim_job(self.queue_dir_path, 'worker')
+        saved_load = json.load
+
+        def load(job_file, **kwargs):
+            # Another worker reclaims the job right after it is read
+            job = saved_load(job_file, **kwargs)
+            self.age_file(claimed_job_path, 600)
+            self.assertEqual(render_queue.reclaim_stale_jobs(self.queue_dir_path, 60), [job_id])
+            return job
+
+        json.load = load
+        try:
+            self.assertIsNone(render_queue.run_job(self.queue_dir_path, self.result_dir_path, 'worker', job_id, claimed_job_path, 1,
+                                                   render_queue.DEFAULT_MAX_ATTEMPTS))
+        finally:
+            json.load = saved_load
+
+        self.assertEqual(self.list_jobs(render_queue.PENDING_DIR_NAME), [job_id])
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir_path, render_queue.CLAIMED_DIR_NAME)), [])
+        self.assertFalse(os.path.exists(self.result_dir_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
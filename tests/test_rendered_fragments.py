@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from jinja2 import DictLoader, Environment
+
+from fiware_api_blueprint_renderer.src import rendered_fragments
+
+
+TEMPLATES = {
+    'page.tpl': '{% for group in groups %}{{ cached_fragment("fragments/group.tpl", {"group": group}, {"data_structures": data_structures}) }}{% endfor %}',
+    'fragments/group.tpl': '{% from "fragments/macros.tpl" import title %}{{ title(group.name) }}: {{ data_structures[group.attributes].type }}<br>',
+    'fragments/macros.tpl': '{% macro title(name) %}<h2>{{ name }}</h2>{% endmacro %}',
+    'fragments/unrelated.tpl': 'unrelated',
+}
+
+
+def get_lookup_tables():
+    return {
+        'data_structures': {'Room': {'type': 'object'}, 'Sensor': {'type': 'array'}},
+        'blocks': {'a1b2': '<pre>{"id": "Room1"}</pre>', 'c3d4': '<pre>{"id": "Sensor1"}</pre>'},
+    }
+
+
+class FragmentKeyTest(unittest.TestCase):
+
+    NODE_CONTEXT = {'resourceGroup': {'name': "Rooms", 'attributes': 'Room', 'body': {'block': 'a1b2'}}}
+
+    def get_key(self, lookup_tables, template_hash='template'):
+        return rendered_fragments.get_fragment_key(template_hash, self.NODE_CONTEXT, lookup_tables)
+
+    def test_editing_a_referenced_entry_changes_the_key(self):
+        key = self.get_key(get_lookup_tables())
+
+        lookup_tables = get_lookup_tables()
+        lookup_tables['data_structures']['Room']['type'] = 'array'
+        self.assertNotEqual(self.get_key(lookup_tables), key)
+
+        lookup_tables = get_lookup_tables()
+        lookup_tables['blocks']['a1b2'] = '<pre>{"id": "Room2"}</pre>'
+        self.assertNotEqual(self.get_key(lookup_tables), key)
+
+    def test_editing_an_unreferenced_entry_keeps_the_key(self):
+        key = self.get_key(get_lookup_tables())
+
+        lookup_tables = get_lookup_tables()
+        lookup_tables['data_structures']['Sensor']['type'] = 'object'
+        lookup_tables['blocks']['c3d4'] = ''
+        lookup_tables['data_structures']['Door'] = {'type': 'object'}
+        self.assertEqual(self.get_key(lookup_tables), key)
+
+    def test_editing_the_template_changes_the_key(self):
+        self.assertNotEqual(self.get_key(get_lookup_tables(), 'other template'), self.get_key(get_lookup_tables()))
+
+
+class TemplateHashTest(unittest.TestCase):
+
+    def get_template_hash(self, templates, template_name='fragments/group.tpl'):
+        return rendered_fragments.get_template_hash(Environment(loader=DictLoader(templates)), template_name)
+
+    def test_editing_an_included_template_changes_the_hash(self):
+        template_hash = self.get_template_hash(TEMPLATES)
+
+        self.assertNotEqual(self.get_template_hash(dict(TEMPLATES, **{'fragments/macros.tpl': '{% macro title(name) %}<h3>{{ name }}</h3>{% endmacro %}'})),
+                            template_hash)
+        self.assertNotEqual(self.get_template_hash(dict(TEMPLATES, **{'fragments/group.tpl': TEMPLATES['fragments/group.tpl'] + ' '})),
+                            template_hash)
+
+    def test_editing_another_template_keeps_the_hash(self):
+        self.assertEqual(self.get_template_hash(dict(TEMPLATES, **{'fragments/unrelated.tpl': 'edited'})), self.get_template_hash(TEMPLATES))
+
+    def test_templates_included_by_a_computed_name_can_be_any_template(self):
+        templates = dict(TEMPLATES, **{'fragments/group.tpl': '{% include name + ".tpl" %}'})
+
+        self.assertNotEqual(self.get_template_hash(dict(templates, **{'fragments/unrelated.tpl': 'edited'})), self.get_template_hash(templates))
+
+
+class FragmentCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir_path)
+
+    def get_keys(self):
+        return sorted(os.path.splitext(file_name)[0] for file_name in os.listdir(self.cache_dir_path))
+
+    def test_get_and_put(self):
+        fragment_cache = rendered_fragments.FragmentCache(self.cache_dir_path)
+
+        self.assertIsNone(fragment_cache.get('a'))
+        fragment_cache.put('a', u'<h2>Habitaci\xf3n</h2>')
+        self.assertEqual(fragment_cache.get('a'), u'<h2>Habitaci\xf3n</h2>')
+        self.assertEqual((fragment_cache.hits, fragment_cache.misses), (1, 1))
+
+    def test_least_recently_used_fragments_are_evicted(self):
+        fragment_cache = rendered_fragments.FragmentCache(self.cache_dir_path, max_size=1000)
+        keys = ['fragment-%02d' % index for index in range(11)]
+        for (index, key) in enumerate(keys[:10]):
+            fragment_cache.put(key, u'x' * 100)
+            os.utime(fragment_cache.get_path(key), (1000 + index, 1000 + index))
+        self.assertEqual((len(self.get_keys()), fragment_cache.evictions), (10, 0))
+
+        # A hit makes the oldest fragment the most recently used one
+        fragment_cache.get(keys[0])
+        fragment_cache.put(keys[10], u'x' * 100)
+
+        self.assertEqual(self.get_keys(), [keys[0]] + keys[5:])
+        self.assertEqual(fragment_cache.evictions, 4)
+        self.assertEqual(fragment_cache.size, 1000 * rendered_fragments.EVICTION_RATIO - 50)
+
+
+class CachedFragmentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir_path)
+
+    def render(self, fragment_cache, data_structures):
+        environment = Environment(loader=DictLoader(TEMPLATES))
+        rendered_fragments.add_cached_fragment_function(environment, fragment_cache)
+
+        groups = [{'name': "Rooms", 'attributes': 'Room'}, {'name': "Sensors", 'attributes': 'Sensor'}]
+        return environment.get_template('page.tpl').render({'groups': groups, 'data_structures': data_structures})
+
+    def test_fragments_are_reused(self):
+        fragment_cache = rendered_fragments.FragmentCache(self.cache_dir_path)
+        data_structures = get_lookup_tables()['data_structures']
+        page = self.render(fragment_cache, data_structures)
+
+        self.assertEqual(page, '<h2>Rooms</h2>: object<br><h2>Sensors</h2>: array<br>')
+        self.assertEqual(page, self.render(None, data_structures))
+        self.assertEqual(self.render(fragment_cache, data_structures), page)
+        self.assertEqual((fragment_cache.hits, fragment_cache.misses), (2, 2))
+
+        data_structures['Sensor']['type'] = 'object'
+        self.assertEqual(self.render(fragment_cache, data_structures), '<h2>Rooms</h2>: object<br><h2>Sensors</h2>: object<br>')
+        self.assertEqual((fragment_cache.hits, fragment_cache.misses), (3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
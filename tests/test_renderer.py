@@ -0,0 +1,250 @@
+import json
+import multiprocessing
+import os
+import stat
+import threading
+import unittest
+
+from fiware_api_blueprint_renderer.src import markdown_batch
+from fiware_api_blueprint_renderer.src import renderer
+from tests.stand_in_drafter import StandInDrafterTestCase
+
+
+API_SPECIFICATION = """FORMAT: 1A
+HOST: http://example.com
+
+# %(title)s
+
+Rooms of a building.
+
+# Group Rooms
+
+## Room [/rooms/{id}]
+
+### Get a room [GET]
+
++ Response 200 (application/json)
+
+        {"id": "Room1", "temperature": 23}
+"""
+
+# Stand-in for wkhtmltopdf, saving the pages it is given one after another as the pdf
+STAND_IN_WKHTMLTOPDF = """#!/bin/sh
+for arg; do dst="$arg"; done
+: > "$dst"
+for arg; do
+    case "$arg" in file://*) cat "${arg#file://}" >> "$dst";; esac
+done
+"""
+
+TEMPLATES = {'html': renderer.DEFAULT_TEMPLATE_PATH, 'pdf': renderer.DEFAULT_PDF_TEMPLATE_PATH, 'cover': renderer.DEFAULT_COVER_TEMPLATE_PATH}
+
+
+class BlockStoreTest(unittest.TestCase):
+
+    def test_identical_blocks_are_stored_once(self):
+        blocks = {}
+        body = u'<rooms>%s</rooms>' % (u'<room id="Room1"/>' * 20)
+        self.assertTrue(len(body) >= renderer.MIN_SHARED_BLOCK_LENGTH)
+
+        (block_id, use) = renderer.add_block_to_store(blocks, body, 'xml', "Response 200 of GET Get a room")
+        self.assertEqual(use, 'anchor')
+        self.assertEqual(renderer.add_block_to_store(blocks, body, 'xml', "Response 200 of GET List the rooms"), (block_id, 'reference'))
+        self.assertNotEqual(renderer.add_block_to_store(blocks, body, 'json', "Response 200 of GET List the rooms")[0], block_id)
+
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(blocks[block_id]['title'], "Response 200 of GET Get a room")
+        self.assertNotIn(u'<room', blocks[block_id]['html'])
+
+    def test_short_blocks_stay_inline(self):
+        blocks = {}
+        body = u'{"id": "Room1"}'
+
+        (block_id, use) = renderer.add_block_to_store(blocks, body, 'json', "Response 200 of GET Get a room")
+        self.assertEqual(use, 'inline')
+        self.assertEqual(renderer.add_block_to_store(blocks, body, 'json', "Response 200 of GET List the rooms"), (block_id, 'inline'))
+        self.assertEqual(blocks.keys(), [block_id])
+
+
+class TemporaryDirectoryTest(StandInDrafterTestCase):
+
+    def test_temporary_files_are_removed(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': "Rooms API"})
+        renderer.render_api_specification_formats(API_specification_path, ['html'], TEMPLATES, os.path.join(self.temp_dir_path, 'out'))
+
+        self.assertEqual(os.listdir(renderer.DEFAULT_TEMP_DIR_PATH), [])
+
+    def test_temporary_files_are_kept_in_a_directory_of_their_own(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': "Rooms API"})
+        renderer.render_api_specification_formats(API_specification_path, ['html'], TEMPLATES, os.path.join(self.temp_dir_path, 'out'),
+                                                  clear_temporal_dir=False)
+
+        [temp_dir_name] = os.listdir(renderer.DEFAULT_TEMP_DIR_PATH)
+        self.assertEqual(sorted(os.listdir(os.path.join(renderer.DEFAULT_TEMP_DIR_PATH, temp_dir_name))),
+                         ['rooms.apib', 'rooms.extras', 'rooms.json'])
+
+    def test_concurrent_builds_of_specifications_with_the_same_name(self):
+        titles = ["Rooms API %d" % index for index in range(4)]
+        API_specification_paths = [self.write_file(os.path.join(title, 'rooms.apib'), API_SPECIFICATION % {'title': title}) for title in titles]
+        errors = []
+
+        def build(API_specification_path, title):
+            try:
+                json_content = renderer.generate_api_specification_context(API_specification_path, renderer.create_temp_directory())
+                self.assertEqual(json_content['name'], title)
+            except Exception, e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=build, args=build_args) for build_args in zip(API_specification_paths, titles)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(os.listdir(renderer.DEFAULT_TEMP_DIR_PATH)), len(titles))
+
+
+class LibraryTest(StandInDrafterTestCase):
+
+    def test_render_from_several_threads(self):
+        pages = {}
+
+        def render(title):
+            pages[title] = renderer.render_api_specification_to_string(API_SPECIFICATION % {'title': title})
+
+        threads = [threading.Thread(target=render, args=("Rooms API %d" % index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(pages), 4)
+        for (title, page) in pages.iteritems():
+            self.assertIn(title, page)
+            self.assertIn("Get a room", page)
+        self.assertFalse(os.path.exists(renderer.DEFAULT_TEMP_DIR_PATH))
+
+    def test_markdown_of_large_specifications_is_converted_without_a_pool(self):
+        API_specification = API_SPECIFICATION.replace("Rooms of a building.", "Rooms of a *building*.\n\n" * 6000) % {'title': "Rooms API"}
+        saved_pool = multiprocessing.Pool
+        saved_default_jobs = markdown_batch.default_jobs
+
+        def fail_pool(*args, **kwargs):
+            raise AssertionError("A pool was started")
+
+        multiprocessing.Pool = fail_pool
+        markdown_batch.default_jobs = 2
+        try:
+            page = renderer.render_api_specification_to_string(API_specification)
+        finally:
+            multiprocessing.Pool = saved_pool
+            markdown_batch.default_jobs = saved_default_jobs
+
+        self.assertEqual(page.count("<em>building</em>"), 6000)
+
+
+class CompiledContextTest(StandInDrafterTestCase):
+
+    def read_files(self, dir_path):
+        files = {}
+        for (path, _, file_names) in os.walk(dir_path):
+            for file_name in file_names:
+                with open(os.path.join(path, file_name), 'rb') as rendered_file:
+                    files[os.path.relpath(os.path.join(path, file_name), dir_path)] = rendered_file.read()
+
+        return files
+
+    def test_compiled_context_renders_the_same_html(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': u"Habitaciones API".encode('utf-8')})
+        rendered_dir_path = os.path.join(self.temp_dir_path, 'rendered')
+        compiled_dir_path = os.path.join(self.temp_dir_path, 'compiled')
+        renderer.render_api_specification_formats(API_specification_path, ['html'], TEMPLATES, rendered_dir_path)
+        renderer.compile_api_specification(API_specification_path, compiled_dir_path)
+        renderer.render_compiled_context(os.path.join(compiled_dir_path, 'rooms.json'), ['html'], TEMPLATES, compiled_dir_path)
+
+        compiled_files = self.read_files(compiled_dir_path)
+        del compiled_files['rooms.json']
+        self.assertIn('rooms.html', compiled_files)
+        self.assertEqual(compiled_files, self.read_files(rendered_dir_path))
+
+    def test_compiled_context_of_another_version_is_rejected(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': "Rooms API"})
+        compiled_context_path = os.path.join(self.temp_dir_path, 'rooms.json')
+        renderer.compile_api_specification(API_specification_path, compiled_context_path)
+        with open(compiled_context_path) as compiled_context_file:
+            compiled_context = json.load(compiled_context_file)
+
+        compiled_context['fabre_context_version'] = renderer.COMPILED_CONTEXT_VERSION - 1
+        self.write_file('old.json', json.dumps(compiled_context))
+        del compiled_context['fabre_context_version']
+        self.write_file('unversioned.json', json.dumps(compiled_context))
+
+        for file_name in ('old.json', 'unversioned.json'):
+            self.assertRaises(ValueError, renderer.render_compiled_context, os.path.join(self.temp_dir_path, file_name), ['html'], TEMPLATES,
+                              os.path.join(self.temp_dir_path, 'out'))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir_path, 'out', 'rooms.html')))
+
+
+class PdfTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        wkhtmltopdf_path = self.write_file(os.path.join('bin', 'wkhtmltopdf'), STAND_IN_WKHTMLTOPDF)
+        os.chmod(wkhtmltopdf_path, os.stat(wkhtmltopdf_path).st_mode | stat.S_IXUSR)
+
+    def test_concurrent_pdfs_of_specifications_with_the_same_name(self):
+        titles = ["Rooms API %d" % index for index in range(4)]
+        API_specification_paths = [self.write_file(os.path.join(title, 'rooms.apib'), API_SPECIFICATION % {'title': title}) for title in titles]
+        dst_pdf_paths = [os.path.join(self.temp_dir_path, 'out', '%d.pdf' % index) for index in range(len(titles))]
+
+        threads = [threading.Thread(target=renderer.render_api_specification_formats, args=(API_specification_path, ['pdf'], TEMPLATES, dst_pdf_path))
+                   for (API_specification_path, dst_pdf_path) in zip(API_specification_paths, dst_pdf_paths)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for (title, dst_pdf_path) in zip(titles, dst_pdf_paths):
+            with open(dst_pdf_path) as pdf_file:
+                pdf = pdf_file.read()
+            self.assertIn(title, pdf)
+            for other_title in titles:
+                if other_title != title:
+                    self.assertNotIn(other_title, pdf)
+        self.assertEqual(os.listdir(renderer.DEFAULT_TEMP_DIR_PATH), [])
+
+    def test_several_formats_from_one_parse(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': "Rooms API"})
+        dst_dir_path = os.path.join(self.temp_dir_path, 'out')
+        saved_parser_api_blueprint = renderer.parser_api_blueprint
+        parsed_API_blueprints = []
+
+        def parser_api_blueprint(API_blueprint):
+            parsed_API_blueprints.append(API_blueprint)
+            return saved_parser_api_blueprint(API_blueprint)
+
+        renderer.parser_api_blueprint = parser_api_blueprint
+        try:
+            renderer.render_api_specification_formats(API_specification_path, ['html', 'pdf', 'json'], TEMPLATES, dst_dir_path)
+        finally:
+            renderer.parser_api_blueprint = saved_parser_api_blueprint
+
+        self.assertEqual(len(parsed_API_blueprints), 1)
+        with open(os.path.join(dst_dir_path, 'rooms.html')) as html_file:
+            self.assertIn("Get a room", html_file.read())
+        with open(os.path.join(dst_dir_path, 'rooms.pdf')) as pdf_file:
+            self.assertIn("Get a room", pdf_file.read())
+        (json_content, API_specification_file_name) = renderer.load_compiled_context(os.path.join(dst_dir_path, 'rooms.json'))
+        self.assertEqual((json_content['name'], API_specification_file_name), ("Rooms API", 'rooms'))
+
+    def test_pdf_path_as_destination(self):
+        API_specification_path = self.write_file('rooms.apib', API_SPECIFICATION % {'title': "Rooms API"})
+        dst_pdf_path = os.path.join(self.temp_dir_path, 'out', 'rooms-api.pdf')
+        renderer.render_api_specification_formats(API_specification_path, ['pdf'], TEMPLATES, dst_pdf_path)
+
+        self.assertEqual(os.listdir(os.path.dirname(dst_pdf_path)), ['rooms-api.pdf'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import unittest
+
+from fiware_api_blueprint_renderer.src import renderer
+from fiware_api_blueprint_renderer.src import search_index
+
+
+SEARCH_SCRIPT_PATH = os.path.join(renderer.DEFAULT_THEME_DIR_PATH, 'js', 'search.js')
+
+
+def get_search_script_query_pattern():
+    """Returns the pattern search.js splits the queries with, as a Python pattern"""
+    with open(SEARCH_SCRIPT_PATH) as search_script_file:
+        match = re.search(r'query\.toLowerCase\(\)\.match\(/(.*)/g\)', search_script_file.read())
+
+    return match.group(1).replace('\\/', '/')
+
+
+class TokenizeTest(unittest.TestCase):
+
+    def test_identifiers_are_indexed_whole_and_by_parts(self):
+        self.assertEqual(search_index.tokenize(u"question_id"), set([u"question_id", u"question", u"id"]))
+
+    def test_uri_templates_are_split_on_punctuation(self):
+        self.assertEqual(search_index.tokenize(u"/v2/entities/{entityId}/attrs?type=Room"),
+                         set([u"v2", u"entities", u"entityid", u"attrs", u"type", u"room"]))
+
+    def test_non_ascii_words_are_kept_whole(self):
+        self.assertEqual(search_index.tokenize(u"Año de creación"), set([u"año", u"de", u"creación"]))
+
+    def test_empty_text(self):
+        self.assertEqual(search_index.tokenize(None), set())
+        self.assertEqual(search_index.tokenize(u""), set())
+
+    def test_queries_are_split_like_the_indexed_texts(self):
+        self.assertEqual(get_search_script_query_pattern(), search_index.word_regex.pattern)
+
+
+class GenerateSearchIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        action = {'id': 'list_entities', 'name': u"List entities", 'method': 'GET',
+                  'attributes': {'uriTemplate': u"/v2/entities{?limit}"}, 'parameters': [{'name': u"limit"}]}
+        resource = {'id': 'entities', 'name': u"Entities", 'uriTemplate': u"/v2/entities",
+                    'parameters': [], 'actions': [action]}
+        self.json_content = {
+            'resourceGroups': [{'id': 'group_entities', 'name': u"Entities", 'resources': [resource]}],
+            'data_structures': {u"Año": {'id': 'ano', 'attributes': [
+                {'name': u"número", 'subproperties': [{'name': u"dígito", 'subproperties': []}]}]}}
+        }
+
+    def get_documents(self, index, term):
+        return [index['docs'][doc_index][0] for doc_index in index['terms'].get(term, [])]
+
+    def test_documents(self):
+        index = search_index.generate_search_index(self.json_content)
+
+        self.assertEqual(index['version'], search_index.SEARCH_INDEX_VERSION)
+        self.assertEqual([doc[2] for doc in index['docs']], ['group', 'resource', 'action', 'payload'])
+        self.assertEqual(self.get_documents(index, u"entities"), ['group_entities', 'entities', 'list_entities'])
+        self.assertEqual(self.get_documents(index, u"limit"), ['list_entities'])
+
+    def test_nested_attributes_are_indexed(self):
+        index = search_index.generate_search_index(self.json_content)
+
+        self.assertEqual(self.get_documents(index, u"año"), ['ano'])
+        self.assertEqual(self.get_documents(index, u"dígito"), ['ano'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+import json
+import os
+import unittest
+
+from fiware_api_blueprint_renderer.src import renderer
+from fiware_api_blueprint_renderer.src import site_builder
+from tests.stand_in_drafter import StandInDrafterTestCase
+
+
+API_SPECIFICATION = """FORMAT: 1A
+HOST: http://example.com
+TITLE: %(title)s
+VERSION: %(version)s
+DATE: %(date)s
+
+# %(title)s
+
+%(description)s
+
+## Status
+
+Draft, <em>do not</em> use.
+
+# Group %(name)ss
+
+## %(name)s [/%(path)s/{id}]
+
+### Get a %(path)s [GET]
+
++ Response 200 (application/json)
+
+        {"id": "%(name)s1"}
+"""
+
+
+def get_anchor_map_by_file():
+    anchor_map = OrderedDict()
+    anchor_map['rooms'] = {'file': 'rooms.apib', 'page': 'rooms.html', 'anchors': {'resource_room': "Room"}}
+    anchor_map['rooms-2'] = {'file': 'rooms.apib', 'page': 'rooms-2.html', 'anchors': {'resource_room-2': "Room"}}
+    anchor_map['sensors'] = {'file': 'sensors.apib', 'page': 'sensors.html', 'anchors': {'resource_sensor': "Sensor"}}
+
+    return site_builder.get_anchor_map_by_file(anchor_map)
+
+
+class RewriteCrossSpecLinksTest(unittest.TestCase):
+
+    def rewrite(self, value):
+        warnings = []
+        return (site_builder.rewrite_cross_spec_links(value, get_anchor_map_by_file(), warnings), warnings)
+
+    def test_links_to_specifications_of_the_site(self):
+        html = ('<a href="sensors.apib#resource_sensor">sensor</a> <a href=\'../specs/sensors.apib\'>sensors</a> '
+                '<a href="https://example.com/sensors.apib#resource_sensor">remote</a>')
+
+        self.assertEqual(self.rewrite(html),
+                         ('<a href="sensors.html#resource_sensor">sensor</a> <a href=\'sensors.html\'>sensors</a> '
+                          '<a href="sensors.html#resource_sensor">remote</a>', []))
+
+    def test_links_to_specifications_not_in_the_site(self):
+        html = '<a href="doors.apib#resource_door">door</a> <a href="sensors.apib#resource_door">door</a>'
+
+        self.assertEqual(self.rewrite(html), ('<a href="doors.apib#resource_door">door</a> <a href="sensors.html#resource_door">door</a>',
+                                              [u"link to a specification not in the site: doors.apib",
+                                               u"link to an unknown anchor of sensors.apib: #resource_door"]))
+
+    def test_specifications_sharing_their_file_name(self):
+        # Links to the name point to the first specification with it
+        self.assertEqual(self.rewrite('<a href="other/rooms.apib#resource_room">room</a>'), ('<a href="rooms.html#resource_room">room</a>', []))
+
+    def test_every_string_of_the_context_is_rewritten(self):
+        context = OrderedDict([('description', '<a href="sensors.apib">sensors</a>'),
+                               ('resources', [{'description': '<a href="sensors.apib">sensors</a>', 'count': 1}]),
+                               ('file', 'sensors.apib'), ('empty', None)])
+        (rewritten_context, warnings) = self.rewrite(context)
+
+        self.assertIsInstance(rewritten_context, OrderedDict)
+        self.assertEqual(rewritten_context, OrderedDict([('description', '<a href="sensors.html">sensors</a>'),
+                                                         ('resources', [{'description': '<a href="sensors.html">sensors</a>', 'count': 1}]),
+                                                         ('file', 'sensors.apib'), ('empty', None)]))
+        self.assertEqual(context['description'], '<a href="sensors.apib">sensors</a>')
+
+
+class GetSpecificationSummaryTest(unittest.TestCase):
+
+    def test_summary_fields(self):
+        json_content = {'name': "Rooms", 'metadata': [{'name': 'TITLE', 'value': "Rooms API"}, {'name': 'VERSION', 'value': "1.0"},
+                                                      {'name': 'DATE', 'value': "1 May 2016"}],
+                        'api_metadata': {'subsections': [{'name': "Editors", 'body': "<p>Jane</p>", 'subsections': [
+                            {'name': "Status of this document", 'body': "<p>Final,\n<em>stable</em></p>", 'subsections': []}]}]}}
+
+        self.assertEqual(site_builder.get_specification_summary(json_content, 'rooms'),
+                         {'page': 'rooms.html', 'title': "Rooms API", 'version': "1.0", 'date': "1 May 2016", 'status': "Final, stable"})
+
+    def test_missing_fields(self):
+        self.assertEqual(site_builder.get_specification_summary({'name': "Rooms"}, 'rooms'),
+                         {'page': 'rooms.html', 'title': "Rooms", 'version': None, 'date': None, 'status': None})
+
+
+class RenderSiteTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        self.dst_dir_path = os.path.join(self.temp_dir_path, 'site')
+
+    def write_specification(self, path, name, version, description="Things of a building."):
+        return self.write_file(path, API_SPECIFICATION % {'title': name + "s API", 'version': version, 'date': "1 May 2016", 'name': name,
+                                                          'path': name.lower() + 's', 'description': description})
+
+    def read_page(self, page_name):
+        with open(os.path.join(self.dst_dir_path, page_name)) as page_file:
+            return page_file.read().decode('utf-8')
+
+    def test_site(self):
+        API_specification_paths = [self.write_specification(os.path.join('a', 'rooms.apib'), "Room", "1.0"),
+                                   self.write_specification(os.path.join('b', 'rooms.apib'), "Door", "2.0"),
+                                   self.write_specification('sensors.apib', "Sensor", "3.0",
+                                                            "See [the rooms](a/rooms.apib#resource_room) and [the windows](windows.apib).")]
+
+        (summaries, warnings, _) = site_builder.render_site(API_specification_paths, renderer.DEFAULT_TEMPLATE_PATH,
+                                                            site_builder.DEFAULT_SITE_INDEX_TEMPLATE_PATH, self.dst_dir_path, jobs=1)
+
+        # Specifications with the same file name get pages of their own
+        self.assertEqual([(summary['page'], summary['title'], summary['version'], summary['date'], summary['status']) for summary in summaries],
+                         [('rooms.html', "Rooms API", "1.0", "1 May 2016", "Draft, do not use."),
+                          ('rooms-2.html', "Doors API", "2.0", "1 May 2016", "Draft, do not use."),
+                          ('sensors.html', "Sensors API", "3.0", "1 May 2016", "Draft, do not use.")])
+        self.assertIn("Get a door", self.read_page('rooms-2.html'))
+
+        sensors_page = self.read_page('sensors.html')
+        self.assertIn('href="rooms.html#resource_room"', sensors_page)
+        self.assertIn('href="windows.apib"', sensors_page)
+        self.assertEqual(warnings, [renderer.to_unicode(API_specification_paths[2]) + u": warning: link to a specification not in the site: windows.apib"])
+
+        with open(os.path.join(self.dst_dir_path, site_builder.ANCHOR_MAP_FILE_NAME)) as anchor_map_file:
+            anchor_map = json.load(anchor_map_file)
+        self.assertEqual([(page_name, anchor_map[page_name]['file'], anchor_map[page_name]['page']) for page_name in sorted(anchor_map)],
+                         [('rooms', 'rooms.apib', 'rooms.html'), ('rooms-2', 'rooms.apib', 'rooms-2.html'), ('sensors', 'sensors.apib', 'sensors.html')])
+        self.assertIn('resource_room', anchor_map['rooms']['anchors'])
+
+        index_page = self.read_page('index.html')
+        for summary in summaries:
+            self.assertIn('href="%s"' % summary['page'], index_page)
+        self.assertIn("Doors API", index_page)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import json
+import os
+import unittest
+
+from fiware_api_blueprint_renderer.src import navigation
+from fiware_api_blueprint_renderer.src import spec_check
+from tests.stand_in_drafter import StandInDrafterTestCase
+
+
+API_SPECIFICATION = """FORMAT: 1A
+HOST: http://example.com
+TITLE: Rooms API
+
+# Rooms API
+
+Rooms of a building.
+
+## Editors
+
+  1. Jane Doe
+
+## Status
+
+Draft.
+
+# Group Rooms
+
+## Room [/rooms/{id}]
+
++ Parameters
+    + id (required, string) - Id of the room
+        + Members
+            + `Room1` - First room
+
+### Get a room [GET]
+
++ Attributes (%(attributes)s)
+
++ Response 200 (application/json)
+
+        {"id": "Room1"}
+%(extra_resources)s
+## Data Structures
+
+### Room (object)
+
+    + id: Room1 (string) - Id of the room
+%(extra_properties)s
+"""
+
+# Nested parameter values under a header that isn't a resource for drafter
+UNPARSED_HEADER = """
+### Old room [/old-rooms/{id}]
+
++ Parameters
+    + id (required, string) - Id of the room
+        + Members
+            + `Room1` - First room
+"""
+
+# Nested parameter values under a header that isn't a resource or action header
+INVALID_HEADER = """
+## Notes
+
++ Parameters
+    + id (required, string) - Id of the room
+        + Members
+            + `Room1` - First room
+"""
+
+MALFORMED_PROPERTY = "    + (string) - Unnamed\n"
+
+# Stand-in for a drafter that crashes without writing anything
+CRASHING_DRAFTER = "#!/bin/sh\nexit 3\n"
+
+
+class CheckApiSpecificationTest(StandInDrafterTestCase):
+
+    def write_specification(self, name='rooms.apib', attributes='Room', extra_resources='', extra_properties=''):
+        return self.write_file(name, API_SPECIFICATION % {'attributes': attributes, 'extra_resources': extra_resources,
+                                                          'extra_properties': extra_properties})
+
+    def get_problems(self, result):
+        return [(problem['line'], problem['severity'], problem['message']) for problem in result['problems']]
+
+    def get_line_number(self, API_specification_path, text):
+        with open(API_specification_path) as API_specification_file:
+            return [line.rstrip('\n') for line in API_specification_file].index(text) + 1
+
+    def test_valid_specification(self):
+        API_specification_path = self.write_specification()
+
+        self.assertEqual(spec_check.check_api_specification(API_specification_path),
+                         {'file': API_specification_path, 'ok': True, 'problems': []})
+
+    def test_drafter_annotations_are_on_the_lines_of_the_specification(self):
+        API_specification_path = self.write_specification(attributes='Missing')
+        result = spec_check.check_api_specification(API_specification_path)
+
+        # The metadata and extra sections before the blueprint aren't given to drafter
+        line_number = self.get_line_number(API_specification_path, "+ Attributes (Missing)")
+        self.assertEqual(line_number, 28)
+        self.assertEqual(self.get_problems(result), [(line_number, 'warning', "unable to find the symbol `Missing`")])
+        self.assertTrue(result['ok'])
+
+    def test_parameter_values_under_a_header_drafter_does_not_parse(self):
+        API_specification_path = self.write_specification(extra_resources=UNPARSED_HEADER)
+        result = spec_check.check_api_specification(API_specification_path)
+
+        self.assertEqual(self.get_problems(result), [(self.get_line_number(API_specification_path, "### Old room [/old-rooms/{id}]"), 'warning',
+                                                      "Parameter values are described under a header that doesn't match any parsed "
+                                                      "resource or action: ### Old room [/old-rooms/{id}]")])
+        self.assertTrue(result['ok'])
+
+    def test_parameter_values_under_an_invalid_header(self):
+        API_specification_path = self.write_specification(extra_resources=INVALID_HEADER)
+        result = spec_check.check_api_specification(API_specification_path)
+
+        self.assertEqual(self.get_problems(result), [(self.get_line_number(API_specification_path, "## Notes"), 'error',
+                                                      "Header is not a valid resource or action header: ## Notes")])
+        self.assertFalse(result['ok'])
+
+    def test_malformed_mson_property(self):
+        API_specification_path = self.write_specification(extra_properties=MALFORMED_PROPERTY)
+        result = spec_check.check_api_specification(API_specification_path)
+
+        self.assertEqual(self.get_problems(result), [(self.get_line_number(API_specification_path, MALFORMED_PROPERTY.rstrip('\n')), 'error',
+                                                      "Malformed MSON property in data structure Room: + (string) - Unnamed")])
+        self.assertFalse(result['ok'])
+
+    def test_crashing_drafter(self):
+        self.write_file(os.path.join('bin', 'drafter'), CRASHING_DRAFTER)
+        result = spec_check.check_api_specification(self.write_specification())
+
+        self.assertEqual(self.get_problems(result), [(None, 'error', "drafter failed to parse the API blueprint (exit code 3)")])
+        self.assertFalse(result['ok'])
+
+    def test_missing_drafter_and_specification(self):
+        API_specification_path = self.write_specification()
+        os.remove(os.path.join(self.bin_dir_path, 'drafter'))
+        os.environ['PATH'] = self.bin_dir_path
+
+        for path in (API_specification_path, os.path.join(self.temp_dir_path, 'missing.apib')):
+            result = spec_check.check_api_specification(path)
+            self.assertEqual([(line, severity) for (line, severity, message) in self.get_problems(result)], [(None, 'error')])
+            self.assertIn("No such file or directory", result['problems'][0]['message'])
+
+    def test_bugs_of_the_checks_are_raised(self):
+        saved_generate_navigation_model = navigation.generate_navigation_model
+
+        def generate_navigation_model(json_content):
+            raise TypeError("Bug")
+
+        navigation.generate_navigation_model = generate_navigation_model
+        try:
+            self.assertRaises(TypeError, spec_check.check_api_specification, self.write_specification())
+        finally:
+            navigation.generate_navigation_model = saved_generate_navigation_model
+
+    def test_specifications_checked_in_parallel(self):
+        API_specification_paths = [self.write_specification(os.path.join('specs', 'a.apib'), attributes='Missing'),
+                                   self.write_specification(os.path.join('specs', 'b', 'b.apib')),
+                                   self.write_specification(os.path.join('specs', 'c.apib'), extra_properties=MALFORMED_PROPERTY)]
+
+        # The files of a directory come before the ones of its subdirectories
+        self.assertEqual(spec_check.find_api_specifications([os.path.join(self.temp_dir_path, 'specs')]),
+                         [API_specification_paths[0], API_specification_paths[2], API_specification_paths[1]])
+        self.assertEqual(spec_check.check_api_specifications(API_specification_paths, 2),
+                         [spec_check.check_api_specification(path) for path in API_specification_paths])
+
+    def test_report(self):
+        API_specification_paths = [self.write_specification('a.apib', attributes='Missing'),
+                                   self.write_specification('b.apib', extra_properties=MALFORMED_PROPERTY)]
+        results = spec_check.check_api_specifications(API_specification_paths, 1)
+        report_path = os.path.join(self.temp_dir_path, 'report.json')
+        spec_check.write_check_report(results, report_path)
+
+        with open(report_path) as report_file:
+            report = json.load(report_file)
+        self.assertEqual((report['ok'], report['checked'], report['failed']), (False, 2, 1))
+        self.assertEqual(report['results'], json.loads(json.dumps(results)))
+        self.assertEqual(spec_check.format_problem(results[0]['problems'][0]),
+                         "%s:28: warning: unable to find the symbol `Missing`" % API_specification_paths[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from fiware_api_blueprint_renderer.src import syntax_highlight
+
+
+class HighlightJsonTest(unittest.TestCase):
+
+    def test_tokens(self):
+        self.assertEqual(syntax_highlight.highlight_json('{"id": "Room1", "temperature": -23.5e2, "on": true}'),
+                         '{<span class="hljs-attribute">"id"</span>: <span class="hljs-string">"Room1"</span>, '
+                         '<span class="hljs-attribute">"temperature"</span>: <span class="hljs-number">-23.5e2</span>, '
+                         '<span class="hljs-attribute">"on"</span>: <span class="hljs-literal">true</span>}')
+
+    def test_escaped_quotes_stay_inside_the_string(self):
+        self.assertEqual(syntax_highlight.highlight_json(r'["a \"b\" c"]'),
+                         '[<span class="hljs-string">"a \\"b\\" c"</span>]')
+
+    def test_invalid_json_is_escaped(self):
+        self.assertEqual(syntax_highlight.highlight_json('{<b>: & }'), '{&lt;b&gt;: &amp; }')
+
+
+class HighlightXmlTest(unittest.TestCase):
+
+    def test_tags_and_attributes(self):
+        self.assertEqual(syntax_highlight.highlight_xml('<entity id="Room1">a &lt; b</entity>'),
+                         '<span class="hljs-tag">&lt;<span class="hljs-title">entity</span> '
+                         '<span class="hljs-attribute">id</span>=<span class="hljs-value">"Room1"</span>&gt;</span>'
+                         'a &amp;lt; b'
+                         '<span class="hljs-tag">&lt;/<span class="hljs-title">entity</span>&gt;</span>')
+
+    def test_comments_processing_instructions_and_cdata(self):
+        self.assertEqual(syntax_highlight.highlight_xml('<?xml version="1.0"?><!-- <a> --><![CDATA[<b>]]>'),
+                         '<span class="hljs-pi">&lt;?xml version="1.0"?&gt;</span>'
+                         '<span class="hljs-comment">&lt;!-- &lt;a&gt; --&gt;</span>'
+                         '<span class="hljs-cdata">&lt;![CDATA[&lt;b&gt;]]&gt;</span>')
+
+
+class HighlightHeaderLinesTest(unittest.TestCase):
+
+    def test_headers(self):
+        self.assertEqual(syntax_highlight.highlight_header_lines('Content-Type: application/json\nnot a header'),
+                         '<span class="hljs-attribute">Content-Type</span>: <span class="hljs-string">application/json</span>\n'
+                         'not a header')
+
+
+class GuessLanguageTest(unittest.TestCase):
+
+    def test_content_type_wins(self):
+        self.assertEqual(syntax_highlight.guess_language('{"a": 1}', 'text/xml'), 'xml')
+        self.assertEqual(syntax_highlight.guess_language('<a/>', 'application/vnd.api+json'), 'json')
+
+    def test_first_character(self):
+        self.assertEqual(syntax_highlight.guess_language('  [1, 2]'), 'json')
+        self.assertEqual(syntax_highlight.guess_language('\n<a/>', 'text/plain'), 'xml')
+        self.assertEqual(syntax_highlight.guess_language('plain text'), 'text')
+
+    def test_highlight_dispatches_on_the_language(self):
+        self.assertEqual(syntax_highlight.highlight('1 < 2', 'text'), '1 &lt; 2')
+        self.assertEqual(syntax_highlight.highlight('1', 'json'), '<span class="hljs-number">1</span>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import copy
+import os
+import unittest
+
+from fiware_api_blueprint_renderer.src import renderer
+from fiware_api_blueprint_renderer.src import rendered_fragments
+from fiware_api_blueprint_renderer.src import site_builder
+from fiware_api_blueprint_renderer.src import version_build
+from tests.stand_in_drafter import StandInDrafterTestCase
+
+
+API_SPECIFICATION = """FORMAT: 1A
+HOST: http://example.com
+TITLE: Rooms API
+VERSION: %(version)s
+
+# Rooms API
+
+Rooms and sensors of a building.
+
+# Group Rooms
+
+## Room [/rooms/{id}]
+
+### Get a room [GET]
+
+%(description)s
+
++ Response 200 (application/json)
+
+        {"id": "Room1"}
+%(actions)s
+# Group Sensors
+
+## Sensor [/sensors/{id}]
+
+### Get a sensor [GET]
+
++ Response 200 (application/json)
+
+        {"id": "Sensor1"}
+"""
+
+ROOM_LIST_RESOURCE = """
+## Room list [/rooms]
+
+### List the rooms [GET]
+
++ Response 200 (application/json)
+
+        [{"id": "Room1"}]
+"""
+
+
+def create_action(name, method='GET', description=""):
+    return {'id': 'action_' + name.lower().replace(' ', '-'), 'name': name, 'method': method, 'attributes': {'uriTemplate': ''},
+            'description': description}
+
+
+def create_resource(name, actions):
+    return {'id': 'resource_' + name.lower(), 'name': name, 'uriTemplate': '/' + name.lower() + 's/{id}', 'description': "",
+            'actions': actions}
+
+
+def create_resource_group(name, resources):
+    return {'id': 'resource_group_' + name.lower(), 'name': name, 'description': "", 'resources': resources}
+
+
+def create_json_content():
+    """Returns the JSON context of a specification with two resource groups, as diff_versions sees it"""
+    return {
+        'api_metadata': {'subsections': [{'id': 'status', 'name': "Status", 'body': "<p>Draft</p>", 'subsections': []}]},
+        'data_structures': {'Room': {'id': 'Room', 'sections': []}},
+        'resourceGroups': [
+            create_resource_group("Rooms", [create_resource("Room", [create_action("Get a room"), create_action("Delete a room", 'DELETE')])]),
+            create_resource_group("Sensors", [create_resource("Sensor", [create_action("Get a sensor")])]),
+        ],
+    }
+
+
+class DiffVersionsTest(unittest.TestCase):
+
+    def get_changes(self, previous_json_content, json_content):
+        return [(change['status'], change['kind'], change['id'], change['title'])
+                for change in version_build.diff_versions(previous_json_content, json_content)]
+
+    def test_unchanged_version(self):
+        self.assertEqual(self.get_changes(create_json_content(), create_json_content()), [])
+
+    def test_changed_nodes(self):
+        json_content = create_json_content()
+        json_content['resourceGroups'][0]['resources'][0]['actions'][1]['description'] = "<p>Deletes a room.</p>"
+        json_content['api_metadata']['subsections'][0]['body'] = "<p>Final</p>"
+
+        self.assertEqual(self.get_changes(create_json_content(), json_content),
+                         [('changed', 'section', 'status', "Status"),
+                          ('changed', 'action', 'action_delete-a-room', "DELETE - Delete a room")])
+
+    def test_added_and_removed_nodes(self):
+        json_content = create_json_content()
+        json_content['resourceGroups'].insert(1, create_resource_group("Doors", [create_resource("Door", [create_action("Open a door", 'POST')])]))
+        del json_content['data_structures']['Room']
+        del json_content['resourceGroups'][0]['resources'][0]['actions'][0]
+
+        self.assertEqual(self.get_changes(create_json_content(), json_content),
+                         [('added', 'resource group', 'resource_group_doors', "Group Doors"),
+                          ('added', 'resource', 'resource_door', "Resource Door"),
+                          ('added', 'action', 'action_open-a-door', "POST - Open a door"),
+                          ('removed', 'data structure', 'Room', "Room"),
+                          ('removed', 'action', 'action_get-a-room', "GET - Get a room")])
+
+    def test_action_moved_to_another_group(self):
+        json_content = create_json_content()
+        action = json_content['resourceGroups'][0]['resources'][0]['actions'].pop()
+        json_content['resourceGroups'][1]['resources'][0]['actions'].append(action)
+
+        self.assertEqual(self.get_changes(create_json_content(), json_content),
+                         [('changed', 'action', 'action_delete-a-room', "DELETE - Delete a room")])
+
+    def test_resource_moved_to_another_group(self):
+        json_content = create_json_content()
+        resource = json_content['resourceGroups'][1]['resources'].pop()
+        json_content['resourceGroups'][0]['resources'].append(resource)
+
+        self.assertEqual(self.get_changes(create_json_content(), json_content), [('changed', 'resource', 'resource_sensor', "Resource Sensor")])
+
+    def test_diff_leaves_the_contexts_unchanged(self):
+        (previous_json_content, json_content) = (create_json_content(), create_json_content())
+        json_content['resourceGroups'].reverse()
+        saved_contents = copy.deepcopy((previous_json_content, json_content))
+        version_build.diff_versions(previous_json_content, json_content)
+
+        self.assertEqual((previous_json_content, json_content), saved_contents)
+
+
+class BuildVersionsTest(StandInDrafterTestCase):
+
+    def setUp(self):
+        StandInDrafterTestCase.setUp(self)
+        self.dst_dir_path = os.path.join(self.temp_dir_path, 'out')
+        self.cache_dir_path = os.path.join(self.temp_dir_path, 'cache')
+
+    def write_version(self, version, description="Returns a room.", actions=""):
+        return self.write_file(os.path.join(version, 'rooms.apib'),
+                               API_SPECIFICATION % {'version': version, 'description': description, 'actions': actions})
+
+    def build_versions(self, API_specification_paths):
+        return version_build.build_versions(API_specification_paths, renderer.DEFAULT_TEMPLATE_PATH, site_builder.DEFAULT_SITE_INDEX_TEMPLATE_PATH,
+                                            version_build.DEFAULT_CHANGELOG_TEMPLATE_PATH, self.dst_dir_path, {'cache_dir': self.cache_dir_path},
+                                            jobs=2)
+
+    def read_page(self, page_name):
+        with open(os.path.join(self.dst_dir_path, page_name)) as page_file:
+            return page_file.read().decode('utf-8')
+
+    def test_changelog_pages(self):
+        API_specification_paths = [self.write_version('1.0'), self.write_version('1.1', "Returns a room of the building."),
+                                   self.write_version('2.0', "Returns a room of the building.", ROOM_LIST_RESOURCE)]
+        (summaries, _, _) = self.build_versions(API_specification_paths)
+
+        self.assertEqual([version_build.format_version_changes(summary) for summary in summaries],
+                         ["rooms-1.0.html: first version", "rooms-1.1.html: 0 added, 1 changed, 0 removed",
+                          "rooms-2.0.html: 2 added, 0 changed, 0 removed"])
+        self.assertEqual([(change['status'], change['title']) for change in summaries[2]['changes']], [('added', "Resource Room list"), ('added', "GET - List the rooms")])
+
+        for page_name in ('index.html', 'rooms-1.0.html', 'rooms-1.1.html', 'rooms-2.0.html', 'rooms-1.0-changes.html',
+                          'rooms-1.1-changes.html', 'rooms-2.0-changes.html'):
+            self.assertTrue(os.path.isfile(os.path.join(self.dst_dir_path, page_name)), page_name)
+
+        changelog_page = self.read_page('rooms-1.1-changes.html')
+        self.assertIn("Changes in Rooms API 1.1", changelog_page)
+        self.assertIn("GET - Get a room", changelog_page)
+        self.assertNotIn("Get a sensor", changelog_page)
+        self.assertIn("GET - List the rooms", self.read_page('rooms-2.0-changes.html'))
+        self.assertIn("Returns a room of the building.", self.read_page('rooms-1.1.html'))
+
+        index_page = self.read_page('index.html')
+        for page_name in ('rooms-1.0.html', 'rooms-1.1-changes.html', 'rooms-2.0-changes.html'):
+            self.assertIn('href="%s"' % page_name, index_page)
+
+    def test_unchanged_fragments_are_reused(self):
+        API_specification_paths = [self.write_version('1.0'), self.write_version('1.1', "Returns a room of the building.")]
+        self.build_versions(API_specification_paths)
+
+        # Every page renders the fragments of the resource groups and their examples: the ones of
+        # the Sensors group are reused by the second version
+        fragment_cache = rendered_fragments.get_fragment_cache(renderer.get_cache_directory('fragments', self.cache_dir_path))
+        self.assertEqual((fragment_cache.hits, fragment_cache.misses), (2, 6))
+        self.assertIn("Returns a room of the building.", self.read_page('rooms-1.1.html'))
+
+
+if __name__ == '__main__':
+    unittest.main()